@@ -0,0 +1,276 @@
+"""
+Accountant - 多租户用量计量与配额
+按空间与用户统计智能体执行时间、模型 token 与生成内容字节数，
+在内存中聚合并定期批量落盘；任务发布时以 O(1) 检查配额
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+from app import config
+from app.accounting.store import Usage, UsageStore
+from app.blackboard.blackboard import Blackboard, Task, blackboard
+from app.clock import clock as app_clock
+from app.lifecycle import lifecycle
+
+
+logger = logging.getLogger(__name__)
+
+# 当前执行上下文所属的空间，模型调用据此记账
+_current_space: ContextVar[Optional[str]] = ContextVar("accounting_space", default=None)
+
+
+@dataclass(frozen=True)
+class Quota:
+    """配额，None 表示不限制；用量类配额按自然日(UTC)计算"""
+    max_active: Optional[int] = None
+    tokens: Optional[int] = None
+    wall_seconds: Optional[float] = None
+    asset_bytes: Optional[int] = None
+
+
+class QuotaExceeded(Exception):
+    """发布任务超出配额"""
+
+    def __init__(self, key: str, resource: str, limit: float, used: float):
+        super().__init__(f"{key} exceeded {resource} quota ({used:g}/{limit:g})")
+        self.key = key
+        self.resource = resource
+        self.limit = limit
+        self.used = used
+
+
+def _limit(value: float) -> Optional[float]:
+    return value or None
+
+
+class Accountant:
+    """
+    用量计量
+
+    - 发布: 计入未完成任务数；认领: 记录开始时间；完成/失败: 计入执行时间与输出字节数
+    - 模型 token 通过 charge_tokens() 计入 scope() 指定的空间
+    - 空间通过 assign() 归属到用户，用量同时计入空间与用户
+    - 配额检查只读取维护好的计数器，不遍历任务
+    """
+
+    def __init__(
+        self,
+        store: UsageStore,
+        space_quota: Quota = Quota(),
+        user_quota: Quota = Quota(),
+        flush_interval: float = config.ACCOUNTING_FLUSH_INTERVAL,
+        clock: Optional[Callable[[], float]] = None,
+    ):
+        self.store = store
+        self.space_quota = space_quota
+        self.user_quota = user_quota
+        self.flush_interval = flush_interval
+        self.clock = clock or app_clock.time
+        self.owners: Dict[str, str] = {}
+        self._quotas: Dict[str, Quota] = {}
+        self._period = self._today()
+        self._usage: Dict[str, Usage] = {}
+        self._pending: Dict[str, Usage] = {}
+        self._active: Dict[str, int] = {}
+        # task_id -> (认领时刻, 计量键)
+        self._started: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _today(self) -> str:
+        return datetime.fromtimestamp(self.clock(), timezone.utc).strftime("%Y%m%d")
+
+    # --- 归属与配额 ---
+
+    def assign(self, space_id: str, user_id: str) -> None:
+        """把空间归属到用户"""
+        self.owners[space_id] = user_id
+
+    def set_quota(self, key: str, quota: Quota) -> None:
+        """为单个空间("space:<id>")或用户("user:<id>")设置配额"""
+        self._quotas[key] = quota
+
+    def quota(self, key: str) -> Quota:
+        if key in self._quotas:
+            return self._quotas[key]
+        return self.user_quota if key.startswith("user:") else self.space_quota
+
+    def keys(self, space_id: Optional[str]) -> Tuple[str, ...]:
+        """空间对应的计量键(空间 + 所属用户)"""
+        if space_id is None:
+            return ()
+        owner = self.owners.get(space_id)
+        if owner is None:
+            return (f"space:{space_id}",)
+        return (f"space:{space_id}", f"user:{owner}")
+
+    def check(self, tasks: List[Task]) -> None:
+        """发布检查: 整批任务计入后不超过配额，否则抛出 QuotaExceeded"""
+        self._roll()
+        batch: Dict[str, int] = {}
+        for task in tasks:
+            for key in self.keys(task.space_id):
+                batch[key] = batch.get(key, 0) + 1
+        for key, count in batch.items():
+            quota = self.quota(key)
+            active = self._active.get(key, 0)
+            if quota.max_active is not None and active + count > quota.max_active:
+                raise QuotaExceeded(key, "active_tasks", quota.max_active, active + count)
+            usage = self._usage.get(key)
+            if usage is None:
+                continue
+            for resource, limit, used in (
+                ("tokens", quota.tokens, usage.tokens),
+                ("wall_seconds", quota.wall_seconds, usage.wall_ms / 1000),
+                ("asset_bytes", quota.asset_bytes, usage.asset_bytes),
+            ):
+                if limit is not None and used >= limit:
+                    raise QuotaExceeded(key, resource, limit, used)
+
+    # --- 计量 ---
+
+    def attach(self, board: Blackboard) -> None:
+        """接入黑板: 注册发布检查并订阅任务事件"""
+        board.add_guard(self.check)
+        board.subscribe("task_publish", self._on_publish)
+        board.subscribe("tasks_publish", self._on_publish)
+        board.subscribe("task_claim", self._on_claim)
+        board.subscribe("task_complete", self._on_finish)
+        board.subscribe("task_failed", self._on_finish)
+
+    def _on_publish(self, data) -> None:
+        for task in data if isinstance(data, list) else [data]:
+            for key in self.keys(task.space_id):
+                self._active[key] = self._active.get(key, 0) + 1
+            self._charge(task.space_id, Usage(tasks=1))
+
+    def _on_claim(self, task: Task) -> None:
+        self._started[task.id] = (app_clock.monotonic(), self.keys(task.space_id))
+
+    def _on_finish(self, task: Task) -> None:
+        started = self._started.pop(task.id, None)
+        keys = started[1] if started is not None else self.keys(task.space_id)
+        for key in keys:
+            self._active[key] = max(0, self._active.get(key, 0) - 1)
+        wall_ms = (app_clock.monotonic() - started[0]) * 1000 if started is not None else 0.0
+        asset_bytes = task.output.nbytes() if hasattr(task.output, "nbytes") else 0
+        self._charge_keys(keys, Usage(wall_ms=wall_ms, asset_bytes=asset_bytes))
+
+    @contextmanager
+    def scope(self, space_id: str) -> Iterator[None]:
+        """在此上下文(及其中创建的协程)内的模型调用计入该空间"""
+        token = _current_space.set(space_id)
+        try:
+            yield
+        finally:
+            _current_space.reset(token)
+
+    def charge_tokens(self, tokens: int, space_id: Optional[str] = None) -> None:
+        """记录模型 token 用量，未指定空间时使用当前 scope()"""
+        space_id = space_id or _current_space.get()
+        if space_id is not None and tokens:
+            self._charge(space_id, Usage(tokens=tokens))
+
+    def _charge(self, space_id: Optional[str], delta: Usage) -> None:
+        self._charge_keys(self.keys(space_id), delta)
+
+    def _charge_keys(self, keys: Tuple[str, ...], delta: Usage) -> None:
+        self._roll()
+        for key in keys:
+            self._usage.setdefault(key, Usage()).add(delta)
+            self._pending.setdefault(key, Usage()).add(delta)
+
+    def _roll(self) -> None:
+        """跨天时先落盘前一天的增量，再清零用量(未完成任务数保留)"""
+        today = self._today()
+        if today == self._period:
+            return
+        if self._pending:
+            self.store.append(self._period, self._pending, self.clock())
+        self._period = today
+        self._usage = {}
+        self._pending = {}
+
+    def usage(self, key: str) -> Dict[str, float]:
+        """当日用量、未完成任务数与配额"""
+        self._roll()
+        quota = self.quota(key)
+        return {
+            **self._usage.get(key, Usage()).to_dict(),
+            "active_tasks": self._active.get(key, 0),
+            "period": self._period,
+            "quota": {
+                "max_active": quota.max_active,
+                "tokens": quota.tokens,
+                "wall_seconds": quota.wall_seconds,
+                "asset_bytes": quota.asset_bytes,
+            },
+        }
+
+    # --- 落盘 ---
+
+    def load(self) -> None:
+        """读取当天已落盘的用量(重启后配额继续生效)"""
+        for key, usage in self.store.load(self._period).items():
+            self._usage.setdefault(key, Usage()).add(usage)
+
+    async def flush(self) -> int:
+        """把内存中的增量批量写入存储，返回写入的计量对象数"""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            await asyncio.to_thread(self.store.append, self._period, pending, self.clock())
+        except OSError:
+            logger.exception("failed to flush usage")
+            # 写入失败时把增量放回，下次一并写入
+            for key, delta in pending.items():
+                self._pending.setdefault(key, Usage()).add(delta)
+            return 0
+        return len(pending)
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await app_clock.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+
+# 全局计量实例
+accountant = Accountant(
+    UsageStore(config.ACCOUNTING_DIR),
+    space_quota=Quota(max_active=_limit(config.QUOTA_SPACE_MAX_ACTIVE)),
+    user_quota=Quota(
+        max_active=_limit(config.QUOTA_USER_MAX_ACTIVE),
+        tokens=_limit(config.QUOTA_USER_DAILY_TOKENS),
+        wall_seconds=_limit(config.QUOTA_USER_DAILY_WALL_SECONDS),
+        asset_bytes=_limit(int(config.QUOTA_USER_DAILY_ASSET_MB * 2**20)),
+    ),
+)
+accountant.attach(blackboard)
+
+
+@lifecycle.on_startup("accounting")
+async def _start_accounting() -> None:
+    """读取当天已落盘的用量(配额在重启后继续生效)并开始定期落盘"""
+    await asyncio.to_thread(accountant.load)
+    accountant.start()
+
+
+@lifecycle.on_shutdown("accounting")
+async def _flush_accounting() -> None:
+    await accountant.close()
@@ -0,0 +1,69 @@
+"""
+Usage Store - 用量记录的持久化
+按天追加写入 JSON Lines，每条记录是一次批量写入中某个计量对象的增量
+"""
+from typing import Dict, List
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import json
+
+
+@dataclass(slots=True)
+class Usage:
+    """计量对象(空间或用户)的用量"""
+    tasks: int = 0
+    wall_ms: float = 0.0
+    tokens: int = 0
+    asset_bytes: int = 0
+
+    def add(self, other: "Usage") -> None:
+        self.tasks += other.tasks
+        self.wall_ms += other.wall_ms
+        self.tokens += other.tokens
+        self.asset_bytes += other.asset_bytes
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+class UsageStore:
+    """用量文件存储(usage-<日期>.jsonl)"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, period: str) -> Path:
+        return self.directory / f"usage-{period}.jsonl"
+
+    def append(self, period: str, deltas: Dict[str, Usage], timestamp: float) -> None:
+        """追加一批增量(一次写入调用)"""
+        if not deltas:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lines: List[str] = [
+            json.dumps({"ts": timestamp, "key": key, **usage.to_dict()}, ensure_ascii=False)
+            for key, usage in deltas.items()
+        ]
+        with open(self._path(period), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def load(self, period: str) -> Dict[str, Usage]:
+        """汇总某一天已落盘的用量；损坏的行(写入中断)被跳过"""
+        totals: Dict[str, Usage] = {}
+        path = self._path(period)
+        if not path.exists():
+            return totals
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    raw = json.loads(line)
+                    delta = Usage(
+                        tasks=raw["tasks"],
+                        wall_ms=raw["wall_ms"],
+                        tokens=raw["tokens"],
+                        asset_bytes=raw["asset_bytes"],
+                    )
+                except (ValueError, KeyError):
+                    continue
+                totals.setdefault(raw["key"], Usage()).add(delta)
+        return totals
@@ -0,0 +1,23 @@
+"""
+CodeWeaver - 代码编织者
+编写 GDScript 代码逻辑，以异步生成器的形式流式产出
+"""
+from typing import AsyncIterator
+
+from app.clock import clock
+
+
+async def write_code(requirement: str, delay: float = 0.3) -> AsyncIterator[str]:
+    """
+    根据需求流式生成 GDScript
+
+    目前为模拟实现，逐行产出固定模板；接入真实模型后改为转发 token 增量
+    """
+    code_content = '''extends RigidBody2D
+
+func _ready():
+    mass = 2.0
+'''
+    for line in code_content.splitlines(keepends=True):
+        await clock.sleep(delay)
+        yield line
@@ -0,0 +1,237 @@
+"""
+Incremental Orchestrator - 增量执行
+记录每个步骤的输入指纹与依赖关系，追加需求时只重新执行输入发生变化的子图；
+步骤写入的黑板资源按空间区分，复用前确认黑板上存放的仍是该步骤写入的内容
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from dataclasses import asdict, dataclass, field
+import hashlib
+import json
+
+from app.blackboard.blackboard import Blackboard, blackboard
+
+
+# 每个空间保留的补充需求条数(原始需求始终保留)
+MAX_REFINEMENTS = 8
+
+
+def resource_key(space_id: str, name: str) -> str:
+    """空间内的黑板资源名，不同空间的同名资源互不覆盖"""
+    return f"{space_id}/{name}"
+
+
+def fingerprint(*parts: Any) -> str:
+    """对任意可 JSON 序列化的数据计算稳定指纹"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class StepRecord:
+    name: str
+    # 步骤输入与上游输出共同决定的指纹
+    fingerprint: str
+    deps: Tuple[str, ...]
+    output: Dict[str, Any]
+    # 输出内容的指纹，下游步骤据此判断是否需要重跑
+    output_fingerprint: str
+    # 输出写入的黑板资源 (category, name, value)，复用前确认黑板上的值未变
+    resources: Tuple[Tuple[str, str, Optional[str]], ...] = ()
+    runs: int = 1
+
+
+@dataclass
+class SpacePipeline:
+    """单个空间的执行记录"""
+    # 已成功执行的需求: 第一条为原始需求，之后为补充(最多保留 MAX_REFINEMENTS 条)
+    requests: List[str] = field(default_factory=list)
+    records: Dict[str, StepRecord] = field(default_factory=dict)
+
+    def extended(self, request: str, new_base: bool = False) -> List[str]:
+        """追加一条需求后的需求历史；new_base 时以该需求重新开始"""
+        if new_base or not self.requests:
+            return [request]
+        base, refinements = self.requests[0], self.requests[1:] + [request]
+        return [base, *refinements[-MAX_REFINEMENTS:]]
+
+
+class IncrementalRun:
+    """
+    一次流水线执行
+
+    步骤按依赖顺序调用 step()；指纹与上次一致且黑板资源仍是上次写入的值时直接复用输出。
+    上游重跑但输出内容不变时，下游指纹也不变，因此同样会被复用。
+    本次需求在 commit() 后才计入需求历史，失败的执行不影响之后的需求
+    """
+
+    def __init__(
+        self,
+        pipeline: SpacePipeline,
+        board: Blackboard,
+        space_id: str,
+        request: str,
+        new_base: bool = False,
+    ):
+        self.pipeline = pipeline
+        self.board = board
+        self.space_id = space_id
+        self.request = request
+        self.executed: List[str] = []
+        self.reused: List[str] = []
+        self._outputs: Dict[str, str] = {}
+        self._requests = pipeline.extended(request, new_base)
+
+    @property
+    def requests(self) -> List[str]:
+        """本次执行使用的需求历史(最后一条为本次需求)"""
+        return self._requests
+
+    def resource_key(self, name: str) -> str:
+        return resource_key(self.space_id, name)
+
+    def commit(self) -> None:
+        """执行成功后把本次需求计入需求历史"""
+        self.pipeline.requests = list(self._requests)
+
+    async def step(
+        self,
+        name: str,
+        inputs: Dict[str, Any],
+        execute: Callable[[], Awaitable[Dict[str, Any]]],
+        deps: Sequence[str] = (),
+        resources: Sequence[Tuple[str, str]] = (),
+        cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        执行或复用一个步骤，返回 (输出, 是否复用)
+
+        cache_if 对输出返回 False 时(超时、崩溃等失败结果)不保留记录，下次执行时重跑
+        """
+        missing = [dep for dep in deps if dep not in self._outputs]
+        if missing:
+            raise ValueError(f"step {name!r} depends on steps that have not run: {missing}")
+
+        step_fp = fingerprint(name, inputs, {dep: self._outputs[dep] for dep in deps})
+        record = self.pipeline.records.get(name)
+        if record is not None and record.fingerprint == step_fp and _resources_valid(self.board, record):
+            self.reused.append(name)
+            self._outputs[name] = record.output_fingerprint
+            return record.output, True
+
+        output = await execute()
+        self.executed.append(name)
+        if cache_if is not None and not cache_if(output):
+            self.pipeline.records.pop(name, None)
+            self._outputs[name] = fingerprint(output)
+            return output, False
+        self.pipeline.records[name] = StepRecord(
+            name=name,
+            fingerprint=step_fp,
+            deps=tuple(deps),
+            output=output,
+            output_fingerprint=fingerprint(output),
+            resources=tuple(
+                (category, key, self.board.get_resource(category, key)) for category, key in resources
+            ),
+            runs=record.runs + 1 if record is not None else 1,
+        )
+        self._outputs[name] = self.pipeline.records[name].output_fingerprint
+        return output, False
+
+
+def _resources_valid(board: Blackboard, record: StepRecord) -> bool:
+    """步骤写入的资源仍在黑板上且未被其他执行覆盖"""
+    return all(
+        value is not None and board.get_resource(category, key) == value
+        for category, key, value in record.resources
+    )
+
+
+class Orchestrator:
+    """按空间保存执行记录"""
+
+    def __init__(self, board: Blackboard = blackboard):
+        self.board = board
+        self._pipelines: Dict[str, SpacePipeline] = {}
+
+    def begin(self, space_id: str, request: str, new_base: bool = False) -> IncrementalRun:
+        """
+        开始一次执行
+
+        同一空间的后续请求视为对之前需求的补充；new_base 为 True 时作为新的原始需求
+        """
+        pipeline = self._pipelines.setdefault(space_id, SpacePipeline())
+        return IncrementalRun(pipeline, self.board, space_id, request, new_base)
+
+    def requests(self, space_id: str) -> List[str]:
+        pipeline = self._pipelines.get(space_id)
+        return list(pipeline.requests) if pipeline is not None else []
+
+    def export(self, space_id: str) -> Dict[str, Any]:
+        """导出步骤记录及其引用的黑板资源(可 JSON 序列化)，用于移交给其他副本"""
+        pipeline = self._pipelines.get(space_id)
+        if pipeline is None:
+            return {}
+        # 只导出仍然有效的记录，其资源值与记录一致
+        records = [r for r in pipeline.records.values() if _resources_valid(self.board, r)]
+        resources: Dict[str, Dict[str, str]] = {}
+        for record in records:
+            for category, key, value in record.resources:
+                resources.setdefault(category, {})[key] = value
+        return {
+            "records": [asdict(record) for record in records],
+            "resources": resources,
+        }
+
+    def restore(self, space_id: str, requests: List[str], state: Dict[str, Any]) -> None:
+        """导入其他副本导出的记录，之后的执行会复用其中已完成的步骤"""
+        pipeline = SpacePipeline(requests=list(requests))
+        for raw in state.get("records", []):
+            record = StepRecord(**{
+                **raw,
+                "deps": tuple(raw["deps"]),
+                "resources": tuple(tuple(item) for item in raw["resources"]),
+            })
+            pipeline.records[record.name] = record
+        for category, items in state.get("resources", {}).items():
+            for key, value in items.items():
+                self.board.update_resource(category, key, value)
+        self._pipelines[space_id] = pipeline
+
+    def graph(self, space_id: str) -> Dict[str, Dict[str, Any]]:
+        """当前记录的依赖图与指纹"""
+        pipeline = self._pipelines.get(space_id)
+        if pipeline is None:
+            return {}
+        return {
+            name: {"deps": list(record.deps), "fingerprint": record.fingerprint, "runs": record.runs}
+            for name, record in pipeline.records.items()
+        }
+
+    def dependents(self, space_id: str, name: str) -> List[str]:
+        """直接或间接依赖某个步骤的全部步骤"""
+        records = self._pipelines.get(space_id, SpacePipeline()).records
+        found: List[str] = []
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for record in records.values():
+                if current in record.deps and record.name not in found:
+                    found.append(record.name)
+                    frontier.append(record.name)
+        return found
+
+    def invalidate(self, space_id: str, name: Optional[str] = None) -> None:
+        """丢弃某个步骤(及其下游)或整个空间的记录，下次执行时重跑"""
+        pipeline = self._pipelines.get(space_id)
+        if pipeline is None:
+            return
+        if name is None:
+            pipeline.records.clear()
+            return
+        for step in [name, *self.dependents(space_id, name)]:
+            pipeline.records.pop(step, None)
+
+
+# 全局编排器实例
+orchestrator = Orchestrator()
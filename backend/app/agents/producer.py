@@ -0,0 +1,44 @@
+"""
+Producer - 制作人
+把同一空间内的需求与后续补充整理为各智能体的任务输入
+"""
+from typing import Dict, List
+
+
+# 出现这些词的补充需求会影响视觉资产
+VISUAL_KEYWORDS = (
+    "纹理", "贴图", "颜色", "外观", "材质", "图片", "亮", "暗", "风格",
+    "texture", "color", "colour", "sprite", "look", "style",
+)
+
+
+# 以这些词开头的需求是新的原始需求，而不是对之前需求的补充
+NEW_REQUEST_PREFIXES = (
+    "我想做", "我要做", "帮我做", "做一个", "新建", "创建", "重新做",
+    "make a", "make an", "create a", "create an", "build a", "build an", "new ",
+)
+
+
+def is_new_request(request: str) -> bool:
+    lowered = request.strip().lower()
+    return lowered.startswith(NEW_REQUEST_PREFIXES)
+
+
+def is_visual(request: str) -> bool:
+    lowered = request.lower()
+    return any(keyword in lowered for keyword in VISUAL_KEYWORDS)
+
+
+def plan_inputs(requests: List[str]) -> Dict[str, str]:
+    """
+    第一条为原始需求，之后的为补充
+
+    纹理只受原始需求与视觉类补充影响；代码需求包含原始需求与其余补充
+    """
+    base, refinements = requests[0], requests[1:]
+    visual = [r for r in refinements if is_visual(r)]
+    behavior = [r for r in refinements if not is_visual(r)]
+    return {
+        "texture": "；".join([base, *visual]),
+        "code": "；".join([base, *behavior]),
+    }
@@ -0,0 +1,38 @@
+"""
+Streaming Pipeline - 智能体流式输出管线
+执行器(异步生成器) -> 黑板部分输出 -> 每个客户端的发送队列
+"""
+from typing import AsyncIterator
+
+from app.blackboard.blackboard import Blackboard, Task, blackboard
+from app.realtime.outbox import OutboxRegistry
+
+
+async def stream_task_output(
+    task: Task,
+    chunks: AsyncIterator[str],
+    room: str,
+    outboxes: OutboxRegistry,
+    board: Blackboard = blackboard,
+) -> str:
+    """
+    消费执行器产生的增量，返回完整输出
+
+    每条增量写入任务的 partial_output，并以 agent:delta 投递给房间内的客户端；
+    offset 为该增量在完整输出中的起始位置，客户端可据此识别被合并的增量
+    """
+    parts = []
+    offset = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        await board.append_partial(task.id, chunk)
+        outboxes.publish(room, 'agent:delta', {
+            'taskId': task.id,
+            'agent': task.assigned_agent.value,
+            'delta': chunk,
+            'offset': offset,
+        }, stream_key=task.id)
+        parts.append(chunk)
+        offset += len(chunk)
+    return ''.join(parts)
@@ -0,0 +1,74 @@
+"""
+Admin API Routes
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from pydantic import BaseModel
+from typing import Literal, Optional
+import hmac
+
+from app import config
+from app.accounting.accountant import Quota, accountant
+from app.handoff.runner import workflow_runner
+from app.lifecycle import lifecycle
+
+# 未配置管理令牌时允许访问管理接口的客户端地址
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+async def require_admin(request: Request, x_admin_token: Optional[str] = Header(None)) -> None:
+    """管理接口鉴权: 配置了 ADMIN_TOKEN 时校验请求头，否则只允许本机(preStop 钩子)调用"""
+    if config.ADMIN_TOKEN:
+        if x_admin_token is None or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+        return
+    host = request.client.host if request.client else None
+    if host not in LOOPBACK_HOSTS:
+        raise HTTPException(status_code=403, detail="Admin API is only available from localhost")
+
+
+# 排空、用量与配额接口都需要管理权限
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+class QuotaUpdate(BaseModel):
+    max_active: Optional[int] = None
+    tokens: Optional[int] = None
+    wall_seconds: Optional[float] = None
+    asset_bytes: Optional[int] = None
+
+
+@router.post("/drain")
+async def start_drain():
+    """
+    开始排空(部署时由 preStop 钩子调用)
+
+    立即返回；之后 /ready 返回 503，新的 user_message 被拒绝，
+    进行中的工作流在截止时间内完成或写入检查点移交给其他副本
+    """
+    lifecycle.drain()
+    return {"status": "draining", "inflight": workflow_runner.inflight}
+
+
+@router.get("/drain")
+async def drain_status():
+    """排空进度"""
+    return {
+        "draining": lifecycle.draining,
+        "inflight": workflow_runner.inflight,
+        "queued": len(workflow_runner.queue),
+        "stats": workflow_runner.stats,
+    }
+
+
+@router.get("/usage/{kind}/{key_id}")
+async def get_usage(kind: Literal["space", "user"], key_id: str):
+    """空间或用户的当日用量与配额"""
+    return {"kind": kind, "id": key_id, **accountant.usage(f"{kind}:{key_id}")}
+
+
+@router.put("/quotas/{kind}/{key_id}")
+async def set_quota(kind: Literal["space", "user"], key_id: str, data: QuotaUpdate):
+    """覆盖单个空间或用户的配额(未填写的项不限制)"""
+    key = f"{kind}:{key_id}"
+    accountant.set_quota(key, Quota(**data.model_dump()))
+    return {"kind": kind, "id": key_id, **accountant.usage(key)}
@@ -7,6 +7,8 @@ from typing import Optional, List
 from datetime import datetime
 import uuid
 
+from app.search.service import search_service
+
 router = APIRouter()
 
 
@@ -47,6 +49,7 @@ async def create_message(space_id: str, data: MessageCreate):
         messages_db[space_id] = []
     
     messages_db[space_id].append(message)
+    search_service.index_message(message)
     return MessageResponse(**message)
 
 
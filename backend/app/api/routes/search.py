@@ -0,0 +1,71 @@
+"""
+Search API Routes
+"""
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+import time
+
+from app.search.service import search_service
+
+router = APIRouter()
+
+
+class SearchHit(BaseModel):
+    id: str
+    kind: str  # message, task, code
+    title: str
+    snippet: str
+    score: float
+    created_at: datetime
+
+
+class SearchResponse(BaseModel):
+    query: str
+    mode: str
+    took_ms: float
+    results: List[SearchHit]
+
+
+def _snippet(content: str, length: int = 160) -> str:
+    return content if len(content) <= length else content[:length] + "…"
+
+
+@router.get("/spaces/{space_id}/search", response_model=SearchResponse)
+async def search_space(
+    space_id: str,
+    q: str = Query(..., min_length=1),
+    mode: str = Query("text", pattern="^(text|similar)$"),
+    kind: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    检索工作空间内容
+
+    - mode=text: 全文检索消息、任务输入与代码资产
+    - mode=similar: 查找相似的历史请求
+    """
+    start = time.perf_counter()
+    if mode == "similar":
+        hits = search_service.similar(space_id, q, limit=limit)
+    else:
+        hits = search_service.search(space_id, q, limit=limit, kinds=kind)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    return SearchResponse(
+        query=q,
+        mode=mode,
+        took_ms=round(took_ms, 3),
+        results=[
+            SearchHit(
+                id=doc.id,
+                kind=doc.kind,
+                title=doc.title,
+                snippet=_snippet(doc.content),
+                score=round(score, 4),
+                created_at=doc.created_at,
+            )
+            for doc, score in hits
+        ],
+    )
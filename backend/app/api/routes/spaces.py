@@ -1,22 +1,28 @@
 """
 Spaces API Routes
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 import uuid
 
+from app.accounting.accountant import accountant
+from app.api.routes.admin import require_admin
+
 router = APIRouter()
 
 
 class SpaceCreate(BaseModel):
     title: str = "未命名项目"
+    # 所属用户，用量与配额同时计入该用户
+    user_id: Optional[str] = None
 
 
 class SpaceResponse(BaseModel):
     id: str
     title: str
+    user_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -34,11 +40,14 @@ async def create_space(data: SpaceCreate):
     space = {
         "id": space_id,
         "title": data.title,
+        "user_id": data.user_id,
         "created_at": now,
         "updated_at": now,
     }
     
     spaces_db[space_id] = space
+    if data.user_id:
+        accountant.assign(space_id, data.user_id)
     return SpaceResponse(**space)
 
 
@@ -71,6 +80,12 @@ async def delete_space(space_id: str):
     return {"message": "Space deleted"}
 
 
+@router.get("/{space_id}/usage", dependencies=[Depends(require_admin)])
+async def get_space_usage(space_id: str):
+    """空间当日用量(执行时间、模型 token、生成内容字节数)、未完成任务数与配额"""
+    return {"space_id": space_id, **accountant.usage(f"space:{space_id}")}
+
+
 @router.get("/", response_model=List[SpaceResponse])
 async def list_spaces():
     """列出所有工作空间"""
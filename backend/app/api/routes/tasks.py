@@ -0,0 +1,215 @@
+"""
+Tasks API Routes
+"""
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Dict, List, Optional
+from contextlib import aclosing
+from datetime import datetime
+import asyncio
+import json
+import uuid
+
+from app.accounting.accountant import QuotaExceeded
+from app.blackboard.blackboard import AgentType, Blackboard, DuplicateTaskError, Task, TaskStatus, TaskType, blackboard
+
+router = APIRouter()
+
+# 未指定执行者时按任务类型分配
+DEFAULT_AGENTS: Dict[TaskType, AgentType] = {
+    TaskType.GENERATE_IMAGE: AgentType.VOIDSHAPER,
+    TaskType.WRITE_CODE: AgentType.CODEWEAVER,
+    TaskType.RUN_TEST: AgentType.INQUISITOR,
+    TaskType.REVIEW: AgentType.PRODUCER,
+}
+
+MAX_BATCH_SIZE = 1000
+
+# SSE 心跳间隔(秒)，防止代理因空闲断开连接
+HEARTBEAT_INTERVAL = 15.0
+
+# 推送给 SSE 客户端的黑板事件
+STREAM_EVENTS = ("task_publish", "tasks_publish", "task_claim", "task_complete", "task_failed")
+
+# 每个 SSE 连接最多缓存的事件数，客户端跟不上时丢弃并要求重新同步
+STREAM_QUEUE_SIZE = 256
+
+
+class TaskCreate(BaseModel):
+    type: TaskType
+    input: Dict[str, Any] = {}
+    assigned_agent: Optional[AgentType] = None
+    id: Optional[str] = None
+
+
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchResponse(BaseModel):
+    space_id: str
+    task_ids: List[str]
+
+
+class TaskResponse(BaseModel):
+    id: str
+    type: TaskType
+    assigned_agent: AgentType
+    status: TaskStatus
+    input: Dict[str, Any]
+    output: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+class TaskListResponse(BaseModel):
+    tasks: List[TaskResponse]
+    next_cursor: Optional[str] = None
+    counts: Dict[str, int]
+
+
+def _task_response(task: Task) -> TaskResponse:
+    return TaskResponse(
+        id=task.id,
+        type=task.type,
+        assigned_agent=task.assigned_agent,
+        status=task.status,
+        input=task.input.to_dict(),
+        output=task.output.to_dict() if task.output is not None else None,
+        created_at=task.created_at,
+        completed_at=task.completed_at,
+    )
+
+
+@router.get("/spaces/{space_id}/tasks", response_model=TaskListResponse)
+async def list_tasks(
+    space_id: str,
+    status: Optional[TaskStatus] = None,
+    agent: Optional[AgentType] = None,
+    type: Optional[TaskType] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """按创建顺序列出任务；next_cursor 传回 cursor 获取下一页，counts 为空间内各状态的任务数"""
+    after = 0
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = int(cursor)
+
+    index = blackboard.task_index
+    tasks, next_seq = index.query(space_id, status=status, agent=agent, task_type=type, after=after, limit=limit)
+    return TaskListResponse(
+        tasks=[_task_response(task) for task in tasks],
+        next_cursor=str(next_seq) if next_seq is not None else None,
+        counts=index.counts(space_id),
+    )
+
+
+async def task_events(
+    space_id: str,
+    board: Blackboard = blackboard,
+    heartbeat: float = HEARTBEAT_INTERVAL,
+    queue_size: int = STREAM_QUEUE_SIZE,
+) -> AsyncIterator[str]:
+    """
+    空间内任务变化的 SSE 事件流
+
+    先发送当前各状态计数，之后每次任务发布/认领/完成/失败发送 task 事件
+    (只含 id/状态/执行者/类型与最新计数，完整内容通过列表接口获取)，空闲时发送注释行作为心跳。
+    缓存的事件超过 queue_size 时丢弃积压，发送 resync 事件(附最新计数)，客户端应重新拉取任务列表
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    dropped = 0
+
+    def handler(event: str):
+        def on_event(data) -> None:
+            nonlocal dropped
+            for task in data if isinstance(data, list) else [data]:
+                if task.space_id != space_id:
+                    continue
+                if dropped or queue.full():
+                    dropped += 1
+                    continue
+                # 在事件发生时记录状态，之后的变化不影响已排队的事件
+                queue.put_nowait((event, {
+                    "id": task.id,
+                    "status": task.status.value,
+                    "agent": task.assigned_agent.value,
+                    "type": task.type.value,
+                }))
+        return on_event
+
+    handlers = {event: handler(event) for event in STREAM_EVENTS}
+    for event, callback in handlers.items():
+        board.subscribe(event, callback)
+    try:
+        yield _sse("counts", board.task_index.counts(space_id))
+        while True:
+            if dropped:
+                # 先清空积压并复位，yield 期间到达的事件照常排队
+                while not queue.empty():
+                    queue.get_nowait()
+                    dropped += 1
+                lost, dropped = dropped, 0
+                yield _sse("resync", {"dropped": lost, "counts": board.task_index.counts(space_id)})
+                continue
+            try:
+                event, task = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield _sse("task", {
+                "event": event,
+                "task": task,
+                "counts": board.task_index.counts(space_id),
+            })
+    finally:
+        for event, callback in handlers.items():
+            board.unsubscribe(event, callback)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/spaces/{space_id}/tasks/stream")
+async def stream_tasks(space_id: str, request: Request):
+    """任务进度的 SSE 推送，供无法保持 Socket.IO 连接的看板使用"""
+    async def events() -> AsyncIterator[str]:
+        async with aclosing(task_events(space_id)) as stream:
+            async for chunk in stream:
+                if await request.is_disconnected():
+                    break
+                yield chunk
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/spaces/{space_id}/tasks:batch", response_model=TaskBatchResponse)
+async def create_tasks(space_id: str, data: TaskBatchCreate):
+    """批量发布任务(整批写入黑板，返回与请求顺序一致的任务 id)"""
+    tasks = [
+        Task(
+            id=item.id or str(uuid.uuid4()),
+            type=item.type,
+            assigned_agent=item.assigned_agent or DEFAULT_AGENTS[item.type],
+            input=item.input,
+            space_id=space_id,
+        )
+        for item in data.tasks
+    ]
+    try:
+        task_ids = await blackboard.publish_tasks(tasks)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except DuplicateTaskError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TaskBatchResponse(space_id=space_id, task_ids=task_ids)
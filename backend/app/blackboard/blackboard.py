@@ -2,13 +2,23 @@
 Blackboard System - 智能体间共享状态的核心数据结构
 采用发布-订阅模式实现解耦通信
 """
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Mapping, Optional, Callable
 from enum import Enum
 from datetime import datetime
 from dataclasses import dataclass, field
 import asyncio
+import sys
 from collections import defaultdict
 
+from app.blackboard.blobs import BlobStore, blob_store
+from app.clock import clock
+from app.blackboard.snapshot import BlackboardSnapshot, FrozenMap, PersistentSeq
+from app.blackboard.task_index import TaskIndex
+
+
+class DuplicateTaskError(ValueError):
+    """任务 id 已存在于黑板上"""
+
 
 class AgentType(str, Enum):
     PRODUCER = "producer"
@@ -31,24 +41,42 @@ class TaskType(str, Enum):
     REVIEW = "review"
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Task:
+    """
+    任务记录
+
+    使用 __slots__ 且按身份比较；枚举字段统一为枚举单例，空间 id 驻留。
+    发布到黑板后 input/output 为 Payload，大字段只在共享载荷存储中保存一份；
+    序列化时使用 Payload.to_dict()
+    """
     id: str
     type: TaskType
     assigned_agent: AgentType
-    input: Dict[str, Any]
+    input: Mapping[str, Any]
     status: TaskStatus = TaskStatus.PENDING
-    output: Optional[Dict[str, Any]] = None
-    created_at: datetime = field(default_factory=datetime.now)
+    output: Optional[Mapping[str, Any]] = None
+    # 流式执行过程中的部分输出(任务结束后清空，完整结果在 output 中)
+    partial_output: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=clock.now)
     completed_at: Optional[datetime] = None
+    space_id: Optional[str] = None
 
+    def __post_init__(self):
+        self.type = TaskType(self.type)
+        self.assigned_agent = AgentType(self.assigned_agent)
+        self.status = TaskStatus(self.status)
+        if self.space_id is not None:
+            self.space_id = sys.intern(self.space_id)
 
-@dataclass
+
+@dataclass(slots=True)
 class BlackboardMessage:
     type: str  # task_publish, task_claim, task_complete, resource_update
     sender: AgentType
+    # task_complete/task_failed 的 output 与任务共享同一个 Payload，序列化时使用 to_dict()
     payload: Any
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: datetime = field(default_factory=clock.now)
 
 
 class Blackboard:
@@ -60,9 +88,21 @@ class Blackboard:
     - 共享资源(纹理、脚本、测试结果)
     - 追踪智能体状态
     - 发布订阅消息
+    
+    读取接口(get_summary / get_resource / get_pending_tasks_for_agent)
+    只读取最近发布的不可变快照，不需要加锁
+
+    单个发布触发 task_publish(参数为任务)，批量发布只触发一次 tasks_publish(参数为整批任务)，
+    需要感知所有新任务的订阅者应同时订阅这两个事件
     """
     
-    def __init__(self):
+    def __init__(self, blobs: BlobStore = blob_store):
+        # 最近发布的快照，写入方每批修改后替换
+        self._snapshot = BlackboardSnapshot()
+        
+        # 任务载荷存储
+        self.blobs = blobs
+        
         # 任务队列
         self.tasks: Dict[str, List[Task]] = {
             "pending": [],
@@ -95,13 +135,104 @@ class Blackboard:
         # 订阅者
         self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
         
+        # 发布前检查(配额等)，抛出异常即拒绝发布
+        self._guards: List[Callable[[List[Task]], None]] = []
+        
         # 锁，用于并发控制
         self._lock = asyncio.Lock()
     
+    @property
+    def tasks(self) -> Dict[str, List[Task]]:
+        return self._tasks
+    
+    @tasks.setter
+    def tasks(self, value: Dict[str, List[Task]]) -> None:
+        """整体替换任务队列时重建索引与计数"""
+        self._tasks = value
+        self._counts = {status: len(items) for status, items in value.items()}
+        pending: Dict[AgentType, List[Task]] = defaultdict(list)
+        for task in value.get("pending", []):
+            pending[task.assigned_agent].append(task)
+        # 待处理队列本身是不可变序列，发布快照时直接共享，无需复制
+        self._pending_by_agent: Dict[AgentType, PersistentSeq] = defaultdict(PersistentSeq)
+        self._pending_by_agent.update((agent, PersistentSeq(tasks)) for agent, tasks in pending.items())
+        self._index = TaskIndex(TaskStatus)
+        for task in sorted((t for items in value.values() for t in items), key=lambda t: t.created_at):
+            task.input = self.blobs.pack(task.input)
+            task.output = self.blobs.pack(task.output)
+            self._index.add(task)
+        self._snapshot = self._snapshot.evolve(
+            counts=FrozenMap(self._counts),
+            pending_by_agent=FrozenMap(self._pending_by_agent),
+        )
+    
+    @property
+    def resources(self) -> Dict[str, Dict[str, str]]:
+        return self._resources
+    
+    @resources.setter
+    def resources(self, value: Dict[str, Dict[str, str]]) -> None:
+        self._resources = value
+        self._snapshot = self._snapshot.evolve(resources=FrozenMap({
+            category: FrozenMap(items) for category, items in value.items()
+        }))
+    
+    @property
+    def agent_status(self) -> Dict[AgentType, str]:
+        return self._agent_status
+    
+    @agent_status.setter
+    def agent_status(self, value: Dict[AgentType, str]) -> None:
+        self._agent_status = value
+        self._snapshot = self._snapshot.evolve(agent_status=FrozenMap(value))
+    
+    @property
+    def task_index(self) -> TaskIndex:
+        """按空间/状态/智能体/类型索引的全部任务"""
+        return self._index
+    
+    @property
+    def snapshot(self) -> BlackboardSnapshot:
+        """当前快照(无锁读取)"""
+        return self._snapshot
+    
+    def _move_task(self, task: Task, source: Optional[str], target: Optional[str]) -> None:
+        """在状态队列之间移动任务，同步维护计数与待处理索引"""
+        if source is not None:
+            self.tasks[source].remove(task)
+            self._counts[source] -= 1
+            if source == "pending":
+                agent = task.assigned_agent
+                self._pending_by_agent[agent] = self._pending_by_agent[agent].remove(task)
+        else:
+            task.input = self.blobs.pack(task.input)
+            self._index.add(task)
+        if target is not None:
+            self.tasks[target].append(task)
+            self._counts[target] = self._counts.get(target, 0) + 1
+            if target == "pending":
+                agent = task.assigned_agent
+                self._pending_by_agent[agent] = self._pending_by_agent[agent].append(task)
+    
+    def _publish_snapshot(self, agents: List[AgentType] = ()) -> None:
+        """发布新快照，只替换本批修改涉及的智能体的待处理序列(与写入方共享，O(1))"""
+        changes = {
+            "counts": FrozenMap(self._counts),
+            "agent_status": FrozenMap(self.agent_status),
+        }
+        if agents:
+            changes["pending_by_agent"] = self._snapshot.pending_by_agent.update({
+                agent: self._pending_by_agent[agent] for agent in set(agents)
+            })
+        self._snapshot = self._snapshot.evolve(**changes)
+    
     async def publish_task(self, task: Task) -> None:
         """发布任务到黑板"""
         async with self._lock:
-            self.tasks["pending"].append(task)
+            self._check_unique([task])
+            self._check_guards([task])
+            self._move_task(task, None, "pending")
+            self._publish_snapshot([task.assigned_agent])
             
             message = BlackboardMessage(
                 type="task_publish",
@@ -111,16 +242,57 @@ class Blackboard:
             self.message_history.append(message)
             
             await self._notify_subscribers("task_publish", task)
-    
-    async def claim_task(self, agent: AgentType) -> Optional[Task]:
-        """智能体认领任务"""
+
+    async def publish_tasks(self, tasks: List[Task]) -> List[str]:
+        """
+        批量发布任务，返回任务 id 列表
+
+        整批在一次加锁内写入并只发布一次快照，历史中记录一条消息，
+        订阅者收到一次 tasks_publish 事件(参数为整批任务)，不会逐个触发 task_publish；
+        批内 id 重复(ValueError)、id 已在黑板上(DuplicateTaskError)或未通过发布检查时整批拒绝，
+        黑板不做任何修改
+        """
+        ids = [task.id for task in tasks]
+        if len(set(ids)) != len(ids):
+            raise ValueError("duplicate task ids in batch")
+        if not tasks:
+            return ids
+
         async with self._lock:
-            for task in self.tasks["pending"]:
-                if task.assigned_agent == agent:
-                    self.tasks["pending"].remove(task)
-                    task.status = TaskStatus.RUNNING
-                    self.tasks["running"].append(task)
+            self._check_unique(tasks)
+            self._check_guards(tasks)
+            by_agent: Dict[AgentType, List[Task]] = defaultdict(list)
+            for task in tasks:
+                self._move_task(task, None, None)
+                by_agent[task.assigned_agent].append(task)
+            self.tasks["pending"].extend(tasks)
+            self._counts["pending"] += len(tasks)
+            for agent, items in by_agent.items():
+                self._pending_by_agent[agent] = self._pending_by_agent[agent].extend(items)
+            self._publish_snapshot([task.assigned_agent for task in tasks])
+
+            message = BlackboardMessage(
+                type="tasks_publish",
+                sender=AgentType.PRODUCER,
+                payload={
+                    "task_ids": ids,
+                    "task_types": sorted({task.type.value for task in tasks}),
+                },
+            )
+            self.message_history.append(message)
+
+            await self._notify_subscribers("tasks_publish", list(tasks))
+        return ids
+
+    async def claim_task(self, agent: AgentType, task_id: Optional[str] = None) -> Optional[Task]:
+        """智能体认领任务，指定 task_id 时只认领该任务"""
+        async with self._lock:
+            for task in self._pending_by_agent[agent]:
+                if task_id in (None, task.id):
+                    self._move_task(task, "pending", "running")
+                    self._index.set_status(task, TaskStatus.RUNNING)
                     self.agent_status[agent] = "busy"
+                    self._publish_snapshot([agent])
                     
                     message = BlackboardMessage(
                         type="task_claim",
@@ -129,6 +301,7 @@ class Blackboard:
                     )
                     self.message_history.append(message)
                     
+                    await self._notify_subscribers("task_claim", task)
                     return task
             return None
     
@@ -137,27 +310,64 @@ class Blackboard:
         async with self._lock:
             for task in self.tasks["running"]:
                 if task.id == task_id:
-                    self.tasks["running"].remove(task)
-                    task.status = TaskStatus.COMPLETED
-                    task.output = output
-                    task.completed_at = datetime.now()
-                    self.tasks["completed"].append(task)
+                    self._move_task(task, "running", "completed")
+                    self._index.set_status(task, TaskStatus.COMPLETED)
+                    task.output = self.blobs.pack(output)
+                    task.partial_output.clear()
+                    task.completed_at = clock.now()
                     self.agent_status[task.assigned_agent] = "idle"
+                    self._publish_snapshot()
                     
                     message = BlackboardMessage(
                         type="task_complete",
                         sender=task.assigned_agent,
-                        payload={"task_id": task.id, "output": output},
+                        payload={"task_id": task.id, "output": task.output},
                     )
                     self.message_history.append(message)
                     
                     await self._notify_subscribers("task_complete", task)
                     break
     
+    async def fail_task(self, task_id: str, output: Dict[str, Any]) -> None:
+        """任务执行失败(与已完成任务放在同一队列，状态为 FAILED)"""
+        async with self._lock:
+            for task in self.tasks["running"]:
+                if task.id == task_id:
+                    self._move_task(task, "running", "completed")
+                    self._index.set_status(task, TaskStatus.FAILED)
+                    task.output = self.blobs.pack(output)
+                    task.partial_output.clear()
+                    task.completed_at = clock.now()
+                    self.agent_status[task.assigned_agent] = "idle"
+                    self._publish_snapshot()
+
+                    message = BlackboardMessage(
+                        type="task_failed",
+                        sender=task.assigned_agent,
+                        payload={"task_id": task.id, "output": task.output},
+                    )
+                    self.message_history.append(message)
+
+                    await self._notify_subscribers("task_failed", task)
+                    break
+
+    async def append_partial(self, task_id: str, chunk: str) -> None:
+        """追加运行中任务的流式部分输出"""
+        async with self._lock:
+            for task in self.tasks["running"]:
+                if task.id == task_id:
+                    task.partial_output.append(chunk)
+                    await self._notify_subscribers("task_partial", (task, chunk))
+                    break
+    
     def update_resource(self, category: str, name: str, value: str) -> None:
         """更新共享资源"""
         if category in self.resources:
             self.resources[category][name] = value
+            resources = self._snapshot.resources
+            self._snapshot = self._snapshot.evolve(resources=resources.set(
+                category, resources.get(category, FrozenMap()).set(name, value)
+            ))
             
             message = BlackboardMessage(
                 type="resource_update",
@@ -168,16 +378,35 @@ class Blackboard:
     
     def get_resource(self, category: str, name: str) -> Optional[str]:
         """获取共享资源"""
-        return self.resources.get(category, {}).get(name)
+        return self._snapshot.get_resource(category, name)
     
     def get_pending_tasks_for_agent(self, agent: AgentType) -> List[Task]:
         """获取指定智能体的待处理任务"""
-        return [t for t in self.tasks["pending"] if t.assigned_agent == agent]
+        return list(self._snapshot.pending_for(agent))
     
     def subscribe(self, event_type: str, callback: Callable) -> None:
-        """订阅事件"""
+        """订阅事件(批量发布的任务只通过 tasks_publish 通知)"""
         self._subscribers[event_type].append(callback)
     
+    def add_guard(self, guard: Callable[[List[Task]], None]) -> None:
+        """注册发布前检查，在锁内以待发布的整批任务调用"""
+        self._guards.append(guard)
+    
+    def _check_unique(self, tasks: List[Task]) -> None:
+        """已发布过的 id 会覆盖索引中的旧任务，必须在锁内拒绝"""
+        existing = [task.id for task in tasks if task.id in self._index]
+        if existing:
+            raise DuplicateTaskError(f"task ids already exist: {existing[:10]}")
+    
+    def _check_guards(self, tasks: List[Task]) -> None:
+        for guard in self._guards:
+            guard(tasks)
+    
+    def unsubscribe(self, event_type: str, callback: Callable) -> None:
+        """取消订阅"""
+        if callback in self._subscribers[event_type]:
+            self._subscribers[event_type].remove(callback)
+    
     async def _notify_subscribers(self, event_type: str, data: Any) -> None:
         """通知订阅者"""
         for callback in self._subscribers[event_type]:
@@ -188,21 +417,7 @@ class Blackboard:
     
     def get_summary(self) -> Dict[str, Any]:
         """获取黑板状态摘要"""
-        return {
-            "tasks": {
-                "pending": len(self.tasks["pending"]),
-                "running": len(self.tasks["running"]),
-                "completed": len(self.tasks["completed"]),
-            },
-            "resources": {
-                category: list(items.keys())
-                for category, items in self.resources.items()
-            },
-            "agent_status": {
-                agent.value: status
-                for agent, status in self.agent_status.items()
-            },
-        }
+        return self._snapshot.summary()
 
 
 # 全局黑板实例
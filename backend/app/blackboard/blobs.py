@@ -0,0 +1,121 @@
+"""
+Blob Store - 任务载荷的共享存储
+超过阈值的字符串(完整提示词、整份代码)按内容哈希只保存一份，
+任务输入/输出与消息历史中只保留句柄，读取时透明还原
+"""
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+import hashlib
+import sys
+
+from app import config
+
+
+class BlobRef:
+    """指向共享存储中一段内容的句柄(同一内容只有一个句柄实例)，size 为 UTF-8 字节数"""
+
+    __slots__ = ("handle", "size")
+
+    def __init__(self, handle: str, size: int):
+        self.handle = handle
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.handle!r}, size={self.size})"
+
+
+class BlobStore:
+    """
+    按内容寻址的载荷存储
+
+    与任务一样常驻内存、不做回收；重复出现的提示词与代码只占用一份空间
+    """
+
+    def __init__(self, threshold: int = config.BLOB_THRESHOLD):
+        self.threshold = threshold
+        self._blobs: Dict[str, Tuple[BlobRef, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    @property
+    def size(self) -> int:
+        """已保存内容的总字节数(UTF-8)"""
+        return sum(ref.size for ref, _ in self._blobs.values())
+
+    def put(self, value: str) -> BlobRef:
+        raw = value.encode("utf-8")
+        handle = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        entry = self._blobs.get(handle)
+        if entry is None:
+            entry = self._blobs[handle] = (BlobRef(handle, len(raw)), value)
+        return entry[0]
+
+    def get(self, ref: BlobRef) -> str:
+        return self._blobs[ref.handle][1]
+
+    def pack(self, data: Optional[Mapping[str, Any]]) -> Optional["Payload"]:
+        """把字典转换为载荷: 超过阈值的字符串换成句柄，键名驻留"""
+        if data is None:
+            return None
+        if isinstance(data, Payload) and data._store is self:
+            return data
+        packed = {}
+        for key, value in data.items():
+            if isinstance(value, BlobRef):
+                pass
+            elif isinstance(value, str) and len(value) > self.threshold:
+                value = self.put(value)
+            packed[sys.intern(key) if isinstance(key, str) else key] = value
+        return Payload(packed, self)
+
+
+class Payload(Mapping):
+    """
+    任务输入/输出载荷(只读映射)
+
+    取值时把句柄还原为原始字符串，可以像普通字典一样读取和比较；
+    不是 dict 子类，json/msgpack 等序列化前先调用 to_dict()
+    """
+
+    __slots__ = ("_data", "_store")
+
+    def __init__(self, data: Dict[str, Any], store: BlobStore):
+        self._data = data
+        self._store = store
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if isinstance(value, BlobRef):
+            return self._store.get(value)
+        return value
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"Payload({self._data!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原为普通字典(大字段读回原始字符串)"""
+        return {key: self[key] for key in self._data}
+
+    def raw(self) -> Dict[str, Any]:
+        """未还原的内容(大字段为 BlobRef)"""
+        return dict(self._data)
+
+    def nbytes(self) -> int:
+        """字符串字段的 UTF-8 字节数之和(转存的字段按句柄记录的大小计算，不需要读取内容)"""
+        total = 0
+        for value in self._data.values():
+            if isinstance(value, BlobRef):
+                total += value.size
+            elif isinstance(value, str):
+                total += len(value.encode("utf-8"))
+        return total
+
+
+# 全局载荷存储
+blob_store = BlobStore()
@@ -0,0 +1,356 @@
+"""
+Blackboard Snapshot - 黑板的不可变快照
+写入方在每批修改后发布新快照，读取方无需加锁即可得到一致视图
+"""
+from typing import Dict, Any, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+from dataclasses import dataclass, field, replace
+
+
+_MISSING = object()
+
+# HAMT 每层使用的哈希位数
+_BITS = 5
+_HASH_MASK = (1 << 64) - 1
+
+
+class _Node:
+    """HAMT 内部节点: bitmap 标记存在的分支，children 按位序紧凑存放(子节点或 (hash, key, value))"""
+
+    __slots__ = ("bitmap", "children")
+
+    def __init__(self, bitmap: int, children: tuple):
+        self.bitmap = bitmap
+        self.children = children
+
+
+class _Collision:
+    """64 位哈希完全相同的键"""
+
+    __slots__ = ("hash", "items")
+
+    def __init__(self, h: int, items: tuple):
+        self.hash = h
+        self.items = items
+
+
+_EMPTY = _Node(0, ())
+
+
+def _hash(key) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _lookup(node, h: int, key, shift: int = 0):
+    while True:
+        if isinstance(node, _Collision):
+            for k, v in node.items:
+                if k == key:
+                    return v
+            return _MISSING
+        bit = 1 << ((h >> shift) & 0x1F)
+        if not node.bitmap & bit:
+            return _MISSING
+        child = node.children[(node.bitmap & (bit - 1)).bit_count()]
+        if isinstance(child, tuple):
+            return child[2] if child[0] == h and (child[1] is key or child[1] == key) else _MISSING
+        node = child
+        shift += _BITS
+
+
+def _merge(a: tuple, b: tuple, shift: int):
+    """两个哈希前缀相同的条目下沉为新的子树"""
+    if shift >= 64:
+        return _Collision(a[0], ((a[1], a[2]), (b[1], b[2])))
+    ia = (a[0] >> shift) & 0x1F
+    ib = (b[0] >> shift) & 0x1F
+    if ia == ib:
+        return _Node(1 << ia, (_merge(a, b, shift + _BITS),))
+    return _Node((1 << ia) | (1 << ib), (a, b) if ia < ib else (b, a))
+
+
+def _assoc(node, h: int, key, value, shift: int = 0) -> Tuple[Any, bool]:
+    """返回 (新节点, 是否新增了键)，值未变化时返回原节点"""
+    if isinstance(node, _Collision):
+        items = tuple((k, v) for k, v in node.items if k != key)
+        return _Collision(h, items + ((key, value),)), len(items) == len(node.items)
+    bit = 1 << ((h >> shift) & 0x1F)
+    index = (node.bitmap & (bit - 1)).bit_count()
+    children = node.children
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, children[:index] + ((h, key, value),) + children[index:]), True
+    child = children[index]
+    if isinstance(child, tuple):
+        if child[0] == h and (child[1] is key or child[1] == key):
+            if child[2] is value:
+                return node, False
+            new_child, added = (h, key, value), False
+        else:
+            new_child, added = _merge(child, (h, key, value), shift + _BITS), True
+    else:
+        new_child, added = _assoc(child, h, key, value, shift + _BITS)
+        if new_child is child:
+            return node, False
+    return _Node(node.bitmap, children[:index] + (new_child,) + children[index + 1:]), added
+
+
+def _dissoc(node, h: int, key, shift: int = 0):
+    """返回删除键后的节点(子树为空时返回 None)，键不存在时返回原节点"""
+    if isinstance(node, _Collision):
+        items = tuple((k, v) for k, v in node.items if k != key)
+        if len(items) == len(node.items):
+            return node
+        return (h,) + items[0] if len(items) == 1 else _Collision(h, items)
+    bit = 1 << ((h >> shift) & 0x1F)
+    if not node.bitmap & bit:
+        return node
+    index = (node.bitmap & (bit - 1)).bit_count()
+    children = node.children
+    child = children[index]
+    if isinstance(child, tuple):
+        if not (child[0] == h and (child[1] is key or child[1] == key)):
+            return node
+        new_child = None
+    else:
+        new_child = _dissoc(child, h, key, shift + _BITS)
+        if new_child is child:
+            return node
+    if new_child is not None:
+        return _Node(node.bitmap, children[:index] + (new_child,) + children[index + 1:])
+    bitmap = node.bitmap & ~bit
+    children = children[:index] + children[index + 1:]
+    if not children:
+        return None
+    if shift and len(children) == 1 and isinstance(children[0], tuple):
+        # 只剩一个条目的子树收缩回父节点
+        return children[0]
+    return _Node(bitmap, children)
+
+
+def _walk(node) -> Iterator[Tuple[Any, Any]]:
+    if isinstance(node, _Collision):
+        yield from node.items
+        return
+    for child in node.children:
+        if isinstance(child, tuple):
+            yield child[1], child[2]
+        else:
+            yield from _walk(child)
+
+
+class FrozenMap(Mapping):
+    """
+    不可变映射
+
+    修改操作返回新实例，未修改的部分在新旧实例间共享：
+    不超过 SMALL 个键时是写时复制的 dict(保持插入顺序)，
+    更大时是哈希数组映射字典树(HAMT)，单次修改只复制 O(log n) 个节点
+    """
+
+    __slots__ = ("_data", "_root", "_len")
+
+    SMALL = 8
+
+    def __init__(self, data: Optional[Mapping] = None):
+        data = dict(data) if data else {}
+        self._data: Optional[dict] = data
+        self._root = None
+        self._len = len(data)
+        if len(data) > self.SMALL:
+            self._data, self._root = None, self._build(data.items())
+
+    @staticmethod
+    def _build(items: Iterable[Tuple[Any, Any]]):
+        root = _EMPTY
+        for key, value in items:
+            root, _ = _assoc(root, _hash(key), key, value)
+        return root
+
+    @classmethod
+    def _wrap(cls, data: Optional[dict], root=None, length: int = 0) -> "FrozenMap":
+        instance = cls.__new__(cls)
+        instance._data = data
+        instance._root = root
+        instance._len = len(data) if data is not None else length
+        return instance
+
+    def __getitem__(self, key):
+        if self._data is not None:
+            return self._data[key]
+        value = _lookup(self._root, _hash(key), key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator:
+        if self._data is not None:
+            return iter(self._data)
+        return (key for key, _ in _walk(self._root))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f"FrozenMap({dict(self.items())!r})"
+
+    def get(self, key, default=None):
+        if self._data is not None:
+            return self._data.get(key, default)
+        value = _lookup(self._root, _hash(key), key)
+        return default if value is _MISSING else value
+
+    def items(self):
+        if self._data is not None:
+            return self._data.items()
+        return list(_walk(self._root))
+
+    def set(self, key, value) -> "FrozenMap":
+        if self._data is not None:
+            if key in self._data or len(self._data) < self.SMALL:
+                data = dict(self._data)
+                data[key] = value
+                return FrozenMap._wrap(data)
+            root = self._build(self._data.items())
+        else:
+            root = self._root
+        root, added = _assoc(root, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return FrozenMap._wrap(None, root, self._len + added)
+
+    def update(self, changes: Mapping) -> "FrozenMap":
+        result = self
+        for key, value in changes.items():
+            result = result.set(key, value)
+        return result
+
+    def delete(self, key) -> "FrozenMap":
+        if self._data is not None:
+            if key not in self._data:
+                return self
+            data = dict(self._data)
+            del data[key]
+            return FrozenMap._wrap(data)
+        root = _dissoc(self._root, _hash(key), key)
+        if root is self._root:
+            return self
+        return FrozenMap._wrap(None, root if root is not None else _EMPTY, self._len - 1)
+
+
+class PersistentSeq(Sequence):
+    """
+    不可变序列
+
+    元素按块(每块最多 CHUNK 个)存放，追加与删除只复制受影响的块和块列表，
+    未修改的块在新旧实例间共享
+    """
+
+    __slots__ = ("_chunks", "_len")
+
+    CHUNK = 64
+
+    def __init__(self, items: Iterable = ()):
+        items = tuple(items)
+        self._chunks = tuple(items[i:i + self.CHUNK] for i in range(0, len(items), self.CHUNK))
+        self._len = len(items)
+
+    @classmethod
+    def _wrap(cls, chunks: tuple, length: int) -> "PersistentSeq":
+        instance = cls.__new__(cls)
+        instance._chunks = chunks
+        instance._len = length
+        return instance
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("index out of range")
+        for chunk in self._chunks:
+            if index < len(chunk):
+                return chunk[index]
+            index -= len(chunk)
+
+    def __repr__(self) -> str:
+        return f"PersistentSeq({list(self)!r})"
+
+    def append(self, item) -> "PersistentSeq":
+        chunks = self._chunks
+        if chunks and len(chunks[-1]) < self.CHUNK:
+            chunks = chunks[:-1] + (chunks[-1] + (item,),)
+        else:
+            chunks = chunks + ((item,),)
+        return PersistentSeq._wrap(chunks, self._len + 1)
+
+    def extend(self, items: Iterable) -> "PersistentSeq":
+        items = tuple(items)
+        if not items:
+            return self
+        length = self._len + len(items)
+        chunks = list(self._chunks)
+        if chunks and len(chunks[-1]) < self.CHUNK:
+            room = self.CHUNK - len(chunks[-1])
+            chunks[-1] += items[:room]
+            items = items[room:]
+        chunks.extend(items[i:i + self.CHUNK] for i in range(0, len(items), self.CHUNK))
+        return PersistentSeq._wrap(tuple(chunks), length)
+
+    def remove(self, item) -> "PersistentSeq":
+        """删除第一个等于 item 的元素，不存在时抛出 ValueError"""
+        for i, chunk in enumerate(self._chunks):
+            try:
+                j = chunk.index(item)
+            except ValueError:
+                continue
+            chunk = chunk[:j] + chunk[j + 1:]
+            chunks = self._chunks[:i] + ((chunk,) if chunk else ()) + self._chunks[i + 1:]
+            return PersistentSeq._wrap(chunks, self._len - 1)
+        raise ValueError("item not in sequence")
+
+
+@dataclass(frozen=True)
+class BlackboardSnapshot:
+    """
+    某一版本的黑板状态
+
+    - counts: 各状态任务数(由写入方增量维护)
+    - pending_by_agent: 智能体 -> 待处理任务(PersistentSeq)
+    - resources: 类别 -> (名称 -> 值)
+    - agent_status: 智能体 -> 状态
+    """
+    version: int = 0
+    counts: FrozenMap = field(default_factory=FrozenMap)
+    pending_by_agent: FrozenMap = field(default_factory=FrozenMap)
+    resources: FrozenMap = field(default_factory=FrozenMap)
+    agent_status: FrozenMap = field(default_factory=FrozenMap)
+
+    def evolve(self, **changes: Any) -> "BlackboardSnapshot":
+        """基于当前快照生成下一个版本"""
+        return replace(self, version=self.version + 1, **changes)
+
+    def get_resource(self, category: str, name: str) -> Optional[str]:
+        return self.resources.get(category, FrozenMap()).get(name)
+
+    def pending_for(self, agent) -> Sequence:
+        return self.pending_by_agent.get(agent, ())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tasks": dict(self.counts),
+            "resources": {
+                category: list(items.keys())
+                for category, items in self.resources.items()
+            },
+            "agent_status": {
+                agent.value: status
+                for agent, status in self.agent_status.items()
+            },
+        }
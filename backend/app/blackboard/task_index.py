@@ -0,0 +1,123 @@
+"""
+Task Index - 按空间索引的任务存储
+为任务分配递增序号，按 (空间, 状态/智能体/类型) 维护有序序号列表，
+支持按条件过滤的游标分页；各状态的任务数由计数器维护，不需要全量扫描
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+from collections import Counter, defaultdict
+import bisect
+import itertools
+
+if TYPE_CHECKING:
+    from app.blackboard.blackboard import AgentType, Task, TaskStatus, TaskType
+
+
+# 索引键: (space_id, 字段, 值)，字段为 "all" 时包含空间内全部任务
+IndexKey = Tuple[Optional[str], str, Any]
+
+
+class TaskIndex:
+    """
+    任务索引
+
+    - 游标是任务序号，下一页从游标之后开始，翻页期间新发布的任务不会导致重复或遗漏
+    - 多个过滤条件时选择最短的序号列表遍历，再用其余条件逐个检查
+    """
+
+    def __init__(self, statuses: Iterable["TaskStatus"] = ()):
+        # 计数结果中总是包含的状态(没有任务时为 0)
+        self.statuses = tuple(statuses)
+        self._next_seq = itertools.count(1)
+        self._by_id: Dict[str, "Task"] = {}
+        self._seq_of: Dict[str, int] = {}
+        self._by_seq: Dict[int, "Task"] = {}
+        self._lists: Dict[IndexKey, List[int]] = defaultdict(list)
+        self._counts: Dict[Optional[str], Counter] = defaultdict(Counter)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._by_id
+
+    def add(self, task: "Task") -> int:
+        """索引新任务，返回序号"""
+        seq = next(self._next_seq)
+        self._by_id[task.id] = task
+        self._seq_of[task.id] = seq
+        self._by_seq[seq] = task
+        space = task.space_id
+        for key in (
+            (space, "all", None),
+            (space, "status", task.status),
+            (space, "agent", task.assigned_agent),
+            (space, "type", task.type),
+        ):
+            # 新序号总是最大的，直接追加即可保持有序
+            self._lists[key].append(seq)
+        self._counts[space][task.status] += 1
+        return seq
+
+    def set_status(self, task: "Task", status: "TaskStatus") -> None:
+        """修改任务状态并同步状态索引与计数"""
+        previous = task.status
+        task.status = status
+        seq = self._seq_of.get(task.id)
+        if seq is None or previous == status:
+            return
+        space = task.space_id
+        old = self._lists[(space, "status", previous)]
+        del old[bisect.bisect_left(old, seq)]
+        bisect.insort(self._lists[(space, "status", status)], seq)
+        self._counts[space][previous] -= 1
+        self._counts[space][status] += 1
+
+    def get(self, task_id: str) -> Optional["Task"]:
+        return self._by_id.get(task_id)
+
+    def counts(self, space_id: Optional[str]) -> Dict[str, int]:
+        """空间内各状态的任务数"""
+        counter = self._counts.get(space_id, Counter())
+        counts = {status.value: 0 for status in self.statuses}
+        counts.update({status.value: n for status, n in counter.items()})
+        return counts
+
+    def query(
+        self,
+        space_id: Optional[str],
+        status: Optional["TaskStatus"] = None,
+        agent: Optional["AgentType"] = None,
+        task_type: Optional["TaskType"] = None,
+        after: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List["Task"], Optional[int]]:
+        """按创建顺序返回序号大于 after 的任务，以及下一页游标(没有更多时为 None)"""
+        filters = [
+            (field, value)
+            for field, value in (("status", status), ("agent", agent), ("type", task_type))
+            if value is not None
+        ]
+        candidates = [self._lists.get((space_id, field, value), []) for field, value in filters]
+        seqs = min(candidates, key=len) if candidates else self._lists.get((space_id, "all", None), [])
+
+        results: List["Task"] = []
+        for i in range(bisect.bisect_right(seqs, after), len(seqs)):
+            task = self._by_seq[seqs[i]]
+            if self._matches(task, status, agent, task_type):
+                if len(results) == limit:
+                    return results, self._seq_of[results[-1].id]
+                results.append(task)
+        return results, None
+
+    @staticmethod
+    def _matches(
+        task: "Task",
+        status: Optional["TaskStatus"],
+        agent: Optional["AgentType"],
+        task_type: Optional["TaskType"],
+    ) -> bool:
+        return (
+            (status is None or task.status == status)
+            and (agent is None or task.assigned_agent == agent)
+            and (task_type is None or task.type == task_type)
+        )
@@ -0,0 +1,71 @@
+"""
+Micro Batcher - 把短时间窗口内的单条请求合并为一次批量调用
+"""
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+import asyncio
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    请求合批
+
+    第一条请求到达后最多等待 window 秒，或攒满 max_batch 条立即发出；
+    batch_fn 必须按输入顺序返回等长的结果列表
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch: int = 16,
+        window: float = 0.005,
+    ):
+        self._batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.window = window
+        self._items: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # 进行中的批量调用(保留引用，避免任务在执行中被回收)
+        self._runs: Set[asyncio.Task] = set()
+        self.batches = 0
+
+    async def submit(self, item: T) -> R:
+        future = asyncio.get_running_loop().create_future()
+        self._items.append((item, future))
+        if len(self._items) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._items = self._items, []
+        if items:
+            self.batches += 1
+            run = asyncio.get_running_loop().create_task(self._run(items))
+            self._runs.add(run)
+            run.add_done_callback(self._runs.discard)
+
+    async def close(self) -> None:
+        """立即发出积攒的请求，并等待所有进行中的批量调用结束"""
+        self._flush()
+        await asyncio.gather(*self._runs, return_exceptions=True)
+
+    async def _run(self, items: List[Tuple[T, asyncio.Future]]) -> None:
+        try:
+            results: List[Any] = await self._batch_fn([item for item, _ in items])
+            if len(results) != len(items):
+                raise ValueError("batch result size mismatch")
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,228 @@
+"""
+Model Client - 共享的外部模型调用层
+连接池 + HTTP/2 长连接、按服务商限流、请求合批、抖动重试与对冲请求
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass
+import asyncio
+import importlib.util
+import random
+
+import httpx
+
+from app import config
+from app.accounting.accountant import accountant
+from app.clients.batching import MicroBatcher
+from app.clock import clock
+from app.lifecycle import lifecycle
+
+
+# 安装 h2 后启用 HTTP/2，否则回退到 HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 这些状态码视为可重试
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class ModelClientError(Exception):
+    """模型调用最终失败"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class ProviderConfig:
+    name: str
+    base_url: str
+    api_key: Optional[str] = None
+    # 同时在途的请求数上限
+    max_concurrency: int = 16
+    timeout: float = 60.0
+    max_retries: int = 3
+    backoff_base: float = 0.2
+    backoff_max: float = 5.0
+    # 超过该秒数仍未返回时再发一个对冲请求，None 表示不对冲
+    hedge_after: Optional[float] = None
+    embedding_batch_size: int = 64
+    embedding_batch_window: float = 0.005
+
+
+@dataclass
+class ClientStats:
+    requests: int = 0
+    retries: int = 0
+    hedges: int = 0
+    failures: int = 0
+    tokens: int = 0
+
+
+class ModelClient:
+    """单个服务商的客户端，所有智能体共享同一个连接池"""
+
+    def __init__(
+        self,
+        provider: ProviderConfig,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.provider = provider
+        self.stats = ClientStats()
+        self._rng = rng or random.Random()
+        self._semaphore = asyncio.Semaphore(provider.max_concurrency)
+        headers = {}
+        if provider.api_key:
+            headers["Authorization"] = f"Bearer {provider.api_key}"
+        self._http = httpx.AsyncClient(
+            base_url=provider.base_url,
+            headers=headers,
+            http2=HTTP2_AVAILABLE and transport is None,
+            timeout=provider.timeout,
+            limits=httpx.Limits(
+                max_connections=provider.max_concurrency * 2,
+                max_keepalive_connections=provider.max_concurrency,
+            ),
+            transport=transport,
+        )
+        self._embed_batcher: MicroBatcher[str, List[float]] = MicroBatcher(
+            self._embed_batch,
+            max_batch=provider.embedding_batch_size,
+            window=provider.embedding_batch_window,
+        )
+
+    async def aclose(self) -> None:
+        await self._embed_batcher.close()
+        await self._http.aclose()
+
+    # --- 接口 ---
+
+    async def chat(self, messages: List[Dict[str, Any]], model: str, **params: Any) -> Dict[str, Any]:
+        """对话补全"""
+        return await self.post("/v1/chat/completions", {"model": model, "messages": messages, **params})
+
+    async def generate_image(self, prompt: str, model: str, size: str = "256x256") -> Dict[str, Any]:
+        """图像生成"""
+        return await self.post("/v1/images/generations", {"model": model, "prompt": prompt, "size": size})
+
+    async def embed(self, text: str) -> List[float]:
+        """单条文本向量，短时间内的多次调用会合并为一次批量请求"""
+        return await self._embed_batcher.submit(text)
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        response = await self.post("/v1/embeddings", {"model": "embedding", "input": texts})
+        data = sorted(response["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    # --- 调用与容错 ---
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """发送请求，失败时按指数退避 + 全抖动重试"""
+        last_error: Optional[ModelClientError] = None
+        for attempt in range(self.provider.max_retries + 1):
+            if attempt:
+                self.stats.retries += 1
+                await clock.sleep(self._backoff(attempt))
+            try:
+                response = await self._hedged(lambda: self._send(path, payload))
+            except httpx.TransportError as e:
+                last_error = ModelClientError(f"{self.provider.name}: {e!r}")
+                continue
+            if response.status_code in RETRY_STATUS:
+                last_error = ModelClientError(
+                    f"{self.provider.name}: HTTP {response.status_code}", response.status_code
+                )
+                continue
+            if response.is_error:
+                self.stats.failures += 1
+                raise ModelClientError(
+                    f"{self.provider.name}: HTTP {response.status_code}", response.status_code
+                )
+            body = response.json()
+            self._record_usage(body)
+            return body
+        self.stats.failures += 1
+        raise last_error
+
+    def _record_usage(self, body: Any) -> None:
+        """按响应中的 usage 字段计入当前空间的 token 用量"""
+        usage = body.get("usage") if isinstance(body, dict) else None
+        tokens = usage.get("total_tokens", 0) if isinstance(usage, dict) else 0
+        if tokens:
+            self.stats.tokens += tokens
+            accountant.charge_tokens(tokens)
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(self.provider.backoff_max, self.provider.backoff_base * 2 ** (attempt - 1))
+        return self._rng.uniform(0, cap)
+
+    async def _send(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        async with self._semaphore:
+            self.stats.requests += 1
+            return await self._http.post(path, json=payload)
+
+    async def _hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """对冲请求: 首个请求迟迟不返回时再发一个，取先成功的结果"""
+        hedge_after = self.provider.hedge_after
+        if hedge_after is None:
+            return await send()
+
+        first = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        self.stats.hedges += 1
+        pending = {first, asyncio.ensure_future(send())}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class ModelClientRegistry:
+    """按服务商名称复用客户端"""
+
+    def __init__(self):
+        self._providers: Dict[str, ProviderConfig] = {}
+        self._clients: Dict[str, ModelClient] = {}
+
+    def register(self, provider: ProviderConfig) -> None:
+        self._providers[provider.name] = provider
+
+    def get(self, name: str) -> ModelClient:
+        """首次使用时才创建客户端(及其连接池)"""
+        client = self._clients.get(name)
+        if client is None:
+            if name not in self._providers:
+                raise KeyError(f"unknown model provider: {name}")
+            client = self._clients[name] = ModelClient(self._providers[name])
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+# 全局模型客户端
+model_clients = ModelClientRegistry()
+model_clients.register(ProviderConfig(
+    name="openai",
+    base_url=config.MODEL_BASE_URL,
+    api_key=config.MODEL_API_KEY,
+    max_concurrency=config.MODEL_MAX_CONCURRENCY,
+))
+
+
+@lifecycle.on_shutdown("model_clients")
+async def _close_model_clients() -> None:
+    await model_clients.aclose()
@@ -0,0 +1,134 @@
+"""
+Stub Model Server - 本地模拟的 LLM / 图像生成服务
+接口兼容 OpenAI 的子集，可配置延迟、长尾与错误率，用于离线压测
+
+运行: python -m app.clients.stub_server --port 9000 --latency 0.2 --tail-rate 0.05
+然后设置 OPENAI_BASE_URL=http://127.0.0.1:9000
+"""
+from typing import Any, Dict, List
+from dataclasses import dataclass
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.search.vector import HashingEmbedder
+
+
+@dataclass
+class StubSettings:
+    latency: float = 0.05
+    jitter: float = 0.0
+    # 以 tail_rate 的概率额外等待 tail_latency 秒，模拟长尾
+    tail_rate: float = 0.0
+    tail_latency: float = 1.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+def create_stub_app(settings: StubSettings = None) -> FastAPI:
+    settings = settings or StubSettings()
+    rng = random.Random(settings.seed)
+    embedder = HashingEmbedder(dim=64)
+    app = FastAPI(title="AntiGravity Model Stub")
+    app.state.settings = settings
+    app.state.calls = {"chat": 0, "embeddings": 0, "images": 0}
+
+    async def simulate(request: Request):
+        """按配置等待；请求头 x-stub-latency 可覆盖本次延迟"""
+        delay = float(request.headers.get("x-stub-latency", settings.latency))
+        delay += rng.uniform(0, settings.jitter)
+        if rng.random() < settings.tail_rate:
+            delay += settings.tail_latency
+        await asyncio.sleep(delay)
+        if rng.random() < settings.error_rate:
+            return JSONResponse({"error": {"message": "stub overloaded"}}, status_code=503)
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls["chat"] += 1
+        error = await simulate(request)
+        if error is not None:
+            return error
+        prompt = body["messages"][-1]["content"] if body.get("messages") else ""
+        content = f"extends RigidBody2D\n\n# {prompt}\nfunc _ready():\n    mass = 2.0\n"
+        return {
+            "id": f"stub-{time.time_ns()}",
+            "object": "chat.completion",
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt),
+                "completion_tokens": len(content),
+                "total_tokens": len(prompt) + len(content),
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        app.state.calls["embeddings"] += 1
+        error = await simulate(request)
+        if error is not None:
+            return error
+        inputs: List[str] = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data: List[Dict[str, Any]] = [
+            {"index": i, "object": "embedding", "embedding": embedder.embed(text).tolist()}
+            for i, text in enumerate(inputs)
+        ]
+        return {"object": "list", "data": data, "model": body.get("model", "stub")}
+
+    @app.post("/v1/images/generations")
+    async def images(request: Request):
+        body = await request.json()
+        app.state.calls["images"] += 1
+        error = await simulate(request)
+        if error is not None:
+            return error
+        size = body.get("size", "256x256")
+        return {
+            "created": int(time.time()),
+            "data": [{"url": f"https://via.placeholder.com/{size}/8B5CF6/ffffff?text=Stub"}],
+        }
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "calls": app.state.calls}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="本地模型 stub 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(create_stub_app(settings), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Clock - 可替换的时钟与虚拟时间事件循环
+业务代码通过 clock 读取时间、等待与生成随机数；在 VirtualTimeEventLoop 中运行时，
+时间是虚拟的(没有就绪回调时直接跳到下一个定时器)，随机数来自固定种子，
+数千个工作流可以在几秒内确定性地跑完
+"""
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from datetime import datetime
+import asyncio
+import random
+import selectors
+import time
+import uuid
+
+
+T = TypeVar("T")
+
+# 虚拟时间 0 对应的墙钟时间(2024-01-01T00:00:00Z)，保证多次运行的时间戳一致
+VIRTUAL_EPOCH = 1_704_067_200.0
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """只轮询真实 IO，不为定时器阻塞；需要等待时由事件循环推进虚拟时间"""
+
+    loop: Optional["VirtualTimeEventLoop"] = None
+
+    def select(self, timeout: Optional[float] = None):
+        loop = self.loop
+        if loop is None or loop.executor_jobs:
+            # 线程池中有真实工作(沙箱、文件读写)时阻塞等待其完成，虚拟时间不前进，避免虚拟超时提前触发
+            return super().select(None if loop is not None and timeout != 0 else timeout)
+        events = super().select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # 没有定时器也没有后台工作，只能等待真实 IO
+            return super().select(None)
+        loop.advance(timeout)
+        return []
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    虚拟时间事件循环
+
+    - loop.time() 返回虚拟时间，asyncio.sleep / wait_for / call_later 都按虚拟时间计算
+    - 线程池中的任务视为瞬间完成: 等待期间虚拟时间不前进
+    - random 为固定种子的随机数生成器，clock.random() / clock.uuid4() 使用它
+    """
+
+    def __init__(self, seed: int = 0, epoch: float = VIRTUAL_EPOCH):
+        self._virtual_time = 0.0
+        self.executor_jobs = 0
+        self.epoch = epoch
+        self.random = random.Random(seed)
+        selector = _VirtualSelector()
+        super().__init__(selector)
+        selector.loop = self
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float) -> None:
+        """推进虚拟时间"""
+        if seconds > 0:
+            self._virtual_time += seconds
+
+    def run_in_executor(self, executor, func: Callable[..., T], *args: Any) -> "asyncio.Future[T]":
+        future = super().run_in_executor(executor, func, *args)
+        self.executor_jobs += 1
+
+        def finished(_: asyncio.Future) -> None:
+            self.executor_jobs -= 1
+
+        future.add_done_callback(finished)
+        return future
+
+
+def run_virtual(main: Awaitable[T], seed: int = 0) -> T:
+    """在新的虚拟时间事件循环中运行协程(类似 asyncio.run，但不替换当前线程的事件循环)"""
+    with asyncio.Runner(loop_factory=lambda: VirtualTimeEventLoop(seed)) as runner:
+        return runner.run(main)
+
+
+class Clock:
+    """
+    时钟
+
+    读取当前运行的事件循环: 普通事件循环下是系统时间，虚拟时间事件循环下是虚拟时间
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    @staticmethod
+    def _virtual() -> Optional[VirtualTimeEventLoop]:
+        loop = asyncio._get_running_loop()
+        return loop if isinstance(loop, VirtualTimeEventLoop) else None
+
+    @property
+    def virtual(self) -> bool:
+        return self._virtual() is not None
+
+    def time(self) -> float:
+        """墙钟时间(秒)"""
+        loop = self._virtual()
+        return loop.epoch + loop.time() if loop is not None else time.time()
+
+    def monotonic(self) -> float:
+        """单调时间(秒)，用于计算耗时"""
+        loop = self._virtual()
+        return loop.time() if loop is not None else time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+    def random(self) -> random.Random:
+        loop = self._virtual()
+        return loop.random if loop is not None else self._rng
+
+    def uuid4(self) -> uuid.UUID:
+        loop = self._virtual()
+        if loop is None:
+            return uuid.uuid4()
+        return uuid.UUID(int=loop.random.getrandbits(128), version=4)
+
+
+# 全局时钟
+clock = Clock()
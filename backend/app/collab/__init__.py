@@ -0,0 +1 @@
+"""Init file for collab package"""
@@ -0,0 +1,377 @@
+"""
+Canvas CRDT - 画布节点与连线的无冲突复制文档
+参考 Yjs 的状态向量同步思路，纯 Python 实现
+
+- 每个副本拥有随机 client_id，本地操作按 clock 递增编号
+- 同一键的并发写入按 (lamport, client_id) 取最后写入者 (LWW)
+- 状态向量记录每个副本已见到的最大 clock，用于计算增量
+- 更新采用紧凑的二进制编码 (varint + 长度前缀)
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
+from collections import defaultdict
+import bisect
+import json
+import random
+
+
+# 文档中的集合类型
+NODES = 0
+EDGES = 1
+
+_KIND_NAMES = {"nodes": NODES, "edges": EDGES}
+
+# 二进制格式版本
+_UPDATE_VERSION = 1
+
+
+# 每个文档最多暂存的等待前置更新的操作数
+MAX_PENDING_OPS = 10_000
+
+
+class CanvasDecodeError(ValueError):
+    """二进制更新或状态向量无法解析"""
+
+
+class CanvasPendingOverflow(CanvasDecodeError):
+    """暂存的乱序更新超过上限，客户端应重新同步"""
+
+
+@dataclass
+class Op:
+    """单个画布操作，value 为 None 表示删除"""
+    client: int
+    clock: int
+    lamport: int
+    kind: int
+    key: str
+    value: Optional[Any] = None
+
+    @property
+    def deleted(self) -> bool:
+        return self.value is None
+
+    def wins_over(self, other: "Op") -> bool:
+        return (self.lamport, self.client) > (other.lamport, other.client)
+
+
+@dataclass
+class _Run:
+    """某个副本在 (start, end] 区间内的操作"""
+    client: int
+    start: int
+    end: int
+    ops: List[Op]
+
+
+# ---------------------------------------------------------------------------
+# 二进制编码
+# ---------------------------------------------------------------------------
+
+def _write_varint(buf: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError("varint must be non-negative")
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _write_bytes(buf: bytearray, data: bytes) -> None:
+    _write_varint(buf, len(data))
+    buf.extend(data)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        self._pos = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pos >= len(self._data)
+
+    def read_byte(self) -> int:
+        if self._pos >= len(self._data):
+            raise CanvasDecodeError("unexpected end of update")
+        value = self._data[self._pos]
+        self._pos += 1
+        return value
+
+    def read_varint(self) -> int:
+        result = 0
+        shift = 0
+        while True:
+            byte = self.read_byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+            if shift > 63:
+                raise CanvasDecodeError("varint too long")
+
+    def read_bytes(self) -> bytes:
+        length = self.read_varint()
+        end = self._pos + length
+        if end > len(self._data):
+            raise CanvasDecodeError("unexpected end of update")
+        value = bytes(self._data[self._pos:end])
+        self._pos = end
+        return value
+
+    def read_str(self) -> str:
+        try:
+            return self.read_bytes().decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise CanvasDecodeError(str(e)) from e
+
+
+def encode_state_vector(state_vector: Dict[int, int]) -> bytes:
+    """编码状态向量"""
+    buf = bytearray()
+    _write_varint(buf, len(state_vector))
+    for client, clock in sorted(state_vector.items()):
+        _write_varint(buf, client)
+        _write_varint(buf, clock)
+    return bytes(buf)
+
+
+def decode_state_vector(data: bytes) -> Dict[int, int]:
+    """解码状态向量，空字节表示空向量"""
+    if not data:
+        return {}
+    reader = _Reader(data)
+    return {
+        reader.read_varint(): reader.read_varint()
+        for _ in range(reader.read_varint())
+    }
+
+
+def _encode_runs(runs: List[_Run]) -> bytes:
+    buf = bytearray([_UPDATE_VERSION])
+    _write_varint(buf, len(runs))
+    for run in runs:
+        _write_varint(buf, run.client)
+        _write_varint(buf, run.start)
+        _write_varint(buf, run.end)
+        _write_varint(buf, len(run.ops))
+        prev_clock = run.start
+        for op in run.ops:
+            # clock 在单个 run 内单调递增，存增量更紧凑
+            _write_varint(buf, op.clock - prev_clock)
+            prev_clock = op.clock
+            _write_varint(buf, op.lamport)
+            buf.append((op.kind << 1) | int(op.deleted))
+            _write_bytes(buf, op.key.encode("utf-8"))
+            if not op.deleted:
+                _write_bytes(buf, json.dumps(
+                    op.value, ensure_ascii=False, separators=(",", ":")
+                ).encode("utf-8"))
+    return bytes(buf)
+
+
+def _decode_runs(data: bytes) -> List[_Run]:
+    reader = _Reader(data)
+    version = reader.read_byte()
+    if version != _UPDATE_VERSION:
+        raise CanvasDecodeError(f"unsupported update version: {version}")
+    runs = []
+    for _ in range(reader.read_varint()):
+        client = reader.read_varint()
+        start = reader.read_varint()
+        end = reader.read_varint()
+        ops = []
+        clock = start
+        for _ in range(reader.read_varint()):
+            clock += reader.read_varint()
+            lamport = reader.read_varint()
+            info = reader.read_byte()
+            key = reader.read_str()
+            value = None
+            if not info & 1:
+                try:
+                    value = json.loads(reader.read_bytes())
+                except ValueError as e:
+                    raise CanvasDecodeError(str(e)) from e
+            if clock > end:
+                raise CanvasDecodeError("op clock outside of run range")
+            ops.append(Op(client, clock, lamport, info >> 1, key, value))
+        runs.append(_Run(client, start, end, ops))
+    if not reader.exhausted:
+        raise CanvasDecodeError("trailing bytes in update")
+    return runs
+
+
+# ---------------------------------------------------------------------------
+# 文档
+# ---------------------------------------------------------------------------
+
+class CanvasDocument:
+    """
+    画布协同文档
+
+    nodes / edges 两个 LWW 映射，支持:
+    - 本地修改并生成二进制更新
+    - 应用远端更新(幂等、可乱序，缺口会暂存等待补齐)
+    - 按状态向量计算缺失的增量
+    - 压缩已被覆盖的历史操作
+    """
+
+    def __init__(self, client_id: Optional[int] = None, max_pending: int = MAX_PENDING_OPS):
+        self.client_id = client_id if client_id is not None else random.getrandbits(32)
+        self.max_pending = max_pending
+        self._lamport = 0
+        self._state_vector: Dict[int, int] = {}
+        # client -> 按 clock 排序的操作
+        self._ops: Dict[int, List[Op]] = defaultdict(list)
+        # (kind, key) -> 当前生效的操作
+        self._winners: Dict[Tuple[int, str], Op] = {}
+        # 等待前置更新的 run 及其中的操作数
+        self._pending: List[_Run] = []
+        self._pending_ops = 0
+        # 已被覆盖但尚未压缩的操作数
+        self.garbage = 0
+
+    # --- 读取 ---
+
+    @property
+    def state_vector(self) -> Dict[int, int]:
+        return dict(self._state_vector)
+
+    @property
+    def nodes(self) -> Dict[str, Any]:
+        return self._collection(NODES)
+
+    @property
+    def edges(self) -> Dict[str, Any]:
+        return self._collection(EDGES)
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def op_count(self) -> int:
+        return sum(len(ops) for ops in self._ops.values())
+
+    def _collection(self, kind: int) -> Dict[str, Any]:
+        return {
+            key: op.value
+            for (op_kind, key), op in self._winners.items()
+            if op_kind == kind and not op.deleted
+        }
+
+    def to_json(self) -> Dict[str, Dict[str, Any]]:
+        """导出为普通 JSON 结构(供 REST 或旧客户端使用)"""
+        return {"nodes": self.nodes, "edges": self.edges}
+
+    # --- 本地修改 ---
+
+    def set(self, collection: str, key: str, value: Any) -> bytes:
+        """写入节点或连线，返回可广播的二进制更新"""
+        if value is None:
+            raise ValueError("use delete() to remove entries")
+        return self._local_op(_KIND_NAMES[collection], key, value)
+
+    def delete(self, collection: str, key: str) -> bytes:
+        """删除节点或连线，返回可广播的二进制更新"""
+        return self._local_op(_KIND_NAMES[collection], key, None)
+
+    def _local_op(self, kind: int, key: str, value: Optional[Any]) -> bytes:
+        start = self._state_vector.get(self.client_id, 0)
+        self._lamport += 1
+        op = Op(self.client_id, start + 1, self._lamport, kind, key, value)
+        run = _Run(self.client_id, start, op.clock, [op])
+        self._apply_run(run)
+        return _encode_runs([run])
+
+    # --- 同步 ---
+
+    def apply_update(self, update: bytes) -> bool:
+        """
+        应用二进制更新，返回文档是否发生变化
+
+        暂存的操作超过 max_pending 时丢弃新的乱序部分并抛出 CanvasPendingOverflow
+        (可以应用的部分已经合并)
+        """
+        runs = _decode_runs(update)
+        changed = False
+        overflow = False
+        for run in runs:
+            if self._can_apply(run):
+                changed |= self._apply_run(run)
+            elif self._pending_ops + len(run.ops) > self.max_pending:
+                overflow = True
+            else:
+                self._pending.append(run)
+                self._pending_ops += len(run.ops)
+        if self._pending:
+            changed |= self._drain_pending()
+        if overflow:
+            raise CanvasPendingOverflow(f"more than {self.max_pending} pending operations")
+        return changed
+
+    def encode_state_vector(self) -> bytes:
+        return encode_state_vector(self._state_vector)
+
+    def encode_state_as_update(self, remote_state_vector: Optional[bytes] = None) -> bytes:
+        """计算远端缺失的增量；不传状态向量时返回完整状态"""
+        remote = decode_state_vector(remote_state_vector or b"")
+        runs = []
+        for client, clock in sorted(self._state_vector.items()):
+            start = remote.get(client, 0)
+            if start >= clock:
+                continue
+            ops = self._ops.get(client, [])
+            index = bisect.bisect_right(ops, start, key=lambda op: op.clock)
+            runs.append(_Run(client, start, clock, ops[index:]))
+        return _encode_runs(runs)
+
+    def compact(self) -> int:
+        """丢弃已被覆盖的历史操作，返回移除的操作数"""
+        removed = 0
+        for client, ops in self._ops.items():
+            kept = [op for op in ops if self._winners.get((op.kind, op.key)) is op]
+            removed += len(ops) - len(kept)
+            self._ops[client] = kept
+        self.garbage = 0
+        return removed
+
+    def _can_apply(self, run: _Run) -> bool:
+        return run.start <= self._state_vector.get(run.client, 0)
+
+    def _apply_run(self, run: _Run) -> bool:
+        known = self._state_vector.get(run.client, 0)
+        changed = False
+        for op in run.ops:
+            if op.clock <= known:
+                continue
+            changed |= self._integrate(op)
+        if run.end > known:
+            self._state_vector[run.client] = run.end
+        return changed
+
+    def _drain_pending(self) -> bool:
+        changed = False
+        progress = True
+        while progress and self._pending:
+            progress = False
+            for run in list(self._pending):
+                if self._can_apply(run):
+                    self._pending.remove(run)
+                    self._pending_ops -= len(run.ops)
+                    changed |= self._apply_run(run)
+                    progress = True
+        return changed
+
+    def _integrate(self, op: Op) -> bool:
+        self._lamport = max(self._lamport, op.lamport)
+        self._ops[op.client].append(op)
+        slot = (op.kind, op.key)
+        current = self._winners.get(slot)
+        if current is None or op.wins_over(current):
+            self._winners[slot] = op
+            if current is not None:
+                self.garbage += 1
+            return True
+        self.garbage += 1
+        return False
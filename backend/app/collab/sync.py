@@ -0,0 +1,170 @@
+"""
+Canvas Sync - 每个工作空间一份画布 CRDT 文档
+负责状态向量握手、更新合并、周期性压缩与快照持久化
+"""
+from typing import Dict, Any, Optional, Tuple
+from pathlib import Path
+from urllib.parse import quote
+import asyncio
+import logging
+import os
+
+from app import config
+from app.clock import clock
+from app.collab.crdt import CanvasDocument
+from app.lifecycle import lifecycle
+
+
+logger = logging.getLogger(__name__)
+
+
+class CanvasSyncManager:
+    """
+    画布同步管理器
+
+    - 文档按需从快照加载
+    - 客户端发送状态向量，服务端只返回缺失的更新
+    - 有改动的文档每 flush_interval 秒写一次快照，文件写入在线程中完成，不阻塞事件循环
+    - 写快照前若累计了 compact_every 次操作则先压缩文档
+    """
+
+    def __init__(
+        self,
+        snapshot_dir: Optional[Path] = None,
+        compact_every: int = config.CANVAS_COMPACT_EVERY,
+        flush_interval: float = config.CANVAS_FLUSH_INTERVAL,
+    ):
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir is not None else None
+        self.compact_every = compact_every
+        self.flush_interval = flush_interval
+        self._docs: Dict[str, CanvasDocument] = {}
+        # space_id -> 上次写快照后的更新次数
+        self._dirty: Dict[str, int] = {}
+        # space_id -> 上次压缩后累计的更新次数
+        self._uncompacted: Dict[str, int] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def get_document(self, space_id: str) -> CanvasDocument:
+        """获取工作空间的画布文档，首次访问时从快照恢复"""
+        doc = self._docs.get(space_id)
+        if doc is None:
+            doc = CanvasDocument()
+            snapshot = self._load_snapshot(space_id)
+            if snapshot:
+                doc.apply_update(snapshot)
+            self._docs[space_id] = doc
+        return doc
+
+    def sync_step(self, space_id: str, state_vector: bytes) -> Tuple[bytes, bytes]:
+        """
+        同步握手
+
+        返回 (客户端缺失的更新, 服务端状态向量)，
+        客户端据此把服务端缺失的本地更新再发回来
+        """
+        doc = self.get_document(space_id)
+        return doc.encode_state_as_update(state_vector), doc.encode_state_vector()
+
+    def apply_update(self, space_id: str, update: bytes) -> bool:
+        """合并客户端发来的二进制更新"""
+        try:
+            return self.get_document(space_id).apply_update(update)
+        finally:
+            # 暂存溢出时可应用的部分已经合并，同样需要写入快照
+            self._mark_dirty(space_id)
+
+    def apply_legacy(self, space_id: str, data: Dict[str, Any]) -> Optional[bytes]:
+        """
+        兼容旧版 JSON canvas_update: {nodeId, position, ...}
+        合并到文档并返回对应的二进制更新
+        """
+        node_id = data.get("nodeId")
+        if not node_id:
+            return None
+        doc = self.get_document(space_id)
+        node = dict(doc.nodes.get(node_id) or {})
+        node.update({k: v for k, v in data.items() if k not in ("spaceId", "nodeId")})
+        update = doc.set("nodes", node_id, node)
+        self._mark_dirty(space_id)
+        return update
+
+    async def persist(self, space_id: str) -> int:
+        """写入文档快照(累计操作数达到 compact_every 时先压缩)，返回压缩移除的操作数"""
+        doc = self.get_document(space_id)
+        removed = 0
+        if self._uncompacted.get(space_id, 0) >= self.compact_every:
+            removed = doc.compact()
+            self._uncompacted[space_id] = 0
+        self._dirty[space_id] = 0
+        path = self._snapshot_path(space_id)
+        if path is None:
+            return removed
+        # 在事件循环中编码，文档不会在写文件期间被修改
+        data = doc.encode_state_as_update()
+        try:
+            await asyncio.to_thread(_write_snapshot, path, data)
+        except OSError:
+            logger.exception("failed to write canvas snapshot for %s", space_id)
+            self._dirty[space_id] = self._dirty.get(space_id, 0) + 1
+        return removed
+
+    async def flush(self) -> int:
+        """持久化所有有改动的文档，返回写入的文档数"""
+        dirty = [space_id for space_id, count in self._dirty.items() if count]
+        for space_id in dirty:
+            await self.persist(space_id)
+        return len(dirty)
+
+    def _mark_dirty(self, space_id: str) -> None:
+        self._dirty[space_id] = self._dirty.get(space_id, 0) + 1
+        self._uncompacted[space_id] = self._uncompacted.get(space_id, 0) + 1
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await clock.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    def _snapshot_path(self, space_id: str) -> Optional[Path]:
+        if self.snapshot_dir is None:
+            return None
+        return self.snapshot_dir / f"{quote(space_id, safe='')}.bin"
+
+    def _load_snapshot(self, space_id: str) -> Optional[bytes]:
+        path = self._snapshot_path(space_id)
+        if path is None or not path.exists():
+            return None
+        return path.read_bytes()
+
+
+
+def _write_snapshot(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+# 全局画布同步实例
+canvas_sync = CanvasSyncManager(snapshot_dir=config.CANVAS_SNAPSHOT_DIR)
+
+
+@lifecycle.on_startup("canvas_sync")
+async def _start_canvas_flusher() -> None:
+    canvas_sync.start()
+
+
+@lifecycle.on_shutdown("canvas_sync")
+async def _flush_canvas() -> None:
+    """关闭前把未写入的改动写入快照"""
+    await canvas_sync.close()
@@ -0,0 +1,78 @@
+"""
+应用配置 - 从环境变量读取运行参数
+"""
+import os
+import socket
+from pathlib import Path
+
+
+# 持久化数据根目录(快照、事件日志等)
+DATA_DIR = Path(os.getenv("ANTIGRAVITY_DATA_DIR", "data"))
+
+# 画布文档快照目录
+CANVAS_SNAPSHOT_DIR = DATA_DIR / "canvas"
+
+# 每累计多少次画布操作压缩一次文档
+CANVAS_COMPACT_EVERY = int(os.getenv("ANTIGRAVITY_CANVAS_COMPACT_EVERY", "500"))
+
+# 画布改动写入快照的间隔(秒)，进程崩溃最多丢失这段时间内的改动
+CANVAS_FLUSH_INTERVAL = float(os.getenv("ANTIGRAVITY_CANVAS_FLUSH_INTERVAL", "1"))
+
+# 每个房间在内存中保留的事件数
+EVENT_LOG_CAPACITY = int(os.getenv("ANTIGRAVITY_EVENT_LOG_CAPACITY", "1000"))
+
+# 超出内存缓冲的事件批量写入磁盘(ANTIGRAVITY_EVENT_LOG_SPILL=1 时启用)，断线较久的客户端仍可补发；
+# 序号只在本进程内有效，重启后同样需要全量同步
+EVENT_LOG_SPILL_DIR = (
+    DATA_DIR / "events" if os.getenv("ANTIGRAVITY_EVENT_LOG_SPILL") == "1" else None
+)
+# 每个房间溢出文件保留的事件数与写入间隔(秒)
+EVENT_LOG_SPILL_CAPACITY = int(os.getenv("ANTIGRAVITY_EVENT_LOG_SPILL_CAPACITY", "10000"))
+EVENT_LOG_FLUSH_INTERVAL = float(os.getenv("ANTIGRAVITY_EVENT_LOG_FLUSH_INTERVAL", "1"))
+
+# 知识库索引目录(由 python -m app.knowledge.build 生成)
+KNOWLEDGE_DIR = Path(os.getenv("ANTIGRAVITY_KNOWLEDGE_DIR", str(DATA_DIR / "knowledge")))
+
+# 外部模型服务(兼容 OpenAI 接口，可指向本地 stub 服务)
+MODEL_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com")
+MODEL_API_KEY = os.getenv("OPENAI_API_KEY")
+MODEL_MAX_CONCURRENCY = int(os.getenv("ANTIGRAVITY_MODEL_MAX_CONCURRENCY", "16"))
+
+# 沙箱工作进程数与单个任务的资源限制(语法检查、GUT 测试等)
+SANDBOX_WORKERS = int(os.getenv("ANTIGRAVITY_SANDBOX_WORKERS", "2"))
+SANDBOX_TIME_LIMIT = float(os.getenv("ANTIGRAVITY_SANDBOX_TIME_LIMIT", "30"))
+SANDBOX_CPU_LIMIT = int(os.getenv("ANTIGRAVITY_SANDBOX_CPU_LIMIT", "10"))
+SANDBOX_MEMORY_LIMIT_MB = int(os.getenv("ANTIGRAVITY_SANDBOX_MEMORY_LIMIT_MB", "1024"))
+
+# Godot 可执行文件与包含 GUT 插件的测试工程模板(未配置时测试退化为静态检查)
+GODOT_BIN = os.getenv("GODOT_BIN")
+GUT_PROJECT_DIR = os.getenv("ANTIGRAVITY_GUT_PROJECT_DIR")
+
+# 启动后是否在后台预热(加载知识库、拉起沙箱进程等)
+WARMUP = os.getenv("ANTIGRAVITY_WARMUP", "1") == "1"
+
+# 工作流移交: 检查点目录(多副本需挂载同一共享卷)、排空截止时间与轮询间隔
+HANDOFF_DIR = Path(os.getenv("ANTIGRAVITY_HANDOFF_DIR", str(DATA_DIR / "handoff")))
+DRAIN_DEADLINE = float(os.getenv("ANTIGRAVITY_DRAIN_DEADLINE", "20"))
+HANDOFF_POLL_INTERVAL = float(os.getenv("ANTIGRAVITY_HANDOFF_POLL_INTERVAL", "2"))
+
+# 管理接口(/api/admin)的访问令牌，通过 X-Admin-Token 请求头提供；未配置时只允许本机访问
+ADMIN_TOKEN = os.getenv("ANTIGRAVITY_ADMIN_TOKEN")
+
+# 副本标识，用于认领检查点
+REPLICA_ID = os.getenv("ANTIGRAVITY_REPLICA_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+# 任务载荷中超过该长度(字符)的字符串转存到共享载荷存储
+BLOB_THRESHOLD = int(os.getenv("ANTIGRAVITY_BLOB_THRESHOLD", "1024"))
+
+# 用量计量: 落盘目录与批量写入间隔(秒)
+ACCOUNTING_DIR = Path(os.getenv("ANTIGRAVITY_ACCOUNTING_DIR", str(DATA_DIR / "accounting")))
+ACCOUNTING_FLUSH_INTERVAL = float(os.getenv("ANTIGRAVITY_ACCOUNTING_FLUSH_INTERVAL", "10"))
+
+# 配额: 同时未完成的任务数(每个空间/每个用户)与每个用户的每日用量，0 表示不限制
+# (默认不限制: 批量接口发布的任务没有智能体认领时会一直计为未完成)
+QUOTA_SPACE_MAX_ACTIVE = int(os.getenv("ANTIGRAVITY_QUOTA_SPACE_MAX_ACTIVE", "0"))
+QUOTA_USER_MAX_ACTIVE = int(os.getenv("ANTIGRAVITY_QUOTA_USER_MAX_ACTIVE", "0"))
+QUOTA_USER_DAILY_TOKENS = int(os.getenv("ANTIGRAVITY_QUOTA_USER_DAILY_TOKENS", "0"))
+QUOTA_USER_DAILY_WALL_SECONDS = float(os.getenv("ANTIGRAVITY_QUOTA_USER_DAILY_WALL_SECONDS", "0"))
+QUOTA_USER_DAILY_ASSET_MB = float(os.getenv("ANTIGRAVITY_QUOTA_USER_DAILY_ASSET_MB", "0"))
@@ -0,0 +1,133 @@
+"""
+Checkpoint Queue - 持久化的工作流检查点队列
+每个检查点是目录中的一个 JSON 文件；多个副本挂载同一目录(共享卷)，
+通过原子 rename 认领，保证一个检查点只被一个副本恢复
+"""
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+import json
+import os
+import uuid
+
+from app.clock import clock
+
+
+@dataclass
+class WorkflowCheckpoint:
+    space_id: str
+    # 同一空间的全部需求，最后一条为被中断的需求
+    requests: List[str]
+    # 编排器导出的步骤记录与相关资源，恢复时已完成的步骤直接复用
+    state: Dict[str, Any] = field(default_factory=dict)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=clock.time)
+    attempts: int = 0
+    origin: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "WorkflowCheckpoint":
+        return cls(**json.loads(raw))
+
+
+@dataclass
+class Claim:
+    checkpoint: WorkflowCheckpoint
+    path: Path
+
+
+class CheckpointQueue:
+    """
+    检查点队列
+
+    目录结构:
+    - ready/    待恢复的检查点
+    - claimed/  已被某个副本认领(文件名带副本 ID)，租约过期后回到 ready/
+    - failed/   超过最大尝试次数的检查点
+    """
+
+    def __init__(self, directory: Path, lease: float = 300.0, max_attempts: int = 3):
+        self.directory = Path(directory)
+        self.lease = lease
+        self.max_attempts = max_attempts
+
+    def _dir(self, name: str) -> Path:
+        path = self.directory / name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._dir("ready").glob("*.json"))
+
+    def put(self, checkpoint: WorkflowCheckpoint) -> Path:
+        """原子写入(先写临时文件再 rename)"""
+        ready = self._dir("ready")
+        # 文件名以微秒时间戳开头，按名称排序即按创建时间排序
+        name = f"{int(checkpoint.created_at * 1_000_000):020d}-{checkpoint.id}.json"
+        tmp_path = ready / f".{name}.tmp"
+        tmp_path.write_text(checkpoint.to_json(), encoding="utf-8")
+        path = ready / name
+        os.replace(tmp_path, path)
+        return path
+
+    def claim(self, owner: str) -> Optional[Claim]:
+        """按创建时间顺序认领一个检查点，没有可认领的检查点时返回 None"""
+        claimed_dir = self._dir("claimed")
+        for path in sorted(self._dir("ready").glob("*.json")):
+            target = claimed_dir / f"{path.stem}.{owner}.json"
+            try:
+                # rename 是原子操作，并发认领时只有一个副本成功
+                os.rename(path, target)
+            except FileNotFoundError:
+                continue
+            self._touch(target)
+            checkpoint = WorkflowCheckpoint.from_json(target.read_text(encoding="utf-8"))
+            return Claim(checkpoint=checkpoint, path=target)
+        return None
+
+    def renew(self, claim: Claim) -> None:
+        """续租，恢复耗时较长时定期调用"""
+        try:
+            self._touch(claim.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # 租约以文件修改时间记录，使用 clock 的时间以便在虚拟时间下同样生效
+        now = clock.time()
+        os.utime(path, (now, now))
+
+    def ack(self, claim: Claim) -> None:
+        """恢复成功，删除检查点"""
+        claim.path.unlink(missing_ok=True)
+
+    def nack(self, claim: Claim, checkpoint: Optional[WorkflowCheckpoint] = None) -> None:
+        """恢复失败，放回队列；超过最大尝试次数后移入 failed/"""
+        checkpoint = checkpoint or claim.checkpoint
+        checkpoint.attempts += 1
+        target_dir = "failed" if checkpoint.attempts >= self.max_attempts else "ready"
+        claim.path.unlink(missing_ok=True)
+        if target_dir == "ready":
+            self.put(checkpoint)
+        else:
+            (self._dir("failed") / f"{checkpoint.id}.json").write_text(checkpoint.to_json(), encoding="utf-8")
+
+    def requeue_stale(self) -> int:
+        """租约过期的认领(副本已退出)重新放回队列"""
+        now = clock.time()
+        ready = self._dir("ready")
+        count = 0
+        for path in self._dir("claimed").glob("*.json"):
+            try:
+                if now - path.stat().st_mtime < self.lease:
+                    continue
+                stem = path.name.split(".")[0]
+                os.rename(path, ready / f"{stem}.json")
+                count += 1
+            except FileNotFoundError:
+                continue
+        return count
@@ -0,0 +1,186 @@
+"""
+Workflow Runner - 工作流的排空与移交
+跟踪进行中的工作流；排空时拒绝新工作流，等待进行中的工作流到截止时间，
+剩余的写入检查点队列，由其他副本认领后从中断处继续
+"""
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from dataclasses import dataclass
+import asyncio
+import logging
+import random
+
+from app import config
+from app.agents.incremental import Orchestrator, orchestrator
+from app.clock import clock
+from app.handoff.queue import CheckpointQueue, Claim, WorkflowCheckpoint
+from app.lifecycle import lifecycle
+
+
+logger = logging.getLogger(__name__)
+
+# 执行一次工作流: (space_id, request) -> 协程
+Workflow = Callable[[str, str], Awaitable[None]]
+
+
+@dataclass
+class _Inflight:
+    space_id: str
+    # 启动时该空间的需求历史，最后一条为本次需求
+    requests: List[str]
+    claim: Optional[Claim] = None
+
+
+class WorkflowRunner:
+    """
+    工作流运行器
+
+    - submit() 启动并跟踪工作流；排空后返回 None，由调用方通知客户端改连其他副本
+    - drain() 等待进行中的工作流完成，超过截止时间的取消并写入检查点
+    - start() 在后台轮询检查点队列，恢复其他副本移交的工作流；
+      同时恢复的数量有上限，轮询间隔带随机抖动，避免多个新副本同时抢占
+    """
+
+    def __init__(
+        self,
+        queue: CheckpointQueue,
+        workflows: Orchestrator = orchestrator,
+        replica_id: str = config.REPLICA_ID,
+        poll_interval: float = config.HANDOFF_POLL_INTERVAL,
+        max_resumes: int = 4,
+        rng: Optional[random.Random] = None,
+    ):
+        self.queue = queue
+        self.workflows = workflows
+        self.replica_id = replica_id
+        self.poll_interval = poll_interval
+        self.max_resumes = max_resumes
+        self.draining = False
+        self.stats = {"started": 0, "completed": 0, "rejected": 0, "checkpointed": 0, "resumed": 0}
+        self._rng = rng or random.Random()
+        self._inflight: Dict[asyncio.Task, _Inflight] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._workflow: Optional[Workflow] = None
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def submit(self, space_id: str, request: str, workflow: Workflow) -> Optional[asyncio.Task]:
+        """启动工作流，排空期间拒绝"""
+        if self.draining:
+            self.stats["rejected"] += 1
+            return None
+        self.stats["started"] += 1
+        history = self.workflows.requests(space_id) + [request]
+        return self._track(workflow(space_id, request), _Inflight(space_id, history))
+
+    def _track(self, coro: Awaitable[None], info: _Inflight) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._inflight[task] = info
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, task: asyncio.Task) -> None:
+        info = self._inflight.pop(task, None)
+        if info is None or task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error("workflow for space %s failed", info.space_id, exc_info=task.exception())
+            if info.claim is not None:
+                self.queue.nack(info.claim)
+            return
+        self.stats["completed"] += 1
+        if info.claim is not None:
+            self.queue.ack(info.claim)
+
+    # --- 排空 ---
+
+    async def drain(self, deadline: float = config.DRAIN_DEADLINE) -> int:
+        """进入排空模式，返回写入检查点的工作流数量"""
+        self.draining = True
+        if self._poller is not None:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+
+        pending: Set[asyncio.Task] = set(self._inflight)
+        if pending:
+            _, pending = await asyncio.wait(pending, timeout=deadline)
+
+        # 先记录信息再取消，done 回调会把任务移出跟踪表
+        remaining = [(task, self._inflight[task]) for task in pending if task in self._inflight]
+        for task, _ in remaining:
+            task.cancel()
+        await asyncio.gather(*(task for task, _ in remaining), return_exceptions=True)
+
+        for _, info in remaining:
+            self._checkpoint(info)
+        if remaining:
+            logger.info("drained with %d workflows handed off", len(remaining))
+        return len(remaining)
+
+    def _checkpoint(self, info: _Inflight) -> None:
+        checkpoint = WorkflowCheckpoint(
+            space_id=info.space_id,
+            requests=info.requests,
+            state=self.workflows.export(info.space_id),
+            origin=self.replica_id,
+        )
+        if info.claim is not None:
+            # 恢复到一半再次被移交: 保留尝试次数，替换原检查点
+            checkpoint.id = info.claim.checkpoint.id
+            checkpoint.created_at = info.claim.checkpoint.created_at
+            checkpoint.attempts = info.claim.checkpoint.attempts
+            self.queue.ack(info.claim)
+        self.queue.put(checkpoint)
+        self.stats["checkpointed"] += 1
+
+    # --- 恢复 ---
+
+    def start(self, workflow: Workflow) -> None:
+        """开始在后台恢复检查点队列中的工作流"""
+        self._workflow = workflow
+        if self._poller is None and not self.draining:
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self) -> None:
+        while not self.draining:
+            resuming = sum(1 for info in self._inflight.values() if info.claim is not None)
+            claim = None
+            if resuming < self.max_resumes:
+                self.queue.requeue_stale()
+                claim = self.queue.claim(self.replica_id)
+            if claim is not None:
+                self.resume(claim)
+                continue
+            await clock.sleep(self.poll_interval * self._rng.uniform(0.5, 1.5))
+
+    def resume(self, claim: Claim) -> asyncio.Task:
+        """导入检查点中的执行记录并重新执行被中断的需求，已完成的步骤会被复用"""
+        checkpoint = claim.checkpoint
+        self.workflows.restore(checkpoint.space_id, checkpoint.requests[:-1], checkpoint.state)
+        self.stats["resumed"] += 1
+        info = _Inflight(checkpoint.space_id, checkpoint.requests, claim)
+        return self._track(self._run_resumed(claim), info)
+
+    async def _run_resumed(self, claim: Claim) -> None:
+        """执行期间定期续租，避免被其他副本当作过期认领"""
+        async def renew() -> None:
+            while True:
+                await clock.sleep(self.queue.lease / 3)
+                self.queue.renew(claim)
+
+        renewer = asyncio.get_running_loop().create_task(renew())
+        try:
+            await self._workflow(claim.checkpoint.space_id, claim.checkpoint.requests[-1])
+        finally:
+            renewer.cancel()
+
+
+# 全局工作流运行器
+workflow_runner = WorkflowRunner(CheckpointQueue(config.HANDOFF_DIR))
+
+
+@lifecycle.on_drain("workflows")
+async def _drain_workflows() -> None:
+    await workflow_runner.drain(config.DRAIN_DEADLINE)
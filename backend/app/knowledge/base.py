@@ -0,0 +1,150 @@
+"""
+Knowledge Base - Producer 的知识库检索
+片段向量预先计算并写入磁盘，运行时内存映射加载，热点查询走 LRU 缓存
+
+索引目录结构:
+- embeddings.npy  片段向量 (N x dim, float32, 已归一化)
+- chunks.jsonl    片段内容，每行一个 JSON
+- offsets.npy     每个片段在 chunks.jsonl 中的字节偏移
+- meta.json       维度、片段数等元数据
+"""
+from typing import List, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import json
+import mmap
+import os
+import asyncio
+import threading
+
+from app import config
+from app.knowledge.chunker import chunk_text, iter_documents
+from app.lazy import lazy_import
+from app.lifecycle import lifecycle
+from app.search.vector import HashingEmbedder
+
+# NumPy 在首次检索时才导入
+np = lazy_import("numpy")
+
+
+@dataclass(frozen=True)
+class KnowledgeHit:
+    source: str
+    heading: str
+    text: str
+    score: float
+
+
+def build_index(sources: List[Path], out_dir: Path, dim: int = 256) -> int:
+    """切分并嵌入文档，写出索引目录，返回片段数"""
+    embedder = HashingEmbedder(dim)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    vectors = []
+    offsets = []
+    tmp_chunks = out_dir / "chunks.jsonl.tmp"
+    with tmp_chunks.open("wb") as f:
+        for path in iter_documents(sources):
+            text = path.read_text(encoding="utf-8", errors="replace")
+            for chunk in chunk_text(text, source=str(path)):
+                offsets.append(f.tell())
+                f.write(json.dumps(chunk.__dict__, ensure_ascii=False).encode("utf-8") + b"\n")
+                vectors.append(embedder.embed(f"{chunk.heading}\n{chunk.text}"))
+
+    matrix = np.stack(vectors) if vectors else np.zeros((0, dim), dtype=np.float32)
+    np.save(out_dir / "embeddings.npy", matrix.astype(np.float32))
+    np.save(out_dir / "offsets.npy", np.asarray(offsets, dtype=np.int64))
+    os.replace(tmp_chunks, out_dir / "chunks.jsonl")
+    (out_dir / "meta.json").write_text(json.dumps({"dim": dim, "count": len(offsets)}))
+    return len(offsets)
+
+
+class KnowledgeBase:
+    """
+    知识库
+
+    - 首次查询(或启动预热)时才内存映射索引文件
+    - 查询为一次向量化点积 + argpartition 取 top-k
+    - 相同查询命中 LRU 缓存，不重复计算
+    """
+
+    def __init__(self, index_dir: Path = config.KNOWLEDGE_DIR, cache_size: int = 1024):
+        self.index_dir = Path(index_dir)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._embeddings: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._chunks: Optional[mmap.mmap] = None
+        self._embedder: Optional[HashingEmbedder] = None
+        self._cached_query = lru_cache(maxsize=cache_size)(self._query)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        self.load()
+        return 0 if self._embeddings is None else len(self._embeddings)
+
+    def load(self) -> bool:
+        """内存映射索引文件，索引不存在时返回 False"""
+        if self._loaded:
+            return self._embeddings is not None
+        with self._lock:
+            if not self._loaded:
+                self._open()
+                self._loaded = True
+        return self._embeddings is not None
+
+    def _open(self) -> None:
+        meta_path = self.index_dir / "meta.json"
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        self._embedder = HashingEmbedder(meta["dim"])
+        if meta["count"] == 0:
+            return
+        self._embeddings = np.load(self.index_dir / "embeddings.npy", mmap_mode="r")
+        self._offsets = np.load(self.index_dir / "offsets.npy", mmap_mode="r")
+        with (self.index_dir / "chunks.jsonl").open("rb") as f:
+            self._chunks = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def query(self, text: str, k: int = 4) -> List[KnowledgeHit]:
+        """检索与文本最相关的 k 个片段"""
+        return list(self._cached_query(" ".join(text.split()), k))
+
+    def cache_info(self):
+        return self._cached_query.cache_info()
+
+    def clear_cache(self) -> None:
+        self._cached_query.cache_clear()
+
+    def _query(self, text: str, k: int) -> Tuple[KnowledgeHit, ...]:
+        if not text or not self.load():
+            return ()
+        scores = self._embeddings @ self._embedder.embed(text)
+        k = min(k, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return tuple(
+            self._hit(int(i), float(scores[i]))
+            for i in top
+            if scores[i] > 0
+        )
+
+    def _hit(self, index: int, score: float) -> KnowledgeHit:
+        start = int(self._offsets[index])
+        end = self._chunks.find(b"\n", start)
+        raw = json.loads(self._chunks[start:end if end != -1 else None])
+        return KnowledgeHit(source=raw["source"], heading=raw["heading"], text=raw["text"], score=score)
+
+
+# 全局知识库实例
+knowledge_base = KnowledgeBase()
+
+
+@lifecycle.on_warmup("knowledge_base")
+async def _load_knowledge_base() -> None:
+    """启动后映射索引文件，首个需求不再承担加载耗时"""
+    await asyncio.to_thread(knowledge_base.load)
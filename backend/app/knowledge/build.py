@@ -0,0 +1,27 @@
+"""
+构建知识库索引
+
+运行: python -m app.knowledge.build ../设计.md ../README.md path/to/godot-docs
+"""
+import argparse
+import time
+from pathlib import Path
+
+from app import config
+from app.knowledge.base import build_index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="切分并嵌入项目文档与 Godot API 参考")
+    parser.add_argument("sources", nargs="+", type=Path, help="文档文件或目录")
+    parser.add_argument("--out", type=Path, default=config.KNOWLEDGE_DIR, help="索引输出目录")
+    parser.add_argument("--dim", type=int, default=256, help="向量维度")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_index(args.sources, args.out, dim=args.dim)
+    print(f"indexed {count} chunks into {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Chunker - 把项目文档与 Godot API 参考切分为检索片段
+按 Markdown 标题(仅 .md/.rst)和空行分段，过长的段落按字符数切开并保留少量重叠
+"""
+from typing import Iterator, List
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# 参与构建知识库的文件类型
+DOC_SUFFIXES = {".md", ".txt", ".rst", ".gd", ".xml"}
+
+# 以 # 开头的行视为标题的文件类型(GDScript 等文件中 # 是注释)
+HEADING_SUFFIXES = {".md", ".rst"}
+
+
+@dataclass
+class Chunk:
+    source: str
+    heading: str
+    text: str
+
+
+def chunk_text(text: str, source: str, max_chars: int = 600, overlap: int = 80) -> List[Chunk]:
+    """切分单个文档，source 的后缀决定是否识别 Markdown 标题"""
+    headings = Path(source).suffix.lower() in HEADING_SUFFIXES
+    chunks: List[Chunk] = []
+    heading = ""
+    buffer: List[str] = []
+
+    def flush() -> None:
+        body = "\n".join(buffer).strip()
+        buffer.clear()
+        if not body:
+            return
+        start = 0
+        while start < len(body):
+            piece = body[start:start + max_chars]
+            chunks.append(Chunk(source=source, heading=heading, text=piece))
+            if start + max_chars >= len(body):
+                break
+            start += max_chars - overlap
+
+    for line in text.splitlines():
+        if headings and line.startswith("#"):
+            flush()
+            heading = line.lstrip("#").strip()
+        elif not line.strip() and sum(len(b) for b in buffer) >= max_chars // 2:
+            flush()
+        else:
+            buffer.append(line)
+    flush()
+    return chunks
+
+
+def iter_documents(paths: List[Path]) -> Iterator[Path]:
+    """展开目录，按路径排序保证构建结果稳定"""
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix in DOC_SUFFIXES)
+        elif path.is_file():
+            yield path
@@ -0,0 +1,45 @@
+"""
+Lazy Import - 延迟导入重量级依赖
+模块在第一次访问其属性时才真正导入，缩短服务冷启动时间
+"""
+from types import ModuleType
+from typing import Optional
+import importlib
+import sys
+
+
+class LazyModule:
+    """
+    模块代理
+
+    np = lazy_import("numpy") 之后，首次访问 np.zeros 时才执行 import numpy。
+    类型注解中请使用字符串形式(如 "np.ndarray")，避免定义函数时触发导入。
+    代理自身只有下划线开头的属性，避免遮挡被代理模块的同名属性(如 np.load)
+    """
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def is_loaded(module: LazyModule) -> bool:
+    """被代理的模块是否已导入(包括被其他代码导入)"""
+    return module._module is not None or module._name in sys.modules
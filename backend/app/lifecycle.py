@@ -0,0 +1,153 @@
+"""
+Lifecycle - 应用启动与关闭
+各模块注册启动/预热/排空/关闭钩子；启动钩子在接受连接前执行，
+预热在后台执行，完成前及排空期间 /ready 返回 503
+"""
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+
+from app import config
+
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[], Awaitable[None]]
+
+
+class Lifecycle:
+    """
+    启动与关闭钩子
+
+    - 启动钩子(订阅黑板、后台刷写任务、读取持久化状态等必需的初始化)在接受连接前执行，
+      不受 warmup_enabled 影响，失败时服务不启动
+    - 预热钩子只做可选的提前加载(导入大依赖、映射索引、拉起工作进程)，
+      并发执行，单个钩子失败只记录日志，不阻止服务就绪
+    - 排空钩子在关闭前执行(也可由 /api/admin/drain 提前触发)，用于停止接收新工作并移交进行中的工作
+    - 关闭钩子按注册的逆序执行
+    """
+
+    def __init__(self, warmup_enabled: bool = True):
+        self.warmup_enabled = warmup_enabled
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._startup_hooks: List[Tuple[str, Hook]] = []
+        self._warmup_hooks: List[Tuple[str, Hook]] = []
+        self._drain_hooks: List[Tuple[str, Hook]] = []
+        self._shutdown_hooks: List[Tuple[str, Hook]] = []
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._drain_task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and not self.draining
+
+    @property
+    def draining(self) -> bool:
+        return self._drain_task is not None
+
+    def on_startup(self, name: str) -> Callable[[Hook], Hook]:
+        """注册启动钩子(装饰器)"""
+        def register(hook: Hook) -> Hook:
+            self._startup_hooks.append((name, hook))
+            return hook
+        return register
+
+    def on_warmup(self, name: str) -> Callable[[Hook], Hook]:
+        """注册预热钩子(装饰器)"""
+        def register(hook: Hook) -> Hook:
+            self._warmup_hooks.append((name, hook))
+            return hook
+        return register
+
+    def on_drain(self, name: str) -> Callable[[Hook], Hook]:
+        """注册排空钩子(装饰器)"""
+        def register(hook: Hook) -> Hook:
+            self._drain_hooks.append((name, hook))
+            return hook
+        return register
+
+    def on_shutdown(self, name: str) -> Callable[[Hook], Hook]:
+        """注册关闭钩子(装饰器)"""
+        def register(hook: Hook) -> Hook:
+            self._shutdown_hooks.append((name, hook))
+            return hook
+        return register
+
+    async def start_up(self) -> None:
+        """按注册顺序执行启动钩子"""
+        for name, hook in self._startup_hooks:
+            start = time.perf_counter()
+            try:
+                await hook()
+            finally:
+                self.timings[name] = (time.perf_counter() - start) * 1000
+
+    async def warm_up(self) -> Dict[str, float]:
+        """执行全部预热钩子，返回各钩子耗时(毫秒)"""
+        async def timed(name: str, hook: Hook) -> None:
+            start = time.perf_counter()
+            try:
+                await hook()
+            except Exception as e:
+                logger.exception("warm-up hook %s failed", name)
+                self.errors[name] = repr(e)
+            finally:
+                self.timings[name] = (time.perf_counter() - start) * 1000
+
+        await asyncio.gather(*(timed(name, hook) for name, hook in self._warmup_hooks))
+        self._ready.set()
+        return dict(self.timings)
+
+    async def wait_ready(self) -> None:
+        await self._ready.wait()
+
+    def start(self) -> None:
+        """在后台开始预热，服务立即开始接受连接"""
+        if not self.warmup_enabled:
+            self._ready.set()
+            return
+        self._warmup_task = asyncio.get_running_loop().create_task(self.warm_up())
+
+    def drain(self) -> "asyncio.Task":
+        """开始排空(重复调用返回同一个任务)"""
+        if self._drain_task is None:
+            self._drain_task = asyncio.get_running_loop().create_task(self._run_drain_hooks())
+        return self._drain_task
+
+    async def _run_drain_hooks(self) -> None:
+        async def run(name: str, hook: Hook) -> None:
+            try:
+                await hook()
+            except Exception:
+                logger.exception("drain hook %s failed", name)
+
+        await asyncio.gather(*(run(name, hook) for name, hook in self._drain_hooks))
+
+    async def shutdown(self) -> None:
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+        await self.drain()
+        for name, hook in reversed(self._shutdown_hooks):
+            try:
+                await hook()
+            except Exception:
+                logger.exception("shutdown hook %s failed", name)
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        """FastAPI lifespan"""
+        await self.start_up()
+        self.start()
+        try:
+            yield
+        finally:
+            await self.shutdown()
+
+
+# 全局生命周期实例
+lifecycle = Lifecycle(warmup_enabled=config.WARMUP)
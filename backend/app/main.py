@@ -3,15 +3,18 @@ AntiGravity Backend - FastAPI Application
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import socketio
 
-from app.api.routes import spaces, messages, assets
+from app.api.routes import spaces, messages, assets, search, tasks, admin
 from app.api.websocket import sio
+from app.lifecycle import lifecycle
 
 app = FastAPI(
     title="AntiGravity API",
     description="多智能体协作平台后端 API",
     version="1.0.0",
+    lifespan=lifecycle.lifespan,
 )
 
 # CORS配置
@@ -30,6 +33,9 @@ socket_app = socketio.ASGIApp(sio, app)
 app.include_router(spaces.router, prefix="/api/spaces", tags=["Spaces"])
 app.include_router(messages.router, prefix="/api", tags=["Messages"])
 app.include_router(assets.router, prefix="/api/assets", tags=["Assets"])
+app.include_router(search.router, prefix="/api", tags=["Search"])
+app.include_router(tasks.router, prefix="/api", tags=["Tasks"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/")
@@ -44,3 +50,13 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """预热完成前及排空期间返回 503，供负载均衡/自动扩缩容的就绪探针使用"""
+    if lifecycle.draining:
+        return JSONResponse({"status": "draining"}, status_code=503)
+    if not lifecycle.ready:
+        return JSONResponse({"status": "warming", "timings": lifecycle.timings}, status_code=503)
+    return {"status": "ready", "timings": lifecycle.timings, "errors": lifecycle.errors}
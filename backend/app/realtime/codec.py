@@ -0,0 +1,166 @@
+"""
+Wire Codec - 可协商的 Socket.IO 二进制负载编码
+msgpack 序列化 + 超过阈值时 deflate 压缩，事件名与智能体名驻留为整数
+未协商的旧客户端继续收到 JSON
+"""
+from typing import Dict, List, Any, Optional, Set, Tuple, Union
+from collections import defaultdict
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+from app.blackboard.blackboard import AgentType
+
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+# 二进制客户端统一通过该事件接收帧，再在客户端按帧内事件名分发
+PACKED_EVENT = "packed"
+
+# 帧头标志位
+_FLAG_DEFLATE = 0x01
+
+# 客户端帧(解压后)的最大字节数
+MAX_FRAME = 1 << 20
+
+# 驻留表只能追加，不能调整顺序(客户端按下标解码)
+EVENT_NAMES: Tuple[str, ...] = (
+    "connected",
+    "joined_space",
+    "resync_required",
+    "agent:thinking",
+    "agent:message",
+    "task:update",
+    "asset:created",
+    "blackboard:update",
+    "canvas:sync",
+    "canvas:update",
+    "canvas:updated",
+    "canvas:error",
+    "agent:delta",
+)
+AGENT_NAMES: Tuple[str, ...] = tuple(agent.value for agent in AgentType)
+
+_EVENT_IDS = {name: i for i, name in enumerate(EVENT_NAMES)}
+_AGENT_IDS = {name: i for i, name in enumerate(AGENT_NAMES)}
+
+
+class CodecError(ValueError):
+    """帧无法解码"""
+
+
+def available_encodings() -> List[str]:
+    """服务端支持的编码(按优先级)"""
+    return [MSGPACK, JSON] if msgpack is not None else [JSON]
+
+
+def negotiate(accept: Union[str, List[str], None]) -> str:
+    """从客户端声明的编码中选出双方都支持的第一个，默认 JSON"""
+    supported = available_encodings()
+    if isinstance(accept, str):
+        accept = [accept]
+    elif not isinstance(accept, (list, tuple)):
+        accept = []
+    for encoding in accept:
+        if encoding in supported:
+            return encoding
+    return JSON
+
+
+class WireCodec:
+    """
+    二进制帧编解码
+
+    帧格式: 1 字节标志位 + msgpack([事件, 数据])
+    事件为驻留表下标或原始字符串，数据中的 agent 字段同样驻留
+    解码来自客户端的帧时限制解压后的大小，并校验驻留下标
+    """
+
+    def __init__(self, compress_threshold: int = 1024, level: int = 6, max_frame: int = MAX_FRAME):
+        if msgpack is None:
+            raise RuntimeError("msgpack is required for binary wire encoding")
+        self.compress_threshold = compress_threshold
+        self.level = level
+        self.max_frame = max_frame
+
+    def encode(self, event: str, data: Any) -> bytes:
+        if isinstance(data, dict) and data.get("agent") in _AGENT_IDS:
+            data = {**data, "agent": _AGENT_IDS[data["agent"]]}
+        body = msgpack.packb([_EVENT_IDS.get(event, event), data], use_bin_type=True)
+        if len(body) >= self.compress_threshold:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            compressed = compressor.compress(body) + compressor.flush()
+            if len(compressed) < len(body):
+                return bytes([_FLAG_DEFLATE]) + compressed
+        return b"\x00" + body
+
+    def decode(self, frame: bytes) -> Tuple[str, Any]:
+        if not frame:
+            raise CodecError("empty frame")
+        body = frame[1:]
+        if len(body) > self.max_frame:
+            raise CodecError("frame too large")
+        try:
+            if frame[0] & _FLAG_DEFLATE:
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                body = decompressor.decompress(body, self.max_frame)
+                if decompressor.unconsumed_tail:
+                    raise CodecError("frame too large")
+            event, data = msgpack.unpackb(body, raw=False)
+        except CodecError:
+            raise
+        except (zlib.error, ValueError, TypeError) as e:
+            raise CodecError(str(e)) from e
+        if isinstance(event, int):
+            event = _interned(EVENT_NAMES, event, "event")
+        elif not isinstance(event, str):
+            raise CodecError("invalid event")
+        if isinstance(data, dict) and isinstance(data.get("agent"), int):
+            data["agent"] = _interned(AGENT_NAMES, data["agent"], "agent")
+        return event, data
+
+
+def _interned(names: Tuple[str, ...], index: int, kind: str) -> str:
+    if not 0 <= index < len(names):
+        raise CodecError(f"unknown {kind} id {index}")
+    return names[index]
+
+
+class ClientEncodings:
+    """记录每个连接协商的编码，以及各房间内的二进制客户端"""
+
+    def __init__(self):
+        self._encodings: Dict[str, str] = {}
+        self._rooms: Dict[str, Set[str]] = defaultdict(set)
+
+    def set(self, sid: str, encoding: str) -> None:
+        if encoding == JSON:
+            self._encodings.pop(sid, None)
+        else:
+            self._encodings[sid] = encoding
+
+    def is_binary(self, sid: str) -> bool:
+        return sid in self._encodings
+
+    def join(self, sid: str, room: str) -> None:
+        if self.is_binary(sid):
+            self._rooms[room].add(sid)
+
+    def remove(self, sid: str) -> None:
+        self._encodings.pop(sid, None)
+        for room in list(self._rooms):
+            self._rooms[room].discard(sid)
+            if not self._rooms[room]:
+                del self._rooms[room]
+
+    def binary_sids(self, room: str) -> List[str]:
+        return list(self._rooms.get(room, ()))
+
+
+# 全局编码状态
+client_encodings = ClientEncodings()
+wire_codec = WireCodec() if msgpack is not None else None
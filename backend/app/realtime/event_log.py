@@ -0,0 +1,242 @@
+"""
+Event Log - 按房间编号的事件日志
+客户端断线重连时只补发错过的事件，缺口过大才要求全量重新同步
+"""
+from typing import Dict, List, Any, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from collections import deque
+from pathlib import Path
+from urllib.parse import quote
+import asyncio
+import json
+import logging
+import shutil
+import uuid
+
+from app import config
+from app.clock import clock
+from app.lifecycle import lifecycle
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SequencedEvent:
+    seq: int
+    event: str
+    data: Dict[str, Any]
+    timestamp: datetime = field(default_factory=clock.now)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"seq": self.seq, "event": self.event, "data": self.data},
+            ensure_ascii=False,
+            default=str,
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "SequencedEvent":
+        raw = json.loads(line)
+        return cls(seq=raw["seq"], event=raw["event"], data=raw["data"])
+
+
+class RoomEventLog:
+    """
+    单个房间的事件日志
+
+    - 内存中是定长环形缓冲
+    - 配置了 spill_path 时，被挤出缓冲的事件暂存在内存中，由 flush() 在线程中批量追加到磁盘，
+      写入完成前仍从内存补发(当前文件写满后轮转一次，磁盘上最多保留两倍 spill_capacity)
+    - 序号只在本进程内有效(见 EventLog.epoch)，溢出文件不跨进程使用
+    """
+
+    def __init__(
+        self,
+        capacity: int = config.EVENT_LOG_CAPACITY,
+        spill_path: Optional[Path] = None,
+        spill_capacity: int = config.EVENT_LOG_SPILL_CAPACITY,
+    ):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.spill_capacity = spill_capacity
+        self.last_seq = 0
+        self._buffer: deque = deque(maxlen=capacity)
+        # 被挤出环形缓冲、尚未写入磁盘的事件
+        self._evicted: List[SequencedEvent] = []
+        # 当前溢出文件中的事件数
+        self._spilled = 0
+
+    @property
+    def first_seq(self) -> int:
+        """内存中最早的序号，空缓冲时为下一个序号"""
+        if self._evicted:
+            return self._evicted[0].seq
+        return self._buffer[0].seq if self._buffer else self.last_seq + 1
+
+    def append(self, event: str, data: Dict[str, Any]) -> SequencedEvent:
+        """追加事件并分配序号"""
+        self.last_seq += 1
+        entry = SequencedEvent(seq=self.last_seq, event=event, data=data)
+        if self.spill_path is not None and len(self._buffer) == self.capacity:
+            self._evicted.append(self._buffer[0])
+        self._buffer.append(entry)
+        return entry
+
+    def since(self, last_seq: int) -> Optional[List[SequencedEvent]]:
+        """
+        返回内存中序号大于 last_seq 的事件
+
+        返回 None 表示缺口超出内存保留范围
+        """
+        if last_seq >= self.last_seq:
+            return []
+        if last_seq + 1 >= self.first_seq:
+            return [e for e in (*self._evicted, *self._buffer) if e.seq > last_seq]
+        return None
+
+    async def replay(self, last_seq: int) -> Optional[List[SequencedEvent]]:
+        """
+        返回序号大于 last_seq 的事件，内存中没有时从溢出文件读取
+
+        返回 None 表示缺口超出保留范围，客户端需要全量同步
+        """
+        recent = self.since(last_seq)
+        if recent is not None or self.spill_path is None:
+            return recent
+        # 先取内存中的事件再读文件: 读文件期间写入磁盘的事件两边都有，按序号去重
+        recent = [*self._evicted, *self._buffer]
+        spilled = await asyncio.to_thread(_read_spilled, self.spill_path)
+        first = recent[0].seq if recent else self.last_seq + 1
+        events = [e for e in spilled if last_seq < e.seq < first]
+        if not events or events[0].seq != last_seq + 1 or events[-1].seq != first - 1:
+            return None
+        return events + recent
+
+    async def flush(self) -> int:
+        """把被挤出缓冲的事件追加到溢出文件，返回写入的事件数"""
+        if self.spill_path is None or not self._evicted:
+            return 0
+        batch = list(self._evicted)
+        # 在事件循环中编码，写文件期间不会读到修改中的 data
+        lines = "".join(e.to_json() + "\n" for e in batch)
+        rotate = self._spilled + len(batch) > self.spill_capacity
+        try:
+            await asyncio.to_thread(_append_spilled, self.spill_path, lines, rotate)
+        except OSError:
+            logger.exception("failed to spill events to %s", self.spill_path)
+            return 0
+        # 写入期间新挤出的事件留到下一批
+        del self._evicted[:len(batch)]
+        self._spilled = len(batch) if rotate else self._spilled + len(batch)
+        return len(batch)
+
+
+class EventLog:
+    """
+    所有房间的事件日志
+
+    epoch 在进程启动时随机生成，服务重启后客户端持有的序号失效；
+    配置了 spill_dir 时溢出文件写在 spill_dir/epoch 下，每 flush_interval 秒批量写入一次
+    """
+
+    def __init__(
+        self,
+        capacity: int = config.EVENT_LOG_CAPACITY,
+        spill_dir: Optional[Path] = None,
+        flush_interval: float = config.EVENT_LOG_FLUSH_INTERVAL,
+    ):
+        self.capacity = capacity
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.flush_interval = flush_interval
+        self.epoch = uuid.uuid4().hex[:12]
+        self._rooms: Dict[str, RoomEventLog] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def room(self, room: str) -> RoomEventLog:
+        log = self._rooms.get(room)
+        if log is None:
+            spill_path = None
+            if self.spill_dir is not None:
+                spill_path = self.spill_dir / self.epoch / f"{quote(room, safe='')}.jsonl"
+            log = RoomEventLog(self.capacity, spill_path)
+            self._rooms[room] = log
+        return log
+
+    def append(self, room: str, event: str, data: Dict[str, Any]) -> SequencedEvent:
+        return self.room(room).append(event, data)
+
+    async def replay(
+        self, room: str, last_seq: int, epoch: Optional[str] = None
+    ) -> Optional[List[SequencedEvent]]:
+        """计算需要补发的事件，返回 None 表示需要全量同步"""
+        if epoch is not None and epoch != self.epoch:
+            return None
+        log = self.room(room)
+        if last_seq > log.last_seq:
+            return None
+        return await log.replay(last_seq)
+
+    async def flush(self) -> int:
+        """把所有房间被挤出缓冲的事件写入磁盘，返回写入的事件数"""
+        written = 0
+        for log in list(self._rooms.values()):
+            written += await log.flush()
+        return written
+
+    def start(self) -> None:
+        if self.spill_dir is not None and self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await clock.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        """停止刷写并删除本进程的溢出文件(重启后序号失效，文件不再可用)"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self.spill_dir is not None:
+            await asyncio.to_thread(shutil.rmtree, self.spill_dir / self.epoch, True)
+
+
+def _append_spilled(path: Path, lines: str, rotate: bool) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if rotate and path.exists():
+        path.replace(path.with_suffix(".old"))
+    with path.open("a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def _read_spilled(path: Path) -> List[SequencedEvent]:
+    events: List[SequencedEvent] = []
+    for file in (path.with_suffix(".old"), path):
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = SequencedEvent.from_json(line)
+                # 刷写被取消时同一批可能写入两次
+                if not events or entry.seq > events[-1].seq:
+                    events.append(entry)
+    return events
+
+
+# 全局事件日志实例
+event_log = EventLog(spill_dir=config.EVENT_LOG_SPILL_DIR)
+
+
+@lifecycle.on_startup("event_log")
+async def _start_event_log_flusher() -> None:
+    event_log.start()
+
+
+@lifecycle.on_shutdown("event_log")
+async def _close_event_log() -> None:
+    await event_log.close()
@@ -0,0 +1,209 @@
+"""
+Client Outbox - 每个连接独立的发送队列
+高/低水位控制 + 流式增量合并，慢客户端不会让服务端缓冲无限增长
+"""
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Set
+from dataclasses import dataclass
+from collections import deque, defaultdict
+import asyncio
+
+
+@dataclass
+class OutboxItem:
+    event: str
+    data: Dict[str, Any]
+    # 同一 stream_key 的增量在客户端落后时可以合并
+    stream_key: Optional[str] = None
+
+
+def merge_delta(queued: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """合并两条文本增量，保留较早的 offset"""
+    return {**queued, "delta": queued.get("delta", "") + new.get("delta", "")}
+
+
+class ClientOutbox:
+    """
+    单个客户端的发送队列
+
+    - 队列长度达到高水位后进入落后状态，同一流的连续增量合并为一条(不跨越其他事件)
+    - 回落到低水位后恢复逐条发送
+    - 超过硬上限时丢弃积压，只保留一条 resync_required 提示
+    """
+
+    def __init__(
+        self,
+        sid: str,
+        high_watermark: int = 256,
+        low_watermark: int = 64,
+        max_size: int = 1024,
+        merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]] = merge_delta,
+    ):
+        if not 0 <= low_watermark < high_watermark <= max_size:
+            raise ValueError("expected low_watermark < high_watermark <= max_size")
+        self.sid = sid
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.max_size = max_size
+        self.lagging = False
+        self.conflated = 0
+        self.overflows = 0
+        self._merge = merge
+        self._queue: deque = deque()
+        # stream_key -> 队列中该流最后一条增量
+        self._streams: Dict[str, OutboxItem] = {}
+        self._ready = asyncio.Event()
+        self.rooms: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, item: OutboxItem) -> None:
+        """入队，必要时合并或丢弃积压"""
+        if len(self._queue) >= self.high_watermark:
+            self.lagging = True
+
+        if self.lagging and item.stream_key is not None:
+            queued = self._streams.get(item.stream_key)
+            if queued is not None:
+                queued.data = self._merge(queued.data, item.data)
+                self.conflated += 1
+                return
+
+        if len(self._queue) >= self.max_size:
+            self._overflow()
+            return
+
+        self._queue.append(item)
+        if item.stream_key is not None:
+            self._streams[item.stream_key] = item
+        else:
+            # 之后的增量不能再合并到这条事件之前，否则会先于它送达
+            self._streams.clear()
+        self._ready.set()
+
+    def get_nowait(self) -> Optional[OutboxItem]:
+        if not self._queue:
+            return None
+        item = self._queue.popleft()
+        if item.stream_key is not None and self._streams.get(item.stream_key) is item:
+            del self._streams[item.stream_key]
+        if self.lagging and len(self._queue) <= self.low_watermark:
+            self.lagging = False
+        if not self._queue:
+            self._ready.clear()
+        return item
+
+    async def get(self) -> OutboxItem:
+        while True:
+            item = self.get_nowait()
+            if item is not None:
+                return item
+            await self._ready.wait()
+
+    async def run(
+        self,
+        send: Callable[[str, Dict[str, Any]], Awaitable[None]],
+        backlog: Optional[Callable[[], int]] = None,
+        max_backlog: int = 16,
+        poll_interval: float = 0.01,
+    ) -> None:
+        """
+        持续发送队列中的事件
+
+        backlog 返回传输层尚未写出的包数，超过 max_backlog 时暂停发送，
+        让积压留在本队列中以便合并
+        """
+        while True:
+            item = await self.get()
+            if backlog is not None:
+                while backlog() > max_backlog:
+                    await asyncio.sleep(poll_interval)
+            await send(item.event, item.data)
+
+    def _overflow(self) -> None:
+        self.overflows += 1
+        self._queue.clear()
+        self._streams.clear()
+        self.lagging = False
+        self._queue.append(OutboxItem("resync_required", {"reason": "outbox_overflow"}))
+        self._ready.set()
+
+
+class OutboxRegistry:
+    """按连接管理发送队列，并按房间分发事件"""
+
+    def __init__(
+        self,
+        send: Callable[[str, str, Dict[str, Any]], Awaitable[None]],
+        backlog: Optional[Callable[[str], int]] = None,
+        **outbox_options: Any,
+    ):
+        self._send = send
+        self._backlog = backlog
+        self._options = outbox_options
+        self._outboxes: Dict[str, ClientOutbox] = {}
+        self._senders: Dict[str, asyncio.Task] = {}
+        self._rooms: Dict[str, Set[str]] = defaultdict(set)
+
+    def get(self, sid: str) -> Optional[ClientOutbox]:
+        return self._outboxes.get(sid)
+
+    def open(self, sid: str) -> ClientOutbox:
+        """为连接创建发送队列并启动发送协程"""
+        outbox = self._outboxes.get(sid)
+        if outbox is not None:
+            return outbox
+        outbox = ClientOutbox(sid, **self._options)
+        self._outboxes[sid] = outbox
+
+        async def send(event: str, data: Dict[str, Any]) -> None:
+            await self._send(sid, event, data)
+
+        backlog = None
+        if self._backlog is not None:
+            backlog = lambda: self._backlog(sid)  # noqa: E731
+        self._senders[sid] = asyncio.create_task(outbox.run(send, backlog))
+        return outbox
+
+    def join(self, sid: str, room: str) -> None:
+        outbox = self.open(sid)
+        outbox.rooms.add(room)
+        self._rooms[room].add(sid)
+
+    def close(self, sid: str) -> None:
+        """断开连接时释放队列"""
+        outbox = self._outboxes.pop(sid, None)
+        sender = self._senders.pop(sid, None)
+        if sender is not None:
+            sender.cancel()
+        if outbox is None:
+            return
+        for room in outbox.rooms:
+            self._rooms[room].discard(sid)
+            if not self._rooms[room]:
+                del self._rooms[room]
+
+    def publish(
+        self,
+        room: str,
+        event: str,
+        data: Dict[str, Any],
+        stream_key: Optional[str] = None,
+        skip_sid: Optional[str] = None,
+    ) -> None:
+        """向房间内每个连接的队列投递事件(不等待发送)，skip_sid 为事件的发送者"""
+        for sid in self._rooms.get(room, ()):
+            if sid != skip_sid:
+                self._outboxes[sid].put(OutboxItem(event, dict(data), stream_key))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "sid": sid,
+                "queued": len(outbox),
+                "lagging": outbox.lagging,
+                "conflated": outbox.conflated,
+                "overflows": outbox.overflows,
+            }
+            for sid, outbox in self._outboxes.items()
+        ]
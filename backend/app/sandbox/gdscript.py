@@ -0,0 +1,108 @@
+"""
+GDScript Checker - 轻量的 GDScript 静态检查
+不依赖 Godot，检查括号配对、缩进结构与函数声明，供 CodeWeaver 的语法检查步骤使用
+"""
+from typing import Any, Dict, List, Tuple
+import re
+
+
+_FUNC_RE = re.compile(r"^(static\s+)?func\s+[A-Za-z_]\w*\s*\(.*\)\s*(->\s*[\w\[\]., ]+)?\s*:$")
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+
+def _strip_line(line: str, depth: List[Tuple[str, int]], lineno: int, errors: List[Dict[str, Any]]) -> str:
+    """去掉字符串与注释，同时更新括号栈"""
+    out = []
+    quote = None
+    i = 0
+    while i < len(line):
+        ch = line[i]
+        if quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if ch in "\"'":
+            quote = ch
+            out.append("_")
+        elif ch == "#":
+            break
+        elif ch in "([{":
+            depth.append((ch, lineno))
+            out.append(ch)
+        elif ch in ")]}":
+            if not depth or depth[-1][0] != _PAIRS[ch]:
+                errors.append({"line": lineno, "message": f"unmatched '{ch}'"})
+            else:
+                depth.pop()
+            out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+    if quote:
+        errors.append({"line": lineno, "message": "unterminated string"})
+    return "".join(out).rstrip()
+
+
+def check(code: str) -> Dict[str, Any]:
+    """检查 GDScript 源码，返回 {"ok": bool, "errors": [{"line", "message"}]}"""
+    errors: List[Dict[str, Any]] = []
+    depth: List[Tuple[str, int]] = []
+    indents = [0]
+    indent_char = None
+    expect_block = False
+    seen_func = False
+    extends_count = 0
+
+    for lineno, raw in enumerate(code.splitlines(), start=1):
+        continuation = bool(depth)
+        stripped = _strip_line(raw, depth, lineno, errors)
+        text = stripped.strip()
+        if not text or continuation:
+            continue
+
+        leading = raw[: len(raw) - len(raw.lstrip(" \t"))]
+        if leading:
+            if indent_char is None:
+                indent_char = leading[0]
+            if any(ch != indent_char for ch in leading):
+                errors.append({"line": lineno, "message": "mixed tabs and spaces in indentation"})
+        width = len(leading)
+
+        if expect_block:
+            if width <= indents[-1]:
+                errors.append({"line": lineno, "message": "expected an indented block"})
+            else:
+                indents.append(width)
+        elif width > indents[-1]:
+            errors.append({"line": lineno, "message": "unexpected indent"})
+            indents.append(width)
+        while width < indents[-1]:
+            indents.pop()
+        if width != indents[-1]:
+            errors.append({"line": lineno, "message": "unindent does not match any outer level"})
+            indents.append(width)
+
+        if re.match(r"^(static\s+)?func\b", text):
+            seen_func = True
+            if not depth and not _FUNC_RE.match(text):
+                errors.append({"line": lineno, "message": "invalid function declaration"})
+        elif text.startswith("extends") and width == 0:
+            extends_count += 1
+            if extends_count > 1:
+                errors.append({"line": lineno, "message": "duplicate extends"})
+            elif seen_func:
+                errors.append({"line": lineno, "message": "extends must come before functions"})
+
+        expect_block = not depth and text.endswith(":")
+
+    if expect_block:
+        errors.append({"line": len(code.splitlines()), "message": "expected an indented block"})
+    for bracket, lineno in depth:
+        errors.append({"line": lineno, "message": f"unclosed '{bracket}'"})
+
+    errors.sort(key=lambda e: e["line"])
+    return {"ok": not errors, "errors": errors}
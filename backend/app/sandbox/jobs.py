@@ -0,0 +1,91 @@
+"""
+Sandbox Jobs - 在沙箱进程中执行的任务
+这些函数运行在工作进程里，只能接收和返回可序列化的数据
+"""
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import re
+import shutil
+import subprocess
+import tempfile
+
+from app.sandbox import gdscript
+
+
+def check_syntax(code: str) -> Dict[str, Any]:
+    """CodeWeaver 的语法检查步骤"""
+    return gdscript.check(code)
+
+
+def run_tests(
+    code: str,
+    godot_bin: Optional[str] = None,
+    project_dir: Optional[str] = None,
+    time_limit: float = 30.0,
+    cpu_limit: int = 10,
+) -> Dict[str, Any]:
+    """
+    Inquisitor 的 GUT 测试步骤
+
+    配置了 Godot 可执行文件与测试工程模板时，以无界面模式运行 GUT；
+    否则退化为静态检查
+    """
+    syntax = gdscript.check(code)
+    if not syntax["ok"]:
+        return {"passed": False, "tests": 0, "runner": "syntax", "errors": syntax["errors"]}
+    if godot_bin and project_dir:
+        return _run_gut(code, godot_bin, Path(project_dir), time_limit, cpu_limit)
+    return _run_static(code)
+
+
+def _run_static(code: str) -> Dict[str, Any]:
+    checks = [
+        ("syntax_valid", True),
+        ("extends_node", bool(re.search(r"^extends\s+\w+", code, re.MULTILINE))),
+        ("defines_functions", bool(re.search(r"^func\s+\w+", code, re.MULTILINE))),
+    ]
+    results: List[Dict[str, Any]] = [{"name": name, "passed": passed} for name, passed in checks]
+    return {
+        "passed": all(passed for _, passed in checks),
+        "tests": len(checks),
+        "passed_count": sum(passed for _, passed in checks),
+        "runner": "static",
+        "results": results,
+    }
+
+
+def _run_gut(code: str, godot_bin: str, project_dir: Path, time_limit: float, cpu_limit: int) -> Dict[str, Any]:
+    def limit_child() -> None:
+        try:
+            import resource
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit))
+        except (ImportError, ValueError, OSError):
+            pass
+
+    with tempfile.TemporaryDirectory(prefix="antigravity-gut-") as tmp:
+        project = Path(tmp) / "project"
+        shutil.copytree(project_dir, project)
+        script = project / "scripts" / "under_test.gd"
+        script.parent.mkdir(parents=True, exist_ok=True)
+        script.write_text(code, encoding="utf-8")
+        try:
+            completed = subprocess.run(
+                [godot_bin, "--headless", "--path", str(project), "-s", "res://addons/gut/gut_cmdln.gd", "-gexit"],
+                capture_output=True,
+                text=True,
+                timeout=time_limit,
+                preexec_fn=limit_child,
+            )
+        except subprocess.TimeoutExpired:
+            return {"passed": False, "tests": 0, "runner": "gut", "errors": [{"line": 0, "message": "test run timed out"}]}
+
+    output = completed.stdout + completed.stderr
+    total = re.search(r"^\s*Tests\s+(\d+)", output, re.MULTILINE)
+    passing = re.search(r"^\s*Passing Tests\s+(\d+)", output, re.MULTILINE)
+    return {
+        "passed": completed.returncode == 0,
+        "tests": int(total.group(1)) if total else 0,
+        "passed_count": int(passing.group(1)) if passing else 0,
+        "runner": "gut",
+        "log": output[-4000:],
+    }
@@ -0,0 +1,268 @@
+"""
+Sandbox Pool - 常驻的沙箱工作进程池
+CPU 密集或需要拉起子进程的任务放到独立进程中执行，不阻塞服务 Socket.IO 的事件循环
+"""
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import importlib
+import math
+import pickle
+import signal
+
+from app import config
+
+
+class SandboxError(Exception):
+    """沙箱任务失败，reason 为 timeout / cpu_limit / crashed / error"""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+@dataclass
+class SandboxLimits:
+    # 单个任务的墙钟时间上限(秒)，超时后杀掉工作进程
+    time_limit: float = 30.0
+    # 单个任务可用的 CPU 时间(秒)，超出后进程收到 SIGXCPU
+    cpu_limit: int = 10
+    # 工作进程地址空间上限，0 表示不限制
+    memory_limit_mb: int = 1024
+
+
+def _set_cpu_limit(seconds: Optional[int]) -> None:
+    """在当前已用 CPU 时间的基础上设置软限制，None 表示解除"""
+    try:
+        import resource
+    except ImportError:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime) + seconds
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _set_memory_limit(megabytes: int) -> None:
+    if megabytes <= 0:
+        return
+    try:
+        import resource
+        limit = megabytes * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _worker_main(conn, memory_limit_mb: int, preload: Sequence[str]) -> None:
+    """工作进程主循环: 预热导入后逐个执行任务"""
+    for module in preload:
+        importlib.import_module(module)
+    _set_memory_limit(memory_limit_mb)
+    while True:
+        try:
+            payload = conn.recv_bytes()
+        except EOFError:
+            return
+        if not payload:
+            return
+        try:
+            fn, args, kwargs, cpu_limit = pickle.loads(payload)
+            _set_cpu_limit(cpu_limit)
+            try:
+                result = ("ok", fn(*args, **kwargs))
+            finally:
+                _set_cpu_limit(None)
+        except Exception as e:
+            result = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(result)
+        except Exception as e:
+            conn.send(("error", f"unpicklable result: {e}"))
+
+
+class _Worker:
+    """一个常驻工作进程及其管道，同一时刻只执行一个任务"""
+
+    def __init__(self, ctx, limits: SandboxLimits, preload: Sequence[str]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, limits.memory_limit_mb, tuple(preload)),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def call(self, payload: bytes, timeout: float) -> Tuple[str, Any]:
+        """发送任务并等待结果(在线程中阻塞调用)"""
+        self.jobs += 1
+        self.conn.send_bytes(payload)
+        if not self.conn.poll(timeout):
+            raise SandboxError(f"job exceeded time limit of {timeout}s", "timeout")
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.process.join(1)
+            code = self.process.exitcode
+            if code == -getattr(signal, "SIGXCPU", -1):
+                raise SandboxError("job exceeded CPU limit", "cpu_limit")
+            raise SandboxError(f"worker exited with code {code}", "crashed")
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send_bytes(b"")
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    沙箱进程池
+
+    - 工作进程以 spawn 方式启动并预先导入任务模块，任务到来时无需冷启动
+    - 每个任务有墙钟时间与 CPU 时间限制；超限的进程会被杀掉并替换
+    - 工作进程执行 max_jobs_per_worker 个任务后回收，避免内存泄漏累积
+    - 等待结果的阻塞调用在专用线程中完成，事件循环只做 await
+    - inline=True 时任务在当前进程内直接执行(没有隔离与资源限制)，只用于虚拟时间模拟
+    """
+
+    def __init__(
+        self,
+        workers: int = config.SANDBOX_WORKERS,
+        limits: Optional[SandboxLimits] = None,
+        max_jobs_per_worker: int = 200,
+        preload: Sequence[str] = ("app.sandbox.jobs",),
+        inline: bool = False,
+    ):
+        self.inline = inline
+        self.size = 0 if inline else max(1, workers)
+        self.limits = limits or SandboxLimits()
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.preload = tuple(preload)
+        self.stats = {"jobs": 0, "timeout": 0, "cpu_limit": 0, "crashed": 0, "error": 0, "restarts": 0}
+        self._ctx = None
+        self._threads = ThreadPoolExecutor(max_workers=max(1, self.size), thread_name_prefix="sandbox")
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._restarts: Set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """启动并预热全部工作进程(首次提交任务时也会自动调用)"""
+        if self._idle is not None:
+            return
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            loop = asyncio.get_running_loop()
+            workers = await asyncio.gather(*(
+                loop.run_in_executor(self._threads, self._spawn) for _ in range(self.size)
+            ))
+            idle: asyncio.Queue = asyncio.Queue()
+            for worker in workers:
+                idle.put_nowait(worker)
+            self._workers = list(workers)
+            self._idle = idle
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        time_limit: Optional[float] = None,
+        cpu_limit: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """在工作进程中执行模块级函数 fn(*args, **kwargs) 并返回结果"""
+        await self.start()
+        if self.inline:
+            return self._run_inline(fn, args, kwargs)
+        payload = pickle.dumps((fn, args, kwargs, cpu_limit or self.limits.cpu_limit))
+        loop = asyncio.get_running_loop()
+        worker = await self._idle.get()
+        self.stats["jobs"] += 1
+        try:
+            status, value = await loop.run_in_executor(
+                self._threads, worker.call, payload, time_limit or self.limits.time_limit
+            )
+        except SandboxError as e:
+            self.stats[e.reason] += 1
+            self._restart(worker)
+            raise
+        except BaseException:
+            # 被取消时工作进程可能仍在执行，直接替换
+            self._restart(worker)
+            raise
+
+        if worker.jobs >= self.max_jobs_per_worker:
+            self._restart(worker)
+        else:
+            self._idle.put_nowait(worker)
+        if status == "error":
+            self.stats["error"] += 1
+            raise SandboxError(value, "error")
+        return value
+
+    def _run_inline(self, fn: Callable[..., Any], args: Tuple, kwargs: dict) -> Any:
+        self.stats["jobs"] += 1
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            self.stats["error"] += 1
+            raise SandboxError(repr(e), "error")
+
+    async def close(self) -> None:
+        await asyncio.gather(*self._restarts, return_exceptions=True)
+        workers, self._workers = self._workers, []
+        self._idle = None
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._threads, w.stop) for w in workers))
+
+    def _spawn(self) -> _Worker:
+        if self._ctx is None:
+            # multiprocessing 只在真正拉起工作进程时才导入
+            import multiprocessing
+            self._ctx = multiprocessing.get_context("spawn")
+        return _Worker(self._ctx, self.limits, self.preload)
+
+    def _restart(self, worker: _Worker) -> None:
+        """后台杀掉并替换工作进程，新进程就绪后放回空闲队列"""
+        loop = asyncio.get_running_loop()
+        idle = self._idle
+        self.stats["restarts"] += 1
+
+        def replace() -> _Worker:
+            worker.kill()
+            return self._spawn()
+
+        async def restart() -> None:
+            new_worker = await loop.run_in_executor(self._threads, replace)
+            if idle is not self._idle:
+                # 进程池已关闭
+                await loop.run_in_executor(self._threads, new_worker.stop)
+                return
+            self._workers[self._workers.index(worker)] = new_worker
+            idle.put_nowait(new_worker)
+
+        task = loop.create_task(restart())
+        self._restarts.add(task)
+        task.add_done_callback(self._restarts.discard)
@@ -0,0 +1,113 @@
+"""
+Sandbox Service - 把沙箱进程池接入黑板
+携带代码的 RUN_TEST 任务发布后由沙箱认领并在后台执行，结果作为任务输出写回黑板
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+
+from app import config
+from app.blackboard.blackboard import Blackboard, Task, TaskStatus, TaskType, blackboard
+from app.lifecycle import lifecycle
+from app.sandbox import jobs
+from app.sandbox.pool import SandboxError, SandboxLimits, SandboxPool
+
+
+logger = logging.getLogger(__name__)
+
+
+class SandboxService:
+    """沙箱服务"""
+
+    def __init__(self, pool: SandboxPool, board: Blackboard = blackboard):
+        self.pool = pool
+        self.board = board
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def attach(self) -> None:
+        """订阅黑板的任务发布事件"""
+        self.board.subscribe("task_publish", self._on_publish)
+        self.board.subscribe("tasks_publish", self._on_publish_batch)
+
+    def _on_publish(self, task: Task) -> None:
+        # 只处理携带待测代码的测试任务；其余测试任务留给智能体自行认领
+        if task.type != TaskType.RUN_TEST or "code" not in task.input:
+            return
+        # 发布回调在黑板锁内执行，认领与执行放到独立协程中
+        job = asyncio.get_running_loop().create_task(self._execute(task))
+        self._running[task.id] = job
+        job.add_done_callback(lambda _: self._running.pop(task.id, None))
+
+    def _on_publish_batch(self, tasks: List[Task]) -> None:
+        for task in tasks:
+            self._on_publish(task)
+
+    async def _execute(self, task: Task) -> Dict[str, Any]:
+        claimed = await self.board.claim_task(task.assigned_agent, task.id)
+        if claimed is None:
+            return {}
+        try:
+            output = await self.pool.run(
+                jobs.run_tests,
+                task.input["code"],
+                godot_bin=config.GODOT_BIN,
+                project_dir=config.GUT_PROJECT_DIR,
+                time_limit=self.pool.limits.time_limit,
+                cpu_limit=self.pool.limits.cpu_limit,
+            )
+        except Exception as e:
+            # 任何异常都要把任务标记为失败，否则任务停留在 running，wait() 永远等不到结果
+            if isinstance(e, SandboxError):
+                logger.warning("sandbox test run for task %s failed: %s", task.id, e)
+            else:
+                logger.exception("sandbox test run for task %s raised", task.id)
+            reason = e.reason if isinstance(e, SandboxError) else "error"
+            output = {"passed": False, "tests": 0, "error": str(e), "reason": reason}
+            await self.board.fail_task(task.id, output)
+            return output
+        await self.board.complete_task(task.id, output)
+        return output
+
+    async def wait(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        等待沙箱中的任务执行完毕并返回输出，任务不由沙箱执行时返回 None
+
+        调用前任务可能已经执行完毕并移出跟踪表，此时从黑板上读取结果
+        """
+        job = self._running.get(task_id)
+        if job is not None:
+            return await asyncio.shield(job)
+        task = self.board.task_index.get(task_id)
+        if task is None or task.status not in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            return None
+        if task.type != TaskType.RUN_TEST or "code" not in task.input or task.output is None:
+            return None
+        return task.output.to_dict()
+
+    async def check_syntax(self, code: str) -> Dict[str, Any]:
+        """语法检查，返回 {"ok": bool, "errors": [...]}"""
+        return await self.pool.run(jobs.check_syntax, code)
+
+
+# 全局沙箱服务实例(工作进程在启动预热或首次提交任务时启动)
+sandbox_pool = SandboxPool(
+    workers=config.SANDBOX_WORKERS,
+    limits=SandboxLimits(
+        time_limit=config.SANDBOX_TIME_LIMIT,
+        cpu_limit=config.SANDBOX_CPU_LIMIT,
+        memory_limit_mb=config.SANDBOX_MEMORY_LIMIT_MB,
+    ),
+)
+sandbox_service = SandboxService(sandbox_pool)
+sandbox_service.attach()
+
+
+@lifecycle.on_warmup("sandbox_pool")
+async def _start_sandbox() -> None:
+    """提前拉起并预热沙箱工作进程"""
+    await sandbox_pool.start()
+
+
+@lifecycle.on_shutdown("sandbox_pool")
+async def _close_sandbox() -> None:
+    await sandbox_pool.close()
@@ -0,0 +1,162 @@
+"""
+Inverted Index - 增量倒排索引 + BM25 排序
+倒排表存放在紧凑数组中，查询时用 NumPy 向量化打分
+"""
+from typing import Dict, List, Optional, Tuple, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from array import array
+from collections import Counter
+import math
+
+from app.lazy import lazy_import
+from app.search.tokenizer import tokenize
+
+# NumPy 在首次检索时才导入
+np = lazy_import("numpy")
+
+
+@dataclass
+class SearchDocument:
+    id: str
+    space_id: str
+    kind: str  # message, task, code
+    title: str
+    content: str
+    created_at: datetime = field(default_factory=datetime.now)
+
+
+class InvertedIndex:
+    """
+    单个工作空间的倒排索引
+
+    - 文档以内部整数编号存储，倒排表为 (文档编号数组, 词频数组)
+    - 删除只做标记，查询时过滤；已删除文档多于存活文档时压缩，清除倒排表中的墓碑
+    """
+
+    PRUNE_MIN_DOCS = 1000
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_df_ratio: float = 0.3):
+        self.k1 = k1
+        self.b = b
+        # 大索引中出现在超过该比例文档里的词视为停用词(查询中还有其他词时跳过)
+        self.max_df_ratio = max_df_ratio
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._docs: List[Optional[SearchDocument]] = []
+        self._doc_ids: Dict[str, int] = {}
+        self._doc_len = array("I")
+        self._alive = bytearray()
+        self._kinds: Dict[str, int] = {}
+        self._doc_kind = bytearray()
+        self._total_len = 0
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def add(self, doc: SearchDocument, text: Optional[str] = None) -> None:
+        """索引文档，同 id 的旧文档会被替换"""
+        self.remove(doc.id)
+        tokens = tokenize(text if text is not None else f"{doc.title}\n{doc.content}")
+        internal = len(self._docs)
+        self._docs.append(doc)
+        self._doc_ids[doc.id] = internal
+        self._doc_len.append(len(tokens))
+        self._alive.append(1)
+        self._doc_kind.append(self._kinds.setdefault(doc.kind, len(self._kinds)))
+        self._total_len += len(tokens)
+        self._live += 1
+        for term, tf in Counter(tokens).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("H"))
+            postings[0].append(internal)
+            postings[1].append(min(tf, 0xFFFF))
+
+    def remove(self, doc_id: str) -> bool:
+        internal = self._doc_ids.pop(doc_id, None)
+        if internal is None:
+            return False
+        self._alive[internal] = 0
+        self._docs[internal] = None
+        self._total_len -= self._doc_len[internal]
+        self._live -= 1
+        dead = len(self._docs) - self._live
+        if dead >= self.COMPACT_MIN_DEAD and dead > self._live:
+            self.compact()
+        return True
+
+    def compact(self) -> int:
+        """重新编号存活文档并重建倒排表，返回清除的已删除文档数"""
+        dead = len(self._docs) - self._live
+        if not dead:
+            return 0
+        alive = np.flatnonzero(np.frombuffer(self._alive, dtype=np.uint8))
+        mapping = np.full(len(self._docs), -1, dtype=np.int64)
+        mapping[alive] = np.arange(len(alive))
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        for term, (docs, tfs) in self._postings.items():
+            new_ids = mapping[np.frombuffer(docs, dtype=np.uint32)]
+            keep = new_ids >= 0
+            if not keep.any():
+                continue
+            doc_array, tf_array = array("I"), array("H")
+            doc_array.frombytes(new_ids[keep].astype(np.uint32).tobytes())
+            tf_array.frombytes(np.frombuffer(tfs, dtype=np.uint16)[keep].tobytes())
+            postings[term] = (doc_array, tf_array)
+
+        self._postings = postings
+        self._docs = [self._docs[i] for i in alive]
+        self._doc_ids = {doc.id: i for i, doc in enumerate(self._docs)}
+        self._doc_len = array("I", (self._doc_len[i] for i in alive))
+        self._doc_kind = bytearray(self._doc_kind[i] for i in alive)
+        self._alive = bytearray(b"\x01" * len(alive))
+        return dead
+
+    def get(self, doc_id: str) -> Optional[SearchDocument]:
+        internal = self._doc_ids.get(doc_id)
+        return self._docs[internal] if internal is not None else None
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[SearchDocument, float]]:
+        """BM25 排序查询"""
+        terms = set(tokenize(query))
+        if not terms or not self._live:
+            return []
+
+        n_docs = len(self._docs)
+        postings_list = [self._postings[t] for t in terms if t in self._postings]
+        selective = [p for p in postings_list if len(p[0]) <= self.max_df_ratio * n_docs]
+        if selective and n_docs >= self.PRUNE_MIN_DOCS:
+            postings_list = selective
+
+        avg_len = self._total_len / self._live or 1.0
+        doc_len = np.frombuffer(self._doc_len, dtype=np.uint32)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for postings in postings_list:
+            docs = np.frombuffer(postings[0], dtype=np.uint32)
+            tf = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+            df = len(docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * doc_len[docs] / avg_len)
+            # 同一词的倒排表中文档编号唯一，可以直接按下标累加
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        mask = np.frombuffer(self._alive, dtype=np.uint8) == 0
+        if kinds is not None:
+            wanted = [self._kinds[k] for k in kinds if k in self._kinds]
+            mask |= ~np.isin(np.frombuffer(self._doc_kind, dtype=np.uint8), wanted)
+        scores[mask] = 0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            top = np.argpartition(scores[candidates], -limit)[-limit:]
+            candidates = candidates[top]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._docs[i], float(scores[i])) for i in ranked]
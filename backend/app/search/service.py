@@ -0,0 +1,149 @@
+"""
+Search Service - 工作空间内的全文检索与相似请求检索
+索引消息内容、任务输入和代码资产，随写入增量更新
+"""
+from typing import Dict, List, Optional, Tuple, Any
+from datetime import datetime
+import asyncio
+import importlib
+
+from app.blackboard.blackboard import Blackboard, Task, blackboard
+from app.lifecycle import lifecycle
+from app.search.index import InvertedIndex, SearchDocument
+from app.search.vector import HashingEmbedder, VectorIndex
+
+
+# 参与"相似请求"检索的文档类型
+SIMILAR_KINDS = ("message", "task")
+
+
+class SpaceIndex:
+    """单个工作空间的全文索引与向量索引"""
+
+    def __init__(self, embedder: HashingEmbedder):
+        self.text = InvertedIndex()
+        self.vectors = VectorIndex(embedder.dim)
+
+
+class SearchService:
+    """按工作空间划分的检索服务"""
+
+    def __init__(self, embedder: Optional[HashingEmbedder] = None):
+        self.embedder = embedder or HashingEmbedder()
+        self._spaces: Dict[str, SpaceIndex] = {}
+
+    def _space(self, space_id: str) -> SpaceIndex:
+        index = self._spaces.get(space_id)
+        if index is None:
+            index = self._spaces[space_id] = SpaceIndex(self.embedder)
+        return index
+
+    def add(self, doc: SearchDocument) -> None:
+        index = self._space(doc.space_id)
+        index.text.add(doc)
+        if doc.kind in SIMILAR_KINDS:
+            index.vectors.add(doc.id, self.embedder.embed(doc.content))
+
+    def remove(self, space_id: str, doc_id: str) -> None:
+        index = self._spaces.get(space_id)
+        if index is not None:
+            index.text.remove(doc_id)
+            index.vectors.remove(doc_id)
+
+    def drop_space(self, space_id: str) -> None:
+        self._spaces.pop(space_id, None)
+
+    def attach(self, board: Blackboard) -> None:
+        """订阅黑板的任务发布事件"""
+        board.subscribe("task_publish", self.index_task)
+        board.subscribe("tasks_publish", self.index_tasks)
+
+    def detach(self, board: Blackboard) -> None:
+        board.unsubscribe("task_publish", self.index_task)
+        board.unsubscribe("tasks_publish", self.index_tasks)
+
+    # --- 写入入口 ---
+
+    def index_message(self, message: Dict[str, Any]) -> None:
+        self.add(SearchDocument(
+            id=message["id"],
+            space_id=message["space_id"],
+            kind="message",
+            title=message.get("role", ""),
+            content=message["content"],
+            created_at=message.get("created_at") or datetime.now(),
+        ))
+
+    def index_task(self, task: Task) -> None:
+        if not task.space_id:
+            return
+        self.add(SearchDocument(
+            id=task.id,
+            space_id=task.space_id,
+            kind="task",
+            title=task.type.value,
+            content="\n".join(str(v) for v in task.input.values()),
+            created_at=task.created_at,
+        ))
+
+    def index_tasks(self, tasks: List[Task]) -> None:
+        for task in tasks:
+            self.index_task(task)
+
+    def index_code_asset(self, space_id: str, asset_id: str, title: str, content: str) -> None:
+        self.add(SearchDocument(
+            id=asset_id,
+            space_id=space_id,
+            kind="code",
+            title=title,
+            content=content,
+        ))
+
+    # --- 查询 ---
+
+    def search(
+        self,
+        space_id: str,
+        query: str,
+        limit: int = 20,
+        kinds: Optional[List[str]] = None,
+    ) -> List[Tuple[SearchDocument, float]]:
+        """全文检索(BM25)"""
+        index = self._spaces.get(space_id)
+        if index is None:
+            return []
+        return index.text.search(query, limit=limit, kinds=kinds)
+
+    def similar(
+        self,
+        space_id: str,
+        query: str,
+        limit: int = 10,
+    ) -> List[Tuple[SearchDocument, float]]:
+        """向量相似度检索历史请求"""
+        index = self._spaces.get(space_id)
+        if index is None:
+            return []
+        hits = index.vectors.search(self.embedder.embed(query), k=limit)
+        return [(index.text.get(doc_id), score) for doc_id, score in hits]
+
+
+# 全局检索服务实例
+search_service = SearchService()
+
+
+@lifecycle.on_startup("search")
+async def _start_search() -> None:
+    """接入全局黑板，之后发布的任务进入索引"""
+    search_service.attach(blackboard)
+
+
+@lifecycle.on_warmup("search_numpy")
+async def _import_numpy() -> None:
+    """预先导入 NumPy，首个检索请求不再承担导入耗时"""
+    await asyncio.to_thread(importlib.import_module, "numpy")
+
+
+@lifecycle.on_shutdown("search")
+async def _stop_search() -> None:
+    search_service.detach(blackboard)
@@ -0,0 +1,41 @@
+"""
+Tokenizer - 中英文混合分词
+拉丁字母/数字按单词切分，CJK 文本按相邻二元组(bigram)切分
+"""
+from typing import List
+import re
+
+
+_TOKEN_RE = re.compile(
+    r"[a-z0-9_]+"
+    r"|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+"  # 中日韩统一表意文字
+    r"|[\u3040-\u30ff]+"  # 日文假名
+    r"|[\uac00-\ud7af]+"  # 韩文音节
+)
+
+
+def _is_cjk(ch: str) -> bool:
+    return ch >= "\u3040"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词，索引与查询使用同一规则
+
+    - "pushable_box" -> ["pushable_box", "pushable", "box"]
+    - "推动的箱子" -> ["推动", "动的", "的箱", "箱子"]
+    - 单个汉字保留为一元词
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group()
+        if _is_cjk(run[0]):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+            if "_" in run:
+                tokens.extend(part for part in run.split("_") if part)
+    return tokens
@@ -0,0 +1,178 @@
+"""
+Vector Index - 本地向量检索
+特征哈希生成文本向量，NumPy 计算余弦相似度(暴力 / IVF)
+"""
+from typing import Dict, List, Optional, Tuple
+from array import array
+import math
+import zlib
+
+from app.lazy import lazy_import
+from app.search.tokenizer import tokenize
+
+# NumPy 在首次检索时才导入
+np = lazy_import("numpy")
+
+
+class HashingEmbedder:
+    """
+    特征哈希文本向量(无需模型，进程间结果稳定)
+
+    词项经 crc32 映射到固定维度，符号位减少哈希冲突带来的偏差，
+    词频取 1 + log(tf) 后做 L2 归一化
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, text: str) -> "np.ndarray":
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts: Dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            h = zlib.crc32(token.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.dim] += sign * (1.0 + math.log(tf))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class VectorIndex:
+    """
+    向量索引
+
+    数据量较小时暴力计算(一次矩阵-向量乘法)；
+    超过 ivf_threshold 后训练 IVF 粗聚类，查询只扫描最近的 nprobe 个桶；
+    已删除的行多于存活行时压缩矩阵
+    """
+
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self, dim: int, ivf_threshold: int = 50_000, nprobe: int = 8):
+        self.dim = dim
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self._matrix = np.zeros((64, dim), dtype=np.float32)
+        self._alive = np.zeros(64, dtype=bool)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[array] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def add(self, doc_id: str, vector: "np.ndarray") -> None:
+        self.remove(doc_id)
+        row = len(self._ids)
+        if row >= len(self._matrix):
+            self._grow()
+        self._matrix[row] = vector
+        self._alive[row] = True
+        self._ids.append(doc_id)
+        self._rows[doc_id] = row
+        if self._centroids is not None:
+            self._lists[int(np.argmax(self._centroids @ vector))].append(row)
+        elif len(self._ids) >= self.ivf_threshold:
+            self.train()
+
+    def remove(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._matrix[row] = 0
+        dead = len(self._ids) - len(self._rows)
+        if dead >= self.COMPACT_MIN_DEAD and dead > len(self._rows):
+            self.compact()
+        return True
+
+    def compact(self) -> int:
+        """移除已删除的行并重新编号(已训练时沿用聚类中心重新分桶)，返回移除的行数"""
+        size = len(self._ids)
+        dead = size - len(self._rows)
+        if not dead:
+            return 0
+        alive = np.flatnonzero(self._alive[:size])
+        capacity = max(64, len(self._matrix))
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(alive)] = self._matrix[alive]
+        self._matrix = matrix
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:len(alive)] = True
+        self._ids = [self._ids[i] for i in alive]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        if self._centroids is not None:
+            self._assign(len(alive))
+        return dead
+
+    def search(self, vector: "np.ndarray", k: int = 10, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        size = len(self._ids)
+        if size == 0:
+            return []
+        if self._centroids is None:
+            rows = np.arange(size)
+            scores = self._matrix[:size] @ vector
+        else:
+            rows = self._probe(vector)
+            scores = self._matrix[rows] @ vector
+        scores[~self._alive[rows]] = -np.inf
+        k = min(k, len(rows))
+        if k == 0:
+            return []
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            (self._ids[rows[i]], float(scores[i]))
+            for i in top
+            if scores[i] > min_score
+        ]
+
+    def train(self, iterations: int = 8, seed: int = 0) -> None:
+        """球面 k-means 训练粗聚类中心，并把已有向量分配到各桶"""
+        size = len(self._ids)
+        nlist = max(1, int(math.sqrt(size)))
+        rng = np.random.default_rng(seed)
+        sample = self._matrix[rng.choice(size, size=min(size, nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            nonempty = norms[:, 0] > 0
+            centroids[nonempty] = sums[nonempty] / norms[nonempty]
+
+        self._centroids = centroids
+        self._assign(size)
+
+    def _assign(self, size: int) -> None:
+        """把前 size 行分配到最近的聚类中心所在的桶"""
+        self._lists = [array("I") for _ in range(len(self._centroids))]
+        for start in range(0, size, 8192):
+            block = self._matrix[start:start + 8192][: size - start]
+            for offset, cluster in enumerate(np.argmax(block @ self._centroids.T, axis=1)):
+                self._lists[cluster].append(start + offset)
+
+    def _probe(self, vector: "np.ndarray") -> "np.ndarray":
+        centroid_scores = self._centroids @ vector
+        nprobe = min(self.nprobe, len(self._lists))
+        probe = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+        return np.concatenate([
+            np.frombuffer(self._lists[c], dtype=np.uint32) for c in probe
+        ]).astype(np.intp)
+
+    def _grow(self) -> None:
+        capacity = len(self._matrix) * 2
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._matrix)] = self._matrix
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._matrix, self._alive = matrix, alive
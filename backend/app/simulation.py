@@ -0,0 +1,177 @@
+"""
+Simulation - 虚拟时间下的大规模工作流模拟
+在 VirtualTimeEventLoop 中为大量空间同时运行真实的智能体工作流，
+统计每个空间的完成耗时，用于检验调度公平性与扩展性；同一种子的结果完全一致
+"""
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+import asyncio
+import tempfile
+import time
+
+from app.clock import clock, run_virtual
+
+
+# 模拟用户的需求: 首条需求之后是视觉/行为上的补充
+SAMPLE_REQUESTS = [
+    "我想做一个能被玩家推动的箱子",
+    "箱子的颜色改成红色",
+    "让箱子更重一点",
+    "推动箱子时播放音效",
+]
+
+Workflow = Callable[[str, str], Awaitable[None]]
+
+
+@dataclass
+class SimulationResult:
+    spaces: int
+    workflows: int
+    failed: int
+    # 全部工作流完成时的虚拟时间(秒)
+    virtual_seconds: float
+    wall_seconds: float
+    # 按空间序号排列: 该空间全部需求从到达到完成的虚拟耗时
+    latencies: List[float] = field(default_factory=list)
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    @property
+    def fairness(self) -> float:
+        """Jain 公平性指数: 1 表示各空间耗时完全相同，越接近 1/n 越不公平"""
+        if not self.latencies:
+            return 1.0
+        total = sum(self.latencies)
+        squares = sum(x * x for x in self.latencies)
+        return total * total / (len(self.latencies) * squares) if squares else 1.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "spaces": self.spaces,
+            "workflows": self.workflows,
+            "failed": self.failed,
+            "virtual_seconds": round(self.virtual_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "p50": round(self.percentile(0.5), 3),
+            "p99": round(self.percentile(0.99), 3),
+            "fairness": round(self.fairness, 4),
+        }
+
+
+async def simulate(
+    spaces: int = 100,
+    requests_per_space: int = 1,
+    arrival_window: float = 10.0,
+    max_concurrency: Optional[int] = None,
+    workflow: Optional[Workflow] = None,
+    prefix: str = "sim",
+) -> SimulationResult:
+    """
+    在当前事件循环中模拟 spaces 个空间
+
+    每个空间在 arrival_window 内随机到达，依次提交 requests_per_space 条需求；
+    max_concurrency 限制同时执行的工作流数量(模拟共享的工作进程池)，等待者按到达顺序执行
+    """
+    if workflow is None:
+        from app.api.websocket import run_workflow
+        workflow = run_workflow
+
+    rng = clock.random()
+    arrivals = [rng.uniform(0, arrival_window) for _ in range(spaces)]
+    requests = [
+        [SAMPLE_REQUESTS[0]] + [rng.choice(SAMPLE_REQUESTS[1:]) for _ in range(requests_per_space - 1)]
+        for _ in range(spaces)
+    ]
+    slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    latencies = [0.0] * spaces
+    failed = 0
+
+    async def run(request: str, space_id: str) -> None:
+        nonlocal failed
+        try:
+            if slots is None:
+                await workflow(space_id, request)
+            else:
+                async with slots:
+                    await workflow(space_id, request)
+        except Exception:
+            failed += 1
+
+    async def space(index: int) -> None:
+        await clock.sleep(arrivals[index])
+        start = clock.monotonic()
+        for request in requests[index]:
+            await run(request, f"{prefix}-{index}")
+        latencies[index] = clock.monotonic() - start
+
+    wall_start = time.perf_counter()
+    started = clock.monotonic()
+    await asyncio.gather(*(space(i) for i in range(spaces)))
+    return SimulationResult(
+        spaces=spaces,
+        workflows=spaces * requests_per_space,
+        failed=failed,
+        virtual_seconds=clock.monotonic() - started,
+        wall_seconds=time.perf_counter() - wall_start,
+        latencies=latencies,
+    )
+
+
+@contextmanager
+def isolated_services(inline_sandbox: bool = True) -> Iterator[None]:
+    """
+    把工作流使用的黑板、编排器、计量、沙箱与检索服务替换为全新的实例，结束后恢复
+
+    模拟不会复用之前执行留下的步骤记录，虚拟日期的用量写入临时目录，不影响真实的配额与用量文件
+    """
+    from app.accounting.accountant import Accountant
+    from app.accounting.store import UsageStore
+    from app.agents.incremental import Orchestrator
+    from app.api import websocket
+    from app.blackboard.blackboard import Blackboard
+    from app.sandbox.pool import SandboxPool
+    from app.sandbox.service import SandboxService
+    from app.search.service import SearchService
+
+    pool = websocket.sandbox_service.pool
+    if inline_sandbox:
+        pool = SandboxPool(limits=pool.limits, inline=True)
+
+    with tempfile.TemporaryDirectory(prefix="antigravity-sim-") as usage_dir:
+        board = Blackboard()
+        accountant = Accountant(UsageStore(Path(usage_dir)))
+        accountant.attach(board)
+        sandbox = SandboxService(pool, board)
+        sandbox.attach()
+        services = {
+            "blackboard": board,
+            "orchestrator": Orchestrator(board),
+            "accountant": accountant,
+            "sandbox_service": sandbox,
+            "search_service": SearchService(),
+        }
+        saved = {name: getattr(websocket, name) for name in services}
+        for name, service in services.items():
+            setattr(websocket, name, service)
+        try:
+            yield
+        finally:
+            for name, service in saved.items():
+                setattr(websocket, name, service)
+
+
+def run_simulation(seed: int = 0, inline_sandbox: bool = True, **kwargs) -> SimulationResult:
+    """
+    在新的虚拟时间事件循环中运行模拟
+
+    每次模拟使用独立的服务实例(见 isolated_services)，同一种子的结果完全一致；
+    inline_sandbox 为 True 时沙箱任务在当前进程内执行，结果不受真实进程调度影响
+    """
+    with isolated_services(inline_sandbox):
+        return run_virtual(simulate(**kwargs), seed=seed)
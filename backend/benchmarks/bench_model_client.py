@@ -0,0 +1,69 @@
+"""
+模型调用基准测试 - 对本地 stub 服务并发发起请求，比较有无对冲请求时的吞吐与尾延迟
+
+运行: python -m benchmarks.bench_model_client --requests 400 --tail-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.clients.model_client import ModelClient, ProviderConfig
+from app.clients.stub_server import StubSettings, create_stub_app
+
+
+async def _run(args, hedge_after) -> None:
+    settings = StubSettings(
+        latency=args.latency,
+        jitter=args.latency / 2,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        seed=7,
+    )
+    provider = ProviderConfig(
+        name="stub",
+        base_url="http://stub",
+        max_concurrency=args.concurrency,
+        hedge_after=hedge_after,
+    )
+    client = ModelClient(provider, transport=httpx.ASGITransport(app=create_stub_app(settings)), rng=random.Random(0))
+
+    timings = []
+
+    async def one(i: int) -> None:
+        t0 = time.perf_counter()
+        await client.chat([{"role": "user", "content": f"request {i}"}], model="stub")
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+
+    timings.sort()
+    label = "no hedge" if hedge_after is None else f"hedge {hedge_after * 1000:.0f}ms"
+    print(
+        f"{label:<12} {args.requests / elapsed:7.1f} req/s  "
+        f"p50 {timings[len(timings) // 2]:7.1f} ms  "
+        f"p99 {timings[int(len(timings) * 0.99)]:7.1f} ms  "
+        f"sent {client.stats.requests}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for hedge_after in (None, args.latency * 3):
+        asyncio.run(_run(args, hedge_after))
+
+
+if __name__ == "__main__":
+    main()
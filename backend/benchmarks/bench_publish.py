@@ -0,0 +1,79 @@
+"""
+任务发布基准测试 - 对比逐个 publish_task 与批量 publish_tasks
+
+运行: python -m benchmarks.bench_publish --tasks 200 --subscribers 4
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from app.blackboard.blackboard import AgentType, Blackboard, Task, TaskType
+
+
+def _tasks(count: int):
+    return [
+        Task(
+            id=str(uuid.uuid4()),
+            type=TaskType.GENERATE_IMAGE,
+            assigned_agent=AgentType.VOIDSHAPER,
+            input={"prompt": f"tile texture {i}"},
+            space_id="bench",
+        )
+        for i in range(count)
+    ]
+
+
+def _board(subscribers: int, notified: list) -> Blackboard:
+    board = Blackboard()
+
+    async def on_publish(data) -> None:
+        notified[0] += 1
+
+    for _ in range(subscribers):
+        board.subscribe("task_publish", on_publish)
+        board.subscribe("tasks_publish", on_publish)
+    return board
+
+
+async def _single(board: Blackboard, tasks) -> None:
+    for task in tasks:
+        await board.publish_task(task)
+
+
+async def _batch(board: Blackboard, tasks) -> None:
+    await board.publish_tasks(tasks)
+
+
+async def run(count: int, subscribers: int, rounds: int) -> None:
+    for label, publish in (("publish_task", _single), ("publish_tasks", _batch)):
+        timings = []
+        notified = [0]
+        messages = 0
+        for _ in range(rounds):
+            board = _board(subscribers, notified)
+            tasks = _tasks(count)
+            t0 = time.perf_counter()
+            await publish(board, tasks)
+            timings.append((time.perf_counter() - t0) * 1000)
+            messages += len(board.message_history)
+        timings.sort()
+        print(
+            f"{label:<14} p50 {timings[len(timings) // 2]:8.3f} ms  "
+            f"max {timings[-1]:8.3f} ms  "
+            f"notifications/round {notified[0] // rounds:5d}  "
+            f"history/round {messages // rounds:5d}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--subscribers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.subscribers, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+检索基准测试 - 构建大规模索引并测量查询延迟
+
+运行: python -m benchmarks.bench_search --docs 1000000
+"""
+import argparse
+import random
+import time
+
+from app.search.index import InvertedIndex, SearchDocument
+from app.search.vector import HashingEmbedder, VectorIndex
+
+
+_SUBJECTS = ["箱子", "角色", "敌人", "金币", "传送门", "平台", "背景", "按钮", "子弹", "宝箱"]
+_ACTIONS = ["可以被推动", "会跳跃", "会巡逻", "被拾取后消失", "带有粒子特效", "会旋转", "受重力影响", "可以被破坏"]
+_DETAILS = ["更重一点", "颜色更亮", "速度更快", "加上音效", "使用 RigidBody2D", "使用 Area2D", "碰撞层改为 2"]
+
+
+def _request(rng: random.Random) -> str:
+    return f"我想做一个{rng.choice(_ACTIONS)}的{rng.choice(_SUBJECTS)}，{rng.choice(_DETAILS)}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    embedder = HashingEmbedder()
+    text_index = InvertedIndex()
+    vectors = VectorIndex(embedder.dim)
+
+    start = time.perf_counter()
+    for i in range(args.docs):
+        content = _request(rng)
+        text_index.add(SearchDocument(id=f"m{i}", space_id="bench", kind="message", title="", content=content))
+        vectors.add(f"m{i}", embedder.embed(content))
+    print(f"indexed {args.docs} docs in {time.perf_counter() - start:.1f}s")
+
+    queries = [_request(rng) for _ in range(args.queries)]
+    for label, run in (
+        ("text (BM25)", lambda q: text_index.search(q, limit=20)),
+        ("similar (vector)", lambda q: vectors.search(embedder.embed(q), k=20)),
+    ):
+        timings = []
+        for q in queries:
+            t0 = time.perf_counter()
+            run(q)
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        print(
+            f"{label:<18} p50 {timings[len(timings) // 2]:7.2f} ms  "
+            f"p95 {timings[int(len(timings) * 0.95)]:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
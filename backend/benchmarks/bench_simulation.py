@@ -0,0 +1,36 @@
+"""
+虚拟时间模拟基准测试 - 数千个空间的真实工作流在虚拟时间中的完成耗时与公平性
+
+运行: python -m benchmarks.bench_simulation --spaces 2000 --concurrency 64
+"""
+import argparse
+
+from app.simulation import run_simulation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spaces", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=1, help="每个空间依次提交的需求数")
+    parser.add_argument("--window", type=float, default=60.0, help="空间到达的时间窗口(虚拟秒)")
+    parser.add_argument("--concurrency", type=int, default=0, help="同时执行的工作流上限，0 表示不限制")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    result = run_simulation(
+        seed=args.seed,
+        spaces=args.spaces,
+        requests_per_space=args.requests,
+        arrival_window=args.window,
+        max_concurrency=args.concurrency or None,
+    )
+    print(
+        f"spaces {result.spaces}  workflows {result.workflows}  failed {result.failed}\n"
+        f"virtual {result.virtual_seconds:10.1f} s  wall {result.wall_seconds:8.2f} s  "
+        f"speedup {result.virtual_seconds / max(result.wall_seconds, 1e-9):8.0f}x\n"
+        f"latency p50 {result.percentile(0.5):8.2f} s  p99 {result.percentile(0.99):8.2f} s  "
+        f"fairness {result.fairness:.4f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
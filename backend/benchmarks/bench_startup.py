@@ -0,0 +1,132 @@
+"""
+启动基准测试 - 测量冷启动导入耗时与预热耗时，超出预算或提前导入重量级依赖时以非零状态退出
+
+运行: python -m benchmarks.bench_startup --runs 5 --budget-ms 1000
+"""
+from typing import Dict, List, Tuple
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 导入结束的分隔标记，之后的 importtime 输出属于预热阶段(含沙箱子进程)
+MARKER = "--- app.main imported ---"
+
+# 子进程中执行: 导入应用、运行预热钩子，最后输出 JSON
+_PROBE = """
+import asyncio, json, sys, time
+MARKER = %r
+start = time.perf_counter()
+import app.main
+from app.lifecycle import lifecycle
+imported = time.perf_counter()
+loaded = sorted(sys.modules)
+print(MARKER, file=sys.stderr, flush=True)
+
+async def main():
+    timings = await lifecycle.warm_up()
+    ready = time.perf_counter()
+    await lifecycle.shutdown()
+    return timings, ready
+
+timings, ready = asyncio.run(main())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "warmup": timings,
+    "modules": loaded,
+}))
+"""
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[int, int, int, str]]:
+    """解析 -X importtime 输出为 (深度, 自身微秒, 累计微秒, 模块名)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def _probe() -> Tuple[Dict, List[Tuple[int, int, int, str]]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE % MARKER],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    startup_stderr = completed.stderr.split(MARKER)[0]
+    return json.loads(completed.stdout.strip().splitlines()[-1]), _parse_importtime(startup_stderr)
+
+
+def _print_breakdown(rows: List[Tuple[int, int, int, str]], top: int) -> None:
+    by_package: Dict[str, int] = {}
+    for _, self_us, _, name in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    total = sum(by_package.values()) or 1
+    print(f"\nimport time by top-level package (top {top}):")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<28} {self_us / 1000:8.1f} ms  {self_us * 100 / total:5.1f}%")
+
+    print("\napp modules (cumulative):")
+    app_rows = [row for row in rows if row[3].startswith("app.") or row[3] == "app"]
+    for _, _, cumulative_us, name in sorted(app_rows, key=lambda row: -row[2])[:top]:
+        print(f"  {name:<28} {cumulative_us / 1000:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="导入 + 预热完成的耗时上限")
+    parser.add_argument("--import-budget-ms", type=float, default=600.0, help="import app.main 的耗时上限")
+    parser.add_argument(
+        "--forbid",
+        default="numpy,httpx,openai,PIL",
+        help="启动时不应被导入的模块(逗号分隔)",
+    )
+    args = parser.parse_args()
+
+    results = []
+    rows: List[Tuple[int, int, int, str]] = []
+    for _ in range(args.runs):
+        result, rows = _probe()
+        results.append(result)
+
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    ready_ms = statistics.median(r["ready_ms"] for r in results)
+    print(f"import app.main   median {import_ms:7.1f} ms  (min {min(r['import_ms'] for r in results):.1f})")
+    print(f"ready (warmed up) median {ready_ms:7.1f} ms  (min {min(r['ready_ms'] for r in results):.1f})")
+    for name, ms in sorted(results[-1]["warmup"].items()):
+        print(f"  warm-up {name:<20} {ms:7.1f} ms")
+    _print_breakdown(rows, args.top)
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import took {import_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    if ready_ms > args.budget_ms:
+        failures.append(f"ready after {ready_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    forbidden = [m for m in args.forbid.split(",") if m and m in results[-1]["modules"]]
+    if forbidden:
+        failures.append(f"heavy modules imported at startup: {', '.join(forbidden)}")
+
+    if failures:
+        print("\nSTARTUP REGRESSION:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nstartup within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+任务内存基准测试 - 对比普通 dataclass 任务与 __slots__ 任务 + 共享载荷存储的单任务内存占用
+
+每个任务带一条提示词输入和一份完整代码输出，并在消息历史中记录完成消息；
+代码从若干变体中选取，每个任务持有独立的字符串对象(与模型返回的内容一致)
+
+运行: python -m benchmarks.bench_task_memory  (默认 1,000,000 个任务，可用 --tasks 调整)
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.blackboard.blackboard import AgentType, BlackboardMessage, Task, TaskStatus, TaskType
+from app.blackboard.blobs import BlobStore
+
+
+@dataclass
+class LegacyTask:
+    """改造前的任务定义"""
+    id: str
+    type: TaskType
+    assigned_agent: AgentType
+    input: Dict[str, Any]
+    status: TaskStatus = TaskStatus.PENDING
+    output: Optional[Dict[str, Any]] = None
+    partial_output: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+    space_id: Optional[str] = None
+
+
+@dataclass
+class LegacyMessage:
+    type: str
+    sender: AgentType
+    payload: Any
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+def _variants(count: int, lines: int, rng: random.Random) -> List[str]:
+    body = [f"    var speed_{i} = {rng.randint(1, 500)}\n" for i in range(lines)]
+    return [f"extends RigidBody2D\n# variant {v}\n" + "".join(rng.sample(body, len(body))) for v in range(count)]
+
+
+def _fresh(value: str) -> str:
+    """复制出新的字符串对象，模拟从网络/模型响应解码得到的内容"""
+    return (value + " ")[:-1]
+
+
+def _legacy(i: int, code: str, space: str) -> tuple:
+    task = LegacyTask(
+        id=f"task-{i}",
+        type=TaskType.WRITE_CODE,
+        assigned_agent=AgentType.CODEWEAVER,
+        input={"requirement": _fresh(f"为第 {i % 500} 块地砖编写碰撞脚本"), "texture": f"res://tiles/{i % 500}.png"},
+        space_id=_fresh(space),
+    )
+    task.output = {"code": _fresh(code)}
+    task.status = TaskStatus.COMPLETED
+    message = LegacyMessage(type="task_complete", sender=task.assigned_agent,
+                            payload={"task_id": task.id, "output": task.output})
+    return task, message
+
+
+def _compact(i: int, code: str, space: str, blobs: BlobStore) -> tuple:
+    task = Task(
+        id=f"task-{i}",
+        type=TaskType.WRITE_CODE,
+        assigned_agent=AgentType.CODEWEAVER,
+        input={"requirement": _fresh(f"为第 {i % 500} 块地砖编写碰撞脚本"), "texture": f"res://tiles/{i % 500}.png"},
+        space_id=_fresh(space),
+    )
+    # 与 Blackboard 发布/完成任务时的处理一致
+    task.input = blobs.pack(task.input)
+    task.output = blobs.pack({"code": _fresh(code)})
+    task.status = TaskStatus.COMPLETED
+    message = BlackboardMessage(type="task_complete", sender=task.assigned_agent,
+                                payload={"task_id": task.id, "output": task.output})
+    return task, message
+
+
+def measure(label: str, build, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    records = [build(i) for i in range(count)]
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_task = current / count
+    print(f"{label:<22} {per_task:9.1f} B/task  total {current / 2**20:8.1f} MiB  build {elapsed:5.1f}s")
+    del records
+    gc.collect()
+    return per_task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--variants", type=int, default=100, help="不同代码文件的数量")
+    parser.add_argument("--lines", type=int, default=60, help="每份代码的行数")
+    parser.add_argument("--threshold", type=int, default=1024)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    variants = _variants(args.variants, args.lines, rng)
+    picks = [rng.randrange(len(variants)) for _ in range(args.tasks)]
+    print(f"{args.tasks} tasks, code ~{sum(map(len, variants)) // len(variants)} chars, {args.variants} variants")
+
+    before = measure("dataclass + dict", lambda i: _legacy(i, variants[picks[i]], "space-1"), args.tasks)
+    blobs = BlobStore(threshold=args.threshold)
+    after = measure("slots + blob store", lambda i: _compact(i, variants[picks[i]], "space-1", blobs), args.tasks)
+    print(f"reduction {(1 - after / before) * 100:5.1f}%  ({len(blobs)} blobs, {blobs.size / 2**10:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
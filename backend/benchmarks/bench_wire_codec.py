@@ -0,0 +1,87 @@
+"""
+Wire Codec 基准测试 - 对比 JSON 与 msgpack+deflate 的字节数与编码耗时
+
+运行: python -m benchmarks.bench_wire_codec
+"""
+import json
+import time
+
+from app.realtime.codec import WireCodec
+
+
+def _code_asset_payload() -> dict:
+    """最大的代码资产: 约 40KB 的 GDScript"""
+    lines = []
+    for i in range(600):
+        lines.append(f"func _on_body_entered_{i}(body: Node2D) -> void:")
+        lines.append(f"    if body.is_in_group(\"player\"):\n        apply_central_impulse(Vector2({i}, 0))")
+    return {
+        'assetId': 'a3f1c2d4-5e6f-4a7b-8c9d-0e1f2a3b4c5d',
+        'type': 'code',
+        'content': "extends RigidBody2D\n\n" + "\n".join(lines),
+        'agent': 'codeweaver',
+        'title': 'script.gd',
+    }
+
+
+def _streaming_payload(i: int) -> dict:
+    """流式输出的单条增量消息"""
+    return {
+        'agent': 'codeweaver',
+        'content': f'⚙️ 正在编写代码逻辑... 第 {i} 段',
+        'status': 'streaming',
+        'statusItems': [
+            {'id': 'cw1', 'text': 'GDScript 生成中', 'status': 'running'},
+            {'id': 'cw2', 'text': '语法检查', 'status': 'pending'},
+        ],
+        'seq': 1000 + i,
+    }
+
+
+def _summary_payload() -> dict:
+    return {
+        'tasks': {'pending': 12, 'running': 3, 'completed': 240},
+        'resources': {
+            'textures': [f'crate_{i}' for i in range(50)],
+            'scripts': [f'script_{i}' for i in range(50)],
+            'test_results': [f'result_{i}' for i in range(50)],
+        },
+        'agent_status': {
+            'producer': 'idle', 'voidshaper': 'busy',
+            'codeweaver': 'busy', 'inquisitor': 'idle',
+        },
+    }
+
+
+def _measure(label: str, event: str, payloads: list, codec: WireCodec, rounds: int) -> None:
+    json_bytes = sum(len(json.dumps([event, p], ensure_ascii=False).encode()) for p in payloads)
+    wire_bytes = sum(len(codec.encode(event, p)) for p in payloads)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for p in payloads:
+            json.dumps([event, p], ensure_ascii=False).encode()
+    json_us = (time.perf_counter() - start) / (rounds * len(payloads)) * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for p in payloads:
+            codec.encode(event, p)
+    wire_us = (time.perf_counter() - start) / (rounds * len(payloads)) * 1e6
+
+    print(
+        f"{label:<20} json {json_bytes:>9} B {json_us:>8.1f} us/msg | "
+        f"wire {wire_bytes:>9} B {wire_us:>8.1f} us/msg | "
+        f"saved {100 - wire_bytes * 100 / json_bytes:5.1f}%"
+    )
+
+
+def main() -> None:
+    codec = WireCodec()
+    _measure("code asset", "asset:created", [_code_asset_payload()], codec, rounds=200)
+    _measure("streaming x1000", "agent:message", [_streaming_payload(i) for i in range(1000)], codec, rounds=5)
+    _measure("blackboard summary", "blackboard:update", [_summary_payload()], codec, rounds=2000)
+
+
+if __name__ == "__main__":
+    main()
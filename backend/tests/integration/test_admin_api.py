@@ -0,0 +1,70 @@
+"""
+管理接口集成测试
+"""
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app import config
+from app.main import app
+
+
+def make_client(host: str = "127.0.0.1") -> AsyncClient:
+    return AsyncClient(transport=ASGITransport(app=app, client=(host, 1234)), base_url="http://test")
+
+
+class TestAdminApi:
+    """管理接口鉴权测试"""
+
+    @pytest_asyncio.fixture
+    async def client(self):
+        """本机测试客户端"""
+        async with make_client() as client:
+            yield client
+
+    @pytest_asyncio.fixture
+    async def remote(self):
+        """其他主机的测试客户端"""
+        async with make_client("10.0.0.5") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_loopback_allowed_without_token(self, client, monkeypatch):
+        """测试未配置令牌时本机可以访问"""
+        monkeypatch.setattr(config, "ADMIN_TOKEN", None)
+        response = await client.get("/api/admin/drain")
+        assert response.status_code == 200
+        assert response.json()["draining"] is False
+
+    @pytest.mark.asyncio
+    async def test_remote_rejected_without_token(self, remote, monkeypatch):
+        """测试未配置令牌时拒绝其他主机排空"""
+        monkeypatch.setattr(config, "ADMIN_TOKEN", None)
+        response = await remote.post("/api/admin/drain")
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_token_required_when_configured(self, remote, monkeypatch):
+        """测试配置令牌后必须携带正确的请求头"""
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+        assert (await remote.post("/api/admin/drain")).status_code == 401
+        assert (await remote.post("/api/admin/drain", headers={"X-Admin-Token": "wrong"})).status_code == 401
+
+        response = await remote.get("/api/admin/drain", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_quota_and_usage_require_admin(self, remote, monkeypatch):
+        """测试配额与用量接口同样需要管理权限"""
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+        assert (await remote.get("/api/admin/usage/space/s1")).status_code == 401
+        assert (await remote.get("/api/spaces/s1/usage")).status_code == 401
+        assert (await remote.put("/api/admin/quotas/space/s1", json={"max_active": 1})).status_code == 401
+
+        response = await remote.put(
+            "/api/admin/quotas/space/admin-space",
+            json={"max_active": 5},
+            headers={"X-Admin-Token": "secret"},
+        )
+        assert response.status_code == 200
+        assert response.json()["quota"]["max_active"] == 5
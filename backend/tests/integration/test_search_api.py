@@ -0,0 +1,50 @@
+"""
+检索接口集成测试
+"""
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+
+
+class TestSearchApi:
+    """检索接口测试"""
+
+    @pytest_asyncio.fixture
+    async def client(self):
+        """创建测试客户端"""
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_search_messages(self, client):
+        """测试检索历史消息"""
+        await client.post(
+            "/api/spaces/search-space/messages",
+            json={"content": "我想做一个能被玩家推动的箱子", "role": "user"}
+        )
+        await client.post(
+            "/api/spaces/search-space/messages",
+            json={"content": "添加背景音乐", "role": "user"}
+        )
+
+        response = await client.get("/api/spaces/search-space/search", params={"q": "箱子"})
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["snippet"] for r in data["results"]] == ["我想做一个能被玩家推动的箱子"]
+
+        response = await client.get(
+            "/api/spaces/search-space/search",
+            params={"q": "推动一个箱子", "mode": "similar", "limit": 1},
+        )
+        assert response.json()["results"][0]["kind"] == "message"
+
+    @pytest.mark.asyncio
+    async def test_invalid_mode(self, client):
+        """测试非法检索模式"""
+        response = await client.get("/api/spaces/demo/search", params={"q": "x", "mode": "fuzzy"})
+        assert response.status_code == 422
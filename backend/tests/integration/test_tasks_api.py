@@ -0,0 +1,158 @@
+"""
+任务接口集成测试
+"""
+import pytest
+import pytest_asyncio
+import json
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.api.routes.tasks import task_events
+from app.blackboard.blackboard import AgentType, Blackboard, Task, TaskType, blackboard
+
+
+class TestTasksApi:
+    """任务接口测试"""
+
+    @pytest_asyncio.fixture
+    async def client(self):
+        """创建测试客户端"""
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_batch_publish(self, client):
+        """测试批量发布任务"""
+        before = len(blackboard.get_pending_tasks_for_agent(AgentType.VOIDSHAPER))
+        response = await client.post(
+            "/api/spaces/batch-space/tasks:batch",
+            json={"tasks": [
+                {"type": "generate_image", "input": {"prompt": f"tile {i}"}}
+                for i in range(20)
+            ]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["space_id"] == "batch-space"
+        assert len(data["task_ids"]) == 20
+
+        pending = blackboard.get_pending_tasks_for_agent(AgentType.VOIDSHAPER)
+        assert len(pending) == before + 20
+        assert [task.id for task in pending[before:]] == data["task_ids"]
+
+    @pytest.mark.asyncio
+    async def test_batch_rejects_duplicate_ids(self, client):
+        """测试重复 id 整批拒绝"""
+        response = await client.post(
+            "/api/spaces/batch-space/tasks:batch",
+            json={"tasks": [
+                {"type": "write_code", "id": "dup"},
+                {"type": "write_code", "id": "dup"},
+            ]},
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_batch_rejects_existing_ids(self, client):
+        """测试与已发布任务 id 相同的批次返回 409，原任务不被覆盖"""
+        first = await client.post(
+            "/api/spaces/batch-space/tasks:batch",
+            json={"tasks": [{"type": "write_code", "id": "cross-batch", "input": {"v": 1}}]},
+        )
+        assert first.status_code == 200
+
+        second = await client.post(
+            "/api/spaces/other-space/tasks:batch",
+            json={"tasks": [
+                {"type": "write_code", "id": "fresh-id"},
+                {"type": "write_code", "id": "cross-batch", "input": {"v": 2}},
+            ]},
+        )
+        assert second.status_code == 409
+        task = blackboard.task_index.get("cross-batch")
+        assert task.space_id == "batch-space"
+        assert task.input["v"] == 1
+        assert "fresh-id" not in blackboard.task_index
+
+    @pytest.mark.asyncio
+    async def test_batch_validates_size(self, client):
+        """测试空批次被拒绝"""
+        response = await client.post("/api/spaces/batch-space/tasks:batch", json={"tasks": []})
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_list_tasks_paginated(self, client):
+        """测试过滤与游标分页"""
+        await client.post(
+            "/api/spaces/list-space/tasks:batch",
+            json={"tasks": [{"type": "generate_image"} for _ in range(5)] + [{"type": "write_code"}]},
+        )
+
+        response = await client.get("/api/spaces/list-space/tasks", params={"type": "generate_image", "limit": 3})
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["tasks"]) == 3
+        assert data["counts"]["pending"] == 6
+
+        response = await client.get(
+            "/api/spaces/list-space/tasks",
+            params={"type": "generate_image", "limit": 3, "cursor": data["next_cursor"]},
+        )
+        data = response.json()
+        assert len(data["tasks"]) == 2
+        assert data["next_cursor"] is None
+
+        response = await client.get("/api/spaces/list-space/tasks", params={"cursor": "abc"})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_task_event_stream(self):
+        """测试 SSE 事件流"""
+        board = Blackboard()
+        stream = task_events("sse-space", board, heartbeat=0.01)
+
+        first = await anext(stream)
+        assert first.startswith("event: counts\n")
+        assert await anext(stream) == ": ping\n\n"
+
+        task = Task(id="sse-1", type=TaskType.WRITE_CODE, assigned_agent=AgentType.CODEWEAVER,
+                    input={}, space_id="sse-space")
+        await board.publish_task(task)
+        await board.claim_task(AgentType.CODEWEAVER)
+
+        published = json.loads((await anext(stream)).split("data: ", 1)[1])
+        claimed = json.loads((await anext(stream)).split("data: ", 1)[1])
+        assert published["event"] == "task_publish"
+        assert published["task"] == {"id": "sse-1", "status": "pending", "agent": "codeweaver", "type": "write_code"}
+        assert claimed["task"]["status"] == "running"
+        assert claimed["counts"]["running"] == 1
+
+        await stream.aclose()
+        assert board._subscribers["task_publish"] == []
+
+    @pytest.mark.asyncio
+    async def test_task_event_stream_overflow_resyncs(self):
+        """测试客户端跟不上时丢弃积压并发送 resync"""
+        board = Blackboard()
+        stream = task_events("sse-space", board, heartbeat=10, queue_size=4)
+        await anext(stream)
+
+        await board.publish_tasks([
+            Task(id=f"burst-{i}", type=TaskType.WRITE_CODE, assigned_agent=AgentType.CODEWEAVER,
+                 input={}, space_id="sse-space")
+            for i in range(10)
+        ])
+
+        chunk = await anext(stream)
+        assert chunk.startswith("event: resync\n")
+        resync = json.loads(chunk.split("data: ", 1)[1])
+        assert resync["dropped"] == 10
+        assert resync["counts"]["pending"] == 10
+
+        await board.claim_task(AgentType.CODEWEAVER)
+        claimed = json.loads((await anext(stream)).split("data: ", 1)[1])
+        assert claimed["event"] == "task_claim"
+        await stream.aclose()
@@ -0,0 +1,139 @@
+"""
+用量计量与配额单元测试
+"""
+import pytest
+import json
+
+import httpx
+
+from app.accounting.accountant import Accountant, Quota, QuotaExceeded
+from app.accounting.store import Usage, UsageStore
+from app.blackboard.blackboard import AgentType, Blackboard, Task, TaskType
+from app.blackboard.blobs import BlobStore
+from app.clients.model_client import ModelClient, ProviderConfig
+
+
+def _task(i: int, space: str = "s1") -> Task:
+    return Task(id=f"{space}-{i}", type=TaskType.WRITE_CODE, assigned_agent=AgentType.CODEWEAVER,
+                input={}, space_id=space)
+
+
+class TestAccountant:
+    """计量测试"""
+
+    @pytest.fixture
+    def setup(self, tmp_path):
+        board = Blackboard(blobs=BlobStore(threshold=8))
+        accountant = Accountant(
+            UsageStore(tmp_path),
+            space_quota=Quota(max_active=3),
+            user_quota=Quota(max_active=4, tokens=100),
+        )
+        accountant.attach(board)
+        return board, accountant
+
+    @pytest.mark.asyncio
+    async def test_active_quota_per_space(self, setup):
+        """测试空间未完成任务数超限时整批拒绝"""
+        board, accountant = setup
+        await board.publish_tasks([_task(i) for i in range(2)])
+
+        with pytest.raises(QuotaExceeded) as exc:
+            await board.publish_tasks([_task(i) for i in range(2, 4)])
+        assert exc.value.resource == "active_tasks"
+        assert len(board.tasks["pending"]) == 2
+
+        # 完成一个任务后释放名额
+        await board.claim_task(AgentType.CODEWEAVER, "s1-0")
+        await board.complete_task("s1-0", {"code": "extends Node2D\n"})
+        await board.publish_tasks([_task(i) for i in range(2, 4)])
+        assert accountant.usage("space:s1")["active_tasks"] == 3
+
+    @pytest.mark.asyncio
+    async def test_user_quota_spans_spaces(self, setup):
+        """测试同一用户的多个空间共享用户配额"""
+        board, accountant = setup
+        accountant.assign("a", "alice")
+        accountant.assign("b", "alice")
+        await board.publish_tasks([_task(i, "a") for i in range(3)])
+
+        with pytest.raises(QuotaExceeded) as exc:
+            await board.publish_tasks([_task(i, "b") for i in range(2)])
+        assert exc.value.key == "user:alice"
+        await board.publish_task(_task(0, "b"))
+
+    @pytest.mark.asyncio
+    async def test_meters_wall_time_and_bytes(self, setup):
+        """测试完成任务时计入执行时间与输出字节数"""
+        board, accountant = setup
+        accountant.assign("s1", "alice")
+        await board.publish_task(_task(0))
+        await board.claim_task(AgentType.CODEWEAVER)
+        await board.fail_task("s1-0", {"error": "语法错误"})
+
+        for key in ("space:s1", "user:alice"):
+            usage = accountant.usage(key)
+            assert usage["tasks"] == 1
+            assert usage["asset_bytes"] == len("语法错误".encode("utf-8"))
+            assert usage["wall_ms"] >= 0
+            assert usage["active_tasks"] == 0
+
+    @pytest.mark.asyncio
+    async def test_token_quota(self, setup):
+        """测试模型 token 计入 scope 指定的空间，用尽后拒绝发布"""
+        board, accountant = setup
+        accountant.assign("s1", "alice")
+        with accountant.scope("s1"):
+            accountant.charge_tokens(120)
+        accountant.charge_tokens(50)  # 没有 scope，不计入
+
+        assert accountant.usage("user:alice")["tokens"] == 120
+        with pytest.raises(QuotaExceeded) as exc:
+            await board.publish_task(_task(0))
+        assert exc.value.resource == "tokens"
+
+    @pytest.mark.asyncio
+    async def test_flush_batches_and_reload(self, setup, tmp_path):
+        """测试批量落盘与重启后恢复当日用量"""
+        board, accountant = setup
+        await board.publish_tasks([_task(i) for i in range(3)])
+        accountant.charge_tokens(7, space_id="s1")
+
+        assert await accountant.flush() == 1
+        assert await accountant.flush() == 0
+        lines = next(tmp_path.glob("usage-*.jsonl")).read_text().splitlines()
+        assert [json.loads(line)["tasks"] for line in lines] == [3]
+
+        restarted = Accountant(UsageStore(tmp_path))
+        restarted.load()
+        assert restarted.usage("space:s1")["tokens"] == 7
+
+    def test_store_skips_torn_lines(self, tmp_path):
+        """测试写入中断留下的半行被跳过"""
+        store = UsageStore(tmp_path)
+        store.append("20260101", {"space:s1": Usage(tasks=2)}, 0.0)
+        with open(tmp_path / "usage-20260101.jsonl", "a") as f:
+            f.write('{"key": "space:s1", "tas')
+        assert store.load("20260101")["space:s1"].tasks == 2
+
+
+class TestModelClientUsage:
+    """模型调用 token 计量测试"""
+
+    @pytest.mark.asyncio
+    async def test_charges_response_usage(self, monkeypatch):
+        """测试响应中的 usage 计入当前空间"""
+        import app.clients.model_client as model_client_module
+
+        charged = []
+        monkeypatch.setattr(model_client_module.accountant, "charge_tokens", charged.append)
+
+        def handler(request):
+            return httpx.Response(200, json={"choices": [], "usage": {"total_tokens": 42}})
+
+        client = ModelClient(ProviderConfig(name="stub", base_url="http://stub"), transport=httpx.MockTransport(handler))
+        await client.chat([{"role": "user", "content": "hi"}], model="stub")
+        await client.aclose()
+
+        assert charged == [42]
+        assert client.stats.tokens == 42
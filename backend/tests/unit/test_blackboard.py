@@ -11,6 +11,7 @@ from app.blackboard.blackboard import (
     TaskType,
     TaskStatus,
     AgentType,
+    DuplicateTaskError,
 )
 
 
@@ -182,3 +183,46 @@ class TestBlackboard:
         
         assert ("publish", "task-001") in received_events
         assert ("complete", "task-001") in received_events
+    
+    @pytest.mark.asyncio
+    async def test_publish_tasks_batch(self, blackboard):
+        """测试批量发布: 一条历史消息、一次通知"""
+        received = []
+        blackboard.subscribe("tasks_publish", lambda tasks: received.append([t.id for t in tasks]))
+        tasks = [
+            Task(id=f"tile-{i}", type=TaskType.GENERATE_IMAGE,
+                 assigned_agent=AgentType.VOIDSHAPER, input={"prompt": f"tile {i}"})
+            for i in range(5)
+        ] + [Task(id="code-1", type=TaskType.WRITE_CODE, assigned_agent=AgentType.CODEWEAVER, input={})]
+        
+        ids = await blackboard.publish_tasks(tasks)
+        
+        assert ids == [task.id for task in tasks]
+        assert received == [ids]
+        assert len(blackboard.message_history) == 1
+        assert blackboard.message_history[0].type == "tasks_publish"
+        assert len(blackboard.get_pending_tasks_for_agent(AgentType.VOIDSHAPER)) == 5
+        assert blackboard.get_summary()["tasks"]["pending"] == 6
+    
+    @pytest.mark.asyncio
+    async def test_publish_rejects_existing_ids(self, blackboard, sample_task):
+        """测试与已发布任务 id 相同的单个或批量发布被拒绝"""
+        await blackboard.publish_task(sample_task)
+        again = Task(id=sample_task.id, type=TaskType.WRITE_CODE, assigned_agent=AgentType.CODEWEAVER, input={})
+
+        with pytest.raises(DuplicateTaskError):
+            await blackboard.publish_task(again)
+        with pytest.raises(DuplicateTaskError):
+            await blackboard.publish_tasks([again])
+
+        assert blackboard.task_index.get(sample_task.id) is sample_task
+        assert len(blackboard.tasks["pending"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_publish_tasks_rejects_duplicates(self, blackboard, sample_task):
+        """测试批内 id 重复时整批拒绝"""
+        with pytest.raises(ValueError):
+            await blackboard.publish_tasks([sample_task, sample_task])
+        
+        assert blackboard.tasks["pending"] == []
+        assert blackboard.message_history == []
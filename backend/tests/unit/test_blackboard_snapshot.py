@@ -0,0 +1,147 @@
+"""
+黑板快照单元测试
+"""
+import pytest
+
+from app.blackboard.blackboard import (
+    Blackboard,
+    Task,
+    TaskType,
+    AgentType,
+)
+from app.blackboard.snapshot import FrozenMap, PersistentSeq
+
+
+def make_task(task_id: str, agent: AgentType = AgentType.VOIDSHAPER) -> Task:
+    return Task(
+        id=task_id,
+        type=TaskType.GENERATE_IMAGE,
+        assigned_agent=agent,
+        input={"prompt": "wooden crate"},
+    )
+
+
+class TestFrozenMap:
+    """不可变映射测试"""
+
+    def test_copy_on_write(self):
+        """测试修改返回新实例"""
+        base = FrozenMap({"a": 1})
+        changed = base.set("b", 2)
+
+        assert dict(base) == {"a": 1}
+        assert dict(changed) == {"a": 1, "b": 2}
+        assert changed.delete("a") == {"b": 2}
+        assert base.update({}) is base
+        with pytest.raises(TypeError):
+            base["c"] = 3
+
+    def test_large_map_shares_structure(self):
+        """测试大映射的修改与删除(含哈希冲突)"""
+        class Key:
+            def __init__(self, name):
+                self.name = name
+
+            def __hash__(self):
+                return 42
+
+            def __eq__(self, other):
+                return isinstance(other, Key) and other.name == self.name
+
+        base = FrozenMap({f"k{i}": i for i in range(1000)})
+        changed = base.set("k5", -5).set("new", 1).delete("k7")
+
+        assert len(base) == 1000 and base["k5"] == 5 and "k7" in base
+        assert len(changed) == 1000
+        assert changed["k5"] == -5 and changed["new"] == 1 and "k7" not in changed
+        assert dict(changed) == {**{f"k{i}": i for i in range(1000) if i != 7}, "k5": -5, "new": 1}
+        assert changed.delete("missing") is changed
+
+        colliding = FrozenMap({Key(i): i for i in range(20)})
+        assert [colliding[Key(i)] for i in range(20)] == list(range(20))
+        shrunk = colliding
+        for i in range(19):
+            shrunk = shrunk.delete(Key(i))
+        assert dict(shrunk) == {Key(19): 19}
+        assert len(colliding) == 20
+
+
+class TestPersistentSeq:
+    """不可变序列测试"""
+
+    def test_append_and_remove(self):
+        """测试追加与删除返回新实例"""
+        base = PersistentSeq(range(200))
+        changed = base.append(200).remove(0).remove(100)
+
+        assert list(base) == list(range(200))
+        assert list(changed) == [i for i in range(1, 201) if i != 100]
+        assert changed[0] == 1 and changed[-1] == 200 and len(changed) == 199
+        with pytest.raises(ValueError):
+            base.remove(500)
+        assert list(changed.extend(range(300, 400))) == list(changed) + list(range(300, 400))
+
+
+class TestBlackboardSnapshot:
+    """快照一致性测试"""
+
+    @pytest.fixture
+    def blackboard(self):
+        return Blackboard()
+
+    @pytest.mark.asyncio
+    async def test_old_snapshot_is_stable(self, blackboard):
+        """测试旧快照不受后续修改影响"""
+        await blackboard.publish_task(make_task("t1"))
+        before = blackboard.snapshot
+
+        await blackboard.claim_task(AgentType.VOIDSHAPER)
+        blackboard.update_resource("textures", "crate", "res://crate.png")
+        after = blackboard.snapshot
+
+        assert after.version > before.version
+        assert before.counts == {"pending": 1, "running": 0, "completed": 0}
+        assert [t.id for t in before.pending_for(AgentType.VOIDSHAPER)] == ["t1"]
+        assert before.get_resource("textures", "crate") is None
+        assert after.counts == {"pending": 0, "running": 1, "completed": 0}
+        assert after.agent_status[AgentType.VOIDSHAPER] == "busy"
+        assert after.get_resource("textures", "crate") == "res://crate.png"
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_wait_for_lock(self, blackboard):
+        """测试读取不需要等待写锁"""
+        await blackboard.publish_task(make_task("t1"))
+
+        async with blackboard._lock:
+            summary = blackboard.get_summary()
+            pending = blackboard.get_pending_tasks_for_agent(AgentType.VOIDSHAPER)
+
+        assert summary["tasks"]["pending"] == 1
+        assert [t.id for t in pending] == ["t1"]
+
+    @pytest.mark.asyncio
+    async def test_counts_maintained_incrementally(self, blackboard):
+        """测试计数随任务流转增量更新"""
+        for i in range(3):
+            await blackboard.publish_task(make_task(f"v{i}"))
+        await blackboard.publish_task(make_task("c0", AgentType.CODEWEAVER))
+        await blackboard.claim_task(AgentType.VOIDSHAPER)
+        await blackboard.complete_task("v0", {"path": "res://v0.png"})
+
+        summary = blackboard.get_summary()
+        assert summary["tasks"] == {"pending": 3, "running": 0, "completed": 1}
+        assert len(blackboard.get_pending_tasks_for_agent(AgentType.VOIDSHAPER)) == 2
+        assert len(blackboard.get_pending_tasks_for_agent(AgentType.CODEWEAVER)) == 1
+
+    @pytest.mark.asyncio
+    async def test_reassigning_queues_rebuilds_snapshot(self, blackboard):
+        """测试整体替换队列与资源后快照同步更新"""
+        await blackboard.publish_task(make_task("t1"))
+        blackboard.update_resource("textures", "crate", "res://crate.png")
+
+        blackboard.tasks = {"pending": [], "running": [], "completed": []}
+        blackboard.resources = {"textures": {}, "scripts": {}, "test_results": {}}
+
+        assert blackboard.get_summary()["tasks"]["pending"] == 0
+        assert blackboard.get_pending_tasks_for_agent(AgentType.VOIDSHAPER) == []
+        assert blackboard.get_resource("textures", "crate") is None
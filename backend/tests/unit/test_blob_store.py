@@ -0,0 +1,69 @@
+"""
+任务载荷存储单元测试
+"""
+import pytest
+import json
+
+from app.blackboard.blackboard import AgentType, Blackboard, Task, TaskType
+from app.blackboard.blobs import BlobRef, BlobStore
+
+
+class TestBlobStore:
+    """载荷存储测试"""
+
+    def test_large_values_stored_once(self):
+        """测试超过阈值的字符串按内容只保存一份"""
+        store = BlobStore(threshold=16)
+        code = "extends RigidBody2D\n" * 10
+        first = store.pack({"code": code, "lang": "gdscript"})
+        second = store.pack({"code": "".join(["extends RigidBody2D\n"] * 10)})
+
+        assert len(store) == 1
+        assert first.raw()["code"] is second.raw()["code"]
+        assert isinstance(first.raw()["code"], BlobRef)
+        assert first.raw()["lang"] == "gdscript"
+        assert first["code"] == code
+        assert first == {"code": code, "lang": "gdscript"}
+
+    def test_pack_is_idempotent(self):
+        """测试重复打包返回同一载荷"""
+        store = BlobStore(threshold=4)
+        payload = store.pack({"prompt": "wooden crate"})
+        assert store.pack(payload) is payload
+        assert store.pack(None) is None
+
+    def test_to_dict_is_serializable(self):
+        """测试载荷还原为普通字典后可以 JSON 序列化"""
+        store = BlobStore(threshold=4)
+        payload = store.pack({"prompt": "wooden crate", "size": 64})
+
+        plain = payload.to_dict()
+        assert type(plain) is dict
+        assert json.loads(json.dumps(plain)) == {"prompt": "wooden crate", "size": 64}
+
+
+class TestCompactTask:
+    """紧凑任务记录测试"""
+
+    def test_slots_and_enum_coercion(self):
+        """测试任务没有 __dict__，字符串枚举值被转换为枚举单例"""
+        task = Task(id="t1", type="write_code", assigned_agent="codeweaver", input={}, space_id="s1")
+        assert not hasattr(task, "__dict__")
+        assert task.type is TaskType.WRITE_CODE
+        assert task.assigned_agent is AgentType.CODEWEAVER
+
+    @pytest.mark.asyncio
+    async def test_blackboard_externalises_payloads(self):
+        """测试黑板发布与完成任务时转存大字段，历史消息与任务共享同一载荷"""
+        board = Blackboard(blobs=BlobStore(threshold=32))
+        code = "extends Node2D\n" * 20
+        task = Task(id="t1", type=TaskType.RUN_TEST, assigned_agent=AgentType.INQUISITOR, input={"code": code})
+
+        await board.publish_task(task)
+        await board.claim_task(AgentType.INQUISITOR)
+        await board.complete_task("t1", {"code": code, "passed": True})
+
+        assert task.input["code"] == code
+        assert task.output == {"code": code, "passed": True}
+        assert len(board.blobs) == 1
+        assert board.message_history[-1].payload["output"] is task.output
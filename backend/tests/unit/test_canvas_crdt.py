@@ -0,0 +1,205 @@
+"""
+画布协同文档单元测试
+"""
+import pytest
+import asyncio
+
+from app.collab.crdt import (
+    CanvasDocument,
+    CanvasDecodeError,
+    CanvasPendingOverflow,
+    decode_state_vector,
+)
+from app.collab.sync import CanvasSyncManager
+
+
+def sync_pair(a: CanvasDocument, b: CanvasDocument) -> None:
+    """双向状态向量同步"""
+    b.apply_update(a.encode_state_as_update(b.encode_state_vector()))
+    a.apply_update(b.encode_state_as_update(a.encode_state_vector()))
+
+
+class TestCanvasDocument:
+    """画布 CRDT 测试"""
+
+    def test_local_set_and_delete(self):
+        """测试本地写入与删除"""
+        doc = CanvasDocument(client_id=1)
+        doc.set("nodes", "crate", {"x": 10, "y": 20})
+        doc.set("edges", "e1", {"from": "crate", "to": "player"})
+        assert doc.nodes == {"crate": {"x": 10, "y": 20}}
+        assert "e1" in doc.edges
+
+        doc.delete("nodes", "crate")
+        assert doc.nodes == {}
+        assert doc.state_vector == {1: 3}
+
+    def test_concurrent_edits_converge(self):
+        """测试并发修改最终收敛"""
+        a = CanvasDocument(client_id=1)
+        b = CanvasDocument(client_id=2)
+        a.set("nodes", "crate", {"x": 1})
+        b.set("nodes", "crate", {"x": 2})
+        b.set("nodes", "player", {"x": 0})
+
+        sync_pair(a, b)
+
+        assert a.to_json() == b.to_json()
+        # lamport 相同时 client_id 较大者胜出
+        assert a.nodes["crate"] == {"x": 2}
+
+    def test_updates_idempotent_and_out_of_order(self):
+        """测试重复及乱序的更新"""
+        a = CanvasDocument(client_id=1)
+        u1 = a.set("nodes", "n", {"v": 1})
+        u2 = a.set("nodes", "n", {"v": 2})
+
+        b = CanvasDocument(client_id=2)
+        b.apply_update(u2)
+        # u2 缺少前置更新，暂存等待
+        assert b.has_pending
+        assert b.nodes == {}
+
+        b.apply_update(u1)
+        b.apply_update(u1)
+        assert not b.has_pending
+        assert b.nodes == {"n": {"v": 2}}
+        assert b.state_vector == {1: 2}
+
+    def test_diff_only_contains_missing_ops(self):
+        """测试按状态向量计算增量"""
+        server = CanvasDocument(client_id=1)
+        for i in range(50):
+            server.set("nodes", f"n{i}", {"x": i})
+        client = CanvasDocument(client_id=2)
+        client.apply_update(server.encode_state_as_update())
+
+        server.set("nodes", "n0", {"x": -1})
+        diff = server.encode_state_as_update(client.encode_state_vector())
+        full = server.encode_state_as_update()
+
+        assert len(diff) < len(full) / 10
+        client.apply_update(diff)
+        assert client.to_json() == server.to_json()
+
+    def test_compact_keeps_convergence(self):
+        """测试压缩后仍能正确同步"""
+        a = CanvasDocument(client_id=1)
+        for i in range(20):
+            a.set("nodes", "crate", {"x": i})
+        assert a.garbage == 19
+
+        stale = CanvasDocument(client_id=2)
+        stale.apply_update(a.encode_state_as_update())
+        a.set("nodes", "crate", {"x": 100})
+
+        assert a.compact() == 20
+        assert a.op_count() == 1
+
+        stale.apply_update(a.encode_state_as_update(stale.encode_state_vector()))
+        fresh = CanvasDocument(client_id=3)
+        fresh.apply_update(a.encode_state_as_update())
+        assert stale.to_json() == a.to_json() == fresh.to_json()
+
+    def test_pending_updates_bounded(self):
+        """测试暂存的乱序更新超过上限时拒绝，重新同步后收敛"""
+        a = CanvasDocument(client_id=1)
+        updates = [a.set("nodes", "n", {"v": i}) for i in range(6)]
+
+        b = CanvasDocument(client_id=2, max_pending=3)
+        for update in updates[1:4]:
+            b.apply_update(update)
+        with pytest.raises(CanvasPendingOverflow):
+            b.apply_update(updates[4])
+
+        b.apply_update(updates[0])
+        assert not b.has_pending
+        assert b.state_vector == {1: 4}
+        b.apply_update(a.encode_state_as_update(b.encode_state_vector()))
+        assert b.to_json() == a.to_json()
+
+    @pytest.mark.asyncio
+    async def test_sync_rejects_non_binary_state_vector(self, monkeypatch):
+        """测试状态向量不是二进制时返回错误事件"""
+        from app.api import websocket
+
+        sent = []
+
+        async def emit_event(event, data, room, skip_sid=None):
+            sent.append((event, data["error"]))
+
+        monkeypatch.setattr(websocket, "emit_event", emit_event)
+        await websocket.canvas_sync_step("sid-1", {"spaceId": "space-1", "stateVector": "AAE="})
+        await websocket.canvas_sync_step("sid-1", {"spaceId": "space-1", "stateVector": [0, 1]})
+
+        assert sent == [("canvas:error", "invalid state vector")] * 2
+
+    def test_invalid_update(self):
+        """测试非法更新"""
+        doc = CanvasDocument()
+        with pytest.raises(CanvasDecodeError):
+            doc.apply_update(b"\x09garbage")
+        with pytest.raises(CanvasDecodeError):
+            decode_state_vector(b"\x05")
+
+
+class TestCanvasSyncManager:
+    """画布同步管理器测试"""
+
+    def test_sync_step_returns_missing(self, tmp_path):
+        """测试同步握手"""
+        manager = CanvasSyncManager(snapshot_dir=tmp_path)
+        client = CanvasDocument(client_id=7)
+        manager.apply_update("space-1", client.set("nodes", "crate", {"x": 1}))
+
+        update, state_vector = manager.sync_step("space-1", client.encode_state_vector())
+        assert decode_state_vector(state_vector)[7] == 1
+
+        newcomer = CanvasDocument()
+        update, _ = manager.sync_step("space-1", newcomer.encode_state_vector())
+        newcomer.apply_update(update)
+        assert newcomer.nodes == {"crate": {"x": 1}}
+
+    def test_legacy_update_merges_node(self, tmp_path):
+        """测试旧版 JSON 更新"""
+        manager = CanvasSyncManager(snapshot_dir=tmp_path)
+        manager.apply_legacy("space-1", {"spaceId": "space-1", "nodeId": "crate", "position": {"x": 1}})
+        manager.apply_legacy("space-1", {"spaceId": "space-1", "nodeId": "crate", "label": "箱子"})
+
+        node = manager.get_document("space-1").nodes["crate"]
+        assert node == {"position": {"x": 1}, "label": "箱子"}
+        assert manager.apply_legacy("space-1", {"spaceId": "space-1"}) is None
+
+    @pytest.mark.asyncio
+    async def test_compaction_and_snapshot(self, tmp_path):
+        """测试写快照前压缩与快照恢复"""
+        manager = CanvasSyncManager(snapshot_dir=tmp_path, compact_every=10)
+        client = CanvasDocument(client_id=7)
+        for i in range(10):
+            manager.apply_update("space/1", client.set("nodes", "crate", {"x": i}))
+        assert list(tmp_path.iterdir()) == []
+
+        assert await manager.flush() == 1
+        assert manager.get_document("space/1").op_count() == 1
+        assert len(list(tmp_path.iterdir())) == 1
+        assert await manager.flush() == 0
+
+        restored = CanvasSyncManager(snapshot_dir=tmp_path)
+        doc = restored.get_document("space/1")
+        assert doc.nodes == {"crate": {"x": 9}}
+        assert doc.state_vector == {7: 10}
+
+    @pytest.mark.asyncio
+    async def test_periodic_snapshot(self, tmp_path):
+        """测试改动按间隔写入快照，未达到压缩阈值时不压缩"""
+        manager = CanvasSyncManager(snapshot_dir=tmp_path, compact_every=100, flush_interval=0.01)
+        manager.start()
+        client = CanvasDocument(client_id=7)
+        manager.apply_update("space-1", client.set("nodes", "crate", {"x": 1}))
+        manager.apply_update("space-1", client.set("nodes", "crate", {"x": 2}))
+        await asyncio.sleep(0.1)
+
+        restored = CanvasSyncManager(snapshot_dir=tmp_path)
+        assert restored.get_document("space-1").nodes == {"crate": {"x": 2}}
+        assert manager.get_document("space-1").op_count() == 2
+        await manager.close()
@@ -0,0 +1,115 @@
+"""
+虚拟时钟与工作流模拟单元测试
+"""
+import asyncio
+import time
+
+from app.accounting.accountant import accountant
+from app.agents.incremental import orchestrator
+from app.api import websocket
+from app.blackboard.blackboard import blackboard
+from app.clock import VIRTUAL_EPOCH, clock, run_virtual
+from app.simulation import run_simulation, simulate
+
+
+class TestVirtualClock:
+    """虚拟时间事件循环测试"""
+
+    def test_long_sleep_is_instant(self):
+        """虚拟时间下等待数小时立即完成，clock 读到的是虚拟时间"""
+        async def main():
+            start = clock.monotonic()
+            await clock.sleep(3600)
+            await asyncio.wait_for(asyncio.sleep(7200), timeout=10000)
+            return clock.monotonic() - start, clock.time()
+
+        t0 = time.perf_counter()
+        elapsed, now = run_virtual(main())
+        assert time.perf_counter() - t0 < 1
+        assert elapsed == 10800
+        assert now == VIRTUAL_EPOCH + 10800
+
+    def test_timers_fire_in_order(self):
+        """并发的定时器按虚拟时间先后触发"""
+        async def main():
+            order = []
+
+            async def wake(delay: float, name: str):
+                await clock.sleep(delay)
+                order.append((name, clock.monotonic()))
+
+            await asyncio.gather(wake(5, "b"), wake(1, "a"), wake(30, "c"))
+            return order
+
+        assert run_virtual(main()) == [("a", 1), ("b", 5), ("c", 30)]
+
+    def test_seeded_randomness(self):
+        """同一种子生成的随机数与 uuid 相同"""
+        async def main():
+            return clock.random().random(), str(clock.uuid4())
+
+        assert run_virtual(main(), seed=7) == run_virtual(main(), seed=7)
+        assert run_virtual(main(), seed=7) != run_virtual(main(), seed=8)
+
+    def test_executor_work_does_not_time_out(self):
+        """线程池中的真实工作不推进虚拟时间，不会触发虚拟超时"""
+        async def main():
+            start = clock.monotonic()
+            await asyncio.wait_for(asyncio.to_thread(time.sleep, 0.2), timeout=0.01)
+            return clock.monotonic() - start
+
+        assert run_virtual(main()) < 0.01
+
+    def test_real_clock_outside_virtual_loop(self):
+        """不在虚拟时间事件循环中时使用系统时间"""
+        assert not clock.virtual
+        assert abs(clock.time() - time.time()) < 5
+
+
+class TestSimulation:
+    """工作流模拟测试"""
+
+    def test_workflows_run_in_virtual_time(self):
+        """真实工作流在虚拟时间中全部完成且结果可复现"""
+        first = run_simulation(seed=3, spaces=100, requests_per_space=2, arrival_window=30, prefix="sim-a")
+        second = run_simulation(seed=3, spaces=100, requests_per_space=2, arrival_window=30, prefix="sim-b")
+        assert first.failed == 0
+        assert first.workflows == 200
+        assert first.latencies == second.latencies
+        assert first.virtual_seconds == second.virtual_seconds
+        assert first.wall_seconds < first.virtual_seconds
+
+    def test_simulation_leaves_global_services_untouched(self, monkeypatch):
+        """模拟使用独立的服务实例: 全局黑板、编排器与计量(含当日用量周期)不受影响"""
+        period = accountant.usage("space:sim-iso-0")["period"]
+        pending = blackboard.get_summary()["tasks"]["pending"]
+        partials = []
+
+        async def append_partial(task_id, chunk):
+            partials.append(task_id)
+
+        monkeypatch.setattr(blackboard, "append_partial", append_partial)
+
+        result = run_simulation(seed=1, spaces=5, prefix="sim-iso")
+
+        assert result.failed == 0
+        assert websocket.blackboard is blackboard
+        assert websocket.orchestrator is orchestrator
+        assert websocket.accountant is accountant
+        assert orchestrator.requests("sim-iso-0") == []
+        assert accountant.usage("space:sim-iso-0")["period"] == period
+        assert blackboard.get_summary()["tasks"]["pending"] == pending
+        assert partials == []
+
+    def test_concurrency_limit_fairness(self):
+        """限制并发时等待者按到达顺序执行，公平性指数随排队下降"""
+        async def workflow(space_id: str, request: str):
+            await clock.sleep(10)
+
+        unlimited = run_virtual(simulate(spaces=50, arrival_window=0, workflow=workflow))
+        limited = run_virtual(simulate(spaces=50, arrival_window=0, max_concurrency=5, workflow=workflow))
+        assert unlimited.virtual_seconds == 10
+        assert unlimited.fairness == 1.0
+        assert limited.virtual_seconds == 100
+        assert sorted(limited.latencies) == [10 * (i // 5 + 1) for i in range(50)]
+        assert limited.fairness < 1.0
@@ -0,0 +1,150 @@
+"""
+事件日志与断线补发单元测试
+"""
+import pytest
+
+from app.api import websocket
+from app.realtime.event_log import EventLog, RoomEventLog
+
+
+class TestRoomEventLog:
+    """房间事件日志测试"""
+
+    def test_sequence_numbers(self):
+        """测试序号分配"""
+        log = RoomEventLog(capacity=10)
+        first = log.append("agent:message", {"content": "a"})
+        second = log.append("task:update", {"progress": 50})
+
+        assert (first.seq, second.seq) == (1, 2)
+        assert log.last_seq == 2
+        assert [e.seq for e in log.since(1)] == [2]
+        assert log.since(2) == []
+
+    def test_gap_exceeds_buffer(self):
+        """测试缺口超出缓冲区"""
+        log = RoomEventLog(capacity=3)
+        for i in range(5):
+            log.append("agent:message", {"i": i})
+
+        assert [e.seq for e in log.since(2)] == [3, 4, 5]
+        assert log.since(1) is None
+
+
+class TestEventLog:
+    """多房间事件日志测试"""
+
+    def test_rooms_are_independent(self):
+        """测试房间隔离"""
+        log = EventLog(capacity=10)
+        log.append("space-a", "agent:message", {})
+        log.append("space-b", "agent:message", {})
+        log.append("space-a", "agent:message", {})
+
+        assert log.room("space-a").last_seq == 2
+        assert log.room("space-b").last_seq == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_epoch_mismatch(self):
+        """测试服务重启后的序号失效"""
+        log = EventLog(capacity=10)
+        log.append("space-a", "agent:message", {})
+
+        assert await log.replay("space-a", 0, log.epoch) is not None
+        assert await log.replay("space-a", 0, "stale-epoch") is None
+        assert await log.replay("space-a", 5, log.epoch) is None
+
+    @pytest.mark.asyncio
+    async def test_replay_from_spill(self, tmp_path):
+        """测试超出内存缓冲的事件批量写入磁盘后仍可补发"""
+        log = EventLog(capacity=3, spill_dir=tmp_path)
+        for i in range(6):
+            log.append("space/a", "agent:message", {"i": i})
+
+        # 写入磁盘前被挤出的事件仍在内存中
+        assert [e.seq for e in await log.replay("space/a", 0, log.epoch)] == [1, 2, 3, 4, 5, 6]
+        assert await log.flush() == 3
+        assert await log.flush() == 0
+
+        log.append("space/a", "agent:message", {"i": 6})
+        missed = await log.replay("space/a", 1, log.epoch)
+        assert [e.seq for e in missed] == [2, 3, 4, 5, 6, 7]
+        assert missed[0].data == {"i": 1}
+
+        await log.close()
+        assert list(tmp_path.iterdir()) == []
+        assert await log.replay("space/a", 1, log.epoch) is None
+
+    @pytest.mark.asyncio
+    async def test_spill_rotation(self, tmp_path):
+        """测试溢出文件写满后轮转，超出磁盘保留范围时要求全量同步"""
+        room = RoomEventLog(capacity=2, spill_path=tmp_path / "room.jsonl", spill_capacity=3)
+        for i in range(10):
+            room.append("task:update", {"i": i})
+            await room.flush()
+
+        assert (tmp_path / "room.old").exists()
+        assert [e.seq for e in await room.replay(3)] == [4, 5, 6, 7, 8, 9, 10]
+        assert await room.replay(0) is None
+
+
+class TestJoinSpaceReplay:
+    """join_space 补发测试"""
+
+    @pytest.fixture
+    def emitted(self, monkeypatch):
+        events = []
+
+        async def fake_emit(event, data=None, room=None, **kwargs):
+            events.append((event, data, room))
+
+        monkeypatch.setattr(websocket.sio, "emit", fake_emit)
+        monkeypatch.setattr(websocket.sio, "enter_room", lambda sid, room: None)
+        monkeypatch.setattr(websocket, "event_log", EventLog(capacity=3))
+        return events
+
+    @pytest.mark.asyncio
+    async def test_replays_missed_events(self, emitted):
+        """测试重连只补发错过的事件"""
+        for i in range(3):
+            await websocket.broadcast("agent:message", {"i": i}, room="space-1")
+        emitted.clear()
+
+        await websocket.join_space("sid-1", {
+            "spaceId": "space-1",
+            "lastSeq": 1,
+            "epoch": websocket.event_log.epoch,
+        })
+
+        assert emitted[0][0] == "joined_space"
+        replayed = [(e, d["seq"]) for e, d, room in emitted[1:]]
+        assert replayed == [("agent:message", 2), ("agent:message", 3)]
+        assert all(room == "sid-1" for _, _, room in emitted)
+
+    @pytest.mark.asyncio
+    async def test_full_resync_when_gap_too_large(self, emitted):
+        """测试缺口过大时要求全量同步"""
+        for i in range(5):
+            await websocket.broadcast("task:update", {"i": i}, room="space-1")
+        emitted.clear()
+
+        await websocket.join_space("sid-1", {
+            "spaceId": "space-1",
+            "lastSeq": 0,
+            "epoch": websocket.event_log.epoch,
+        })
+
+        assert [e for e, _, _ in emitted] == ["joined_space", "resync_required"]
+
+    @pytest.mark.asyncio
+    async def test_malformed_last_seq_requires_resync(self, emitted):
+        """测试格式不正确的 lastSeq 要求全量同步"""
+        await websocket.broadcast("task:update", {}, room="space-1")
+        for last_seq in ("abc", [1], -1, True):
+            emitted.clear()
+            await websocket.join_space("sid-1", {
+                "spaceId": "space-1",
+                "lastSeq": last_seq,
+                "epoch": websocket.event_log.epoch,
+            })
+            assert [e for e, _, _ in emitted] == ["joined_space", "resync_required"]
@@ -0,0 +1,243 @@
+"""
+工作流排空与移交单元测试
+"""
+import pytest
+import asyncio
+import os
+import time
+
+from app.agents.incremental import Orchestrator
+from app.blackboard.blackboard import Blackboard
+from app.handoff.queue import CheckpointQueue, WorkflowCheckpoint
+from app.handoff.runner import WorkflowRunner
+
+
+class TestCheckpointQueue:
+    """检查点队列测试"""
+
+    def test_put_claim_ack(self, tmp_path):
+        """测试写入、认领与确认"""
+        queue = CheckpointQueue(tmp_path)
+        queue.put(WorkflowCheckpoint(space_id="s1", requests=["推箱子"], created_at=1.0))
+        queue.put(WorkflowCheckpoint(space_id="s2", requests=["金币"], created_at=2.0))
+
+        claim = queue.claim("replica-a")
+        assert claim.checkpoint.space_id == "s1"
+        assert len(queue) == 1
+
+        queue.ack(claim)
+        assert not claim.path.exists()
+
+    def test_claim_is_exclusive(self, tmp_path):
+        """测试同一检查点只能被一个副本认领"""
+        queue = CheckpointQueue(tmp_path)
+        queue.put(WorkflowCheckpoint(space_id="s1", requests=["推箱子"]))
+
+        assert queue.claim("replica-a") is not None
+        assert queue.claim("replica-b") is None
+
+    def test_nack_until_failed(self, tmp_path):
+        """测试失败重试超过上限后移入 failed/"""
+        queue = CheckpointQueue(tmp_path, max_attempts=2)
+        queue.put(WorkflowCheckpoint(space_id="s1", requests=["推箱子"]))
+
+        queue.nack(queue.claim("a"))
+        claim = queue.claim("a")
+        assert claim.checkpoint.attempts == 1
+
+        queue.nack(claim)
+        assert queue.claim("a") is None
+        assert len(list((tmp_path / "failed").glob("*.json"))) == 1
+
+    def test_requeue_stale_claims(self, tmp_path):
+        """测试租约过期的认领回到队列"""
+        queue = CheckpointQueue(tmp_path, lease=10)
+        queue.put(WorkflowCheckpoint(space_id="s1", requests=["推箱子"]))
+        claim = queue.claim("dead.replica")
+
+        assert queue.requeue_stale() == 0
+        old = time.time() - 60
+        os.utime(claim.path, (old, old))
+        assert queue.requeue_stale() == 1
+        assert queue.claim("replica-b").checkpoint.space_id == "s1"
+
+
+class Replica:
+    """模拟一个副本: 独立的黑板、编排器与运行器，共享检查点目录"""
+
+    def __init__(self, directory, name: str):
+        self.board = Blackboard()
+        self.orchestrator = Orchestrator(self.board)
+        self.runner = WorkflowRunner(
+            CheckpointQueue(directory),
+            workflows=self.orchestrator,
+            replica_id=name,
+            poll_interval=0.01,
+        )
+        self.calls = []
+        self.code_delay = 0.0
+
+    async def workflow(self, space_id: str, request: str):
+        run = self.orchestrator.begin(space_id, request)
+        crate = run.resource_key("crate")
+
+        async def texture():
+            self.calls.append("texture")
+            self.board.update_resource("textures", crate, "res://assets/crate.png")
+            return {"path": "res://assets/crate.png"}
+
+        async def code():
+            self.calls.append("code")
+            await asyncio.sleep(self.code_delay)
+            self.board.update_resource("scripts", crate, "res://scripts/crate.gd")
+            return {"code": "extends RigidBody2D\n"}
+
+        await run.step("texture", {"prompt": request}, texture, resources=[("textures", crate)])
+        await run.step("code", {"requirement": request}, code, deps=["texture"], resources=[("scripts", crate)])
+        run.commit()
+
+
+class TestWorkflowRunner:
+    """排空与恢复测试"""
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_short_workflows(self, tmp_path):
+        """测试截止时间内完成的工作流不写检查点"""
+        replica = Replica(tmp_path, "a")
+        replica.code_delay = 0.01
+        replica.runner.submit("s1", "推箱子", replica.workflow)
+
+        assert await replica.runner.drain(deadline=1) == 0
+        assert replica.runner.stats["completed"] == 1
+        assert len(replica.runner.queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_new_work_while_draining(self, tmp_path):
+        """测试排空后拒绝新工作流"""
+        replica = Replica(tmp_path, "a")
+        await replica.runner.drain(deadline=0)
+
+        assert replica.runner.submit("s1", "推箱子", replica.workflow) is None
+        assert replica.runner.stats["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_handoff_resumes_on_other_replica(self, tmp_path):
+        """测试超时的工作流移交给其他副本，已完成的步骤被复用"""
+        old = Replica(tmp_path, "old")
+        old.code_delay = 10
+        old.runner.submit("s1", "推箱子", old.workflow)
+        await asyncio.sleep(0.01)
+
+        assert await old.runner.drain(deadline=0.05) == 1
+        assert old.calls == ["texture", "code"]
+
+        new = Replica(tmp_path, "new")
+        new.runner.start(new.workflow)
+        for _ in range(100):
+            if new.runner.stats["completed"]:
+                break
+            await asyncio.sleep(0.01)
+        await new.runner.drain(deadline=1)
+
+        assert new.calls == ["code"]
+        assert new.board.get_resource("scripts", "s1/crate") == "res://scripts/crate.gd"
+        assert new.orchestrator.requests("s1") == ["推箱子"]
+        assert len(new.runner.queue) == 0
+        assert not list((tmp_path / "claimed").glob("*.json"))
+
+
+class TestHandedOffWorkflow:
+    """被排空取消的工作流测试"""
+
+    @pytest.mark.asyncio
+    async def test_cancel_fails_claimed_tasks_and_notifies(self, monkeypatch):
+        """测试取消后认领的任务标记为已移交并通知客户端"""
+        from app.api import websocket
+        from app.blackboard.blackboard import AgentType, Task, TaskStatus, TaskType
+
+        board = Blackboard()
+        events = []
+        started = asyncio.Event()
+
+        async def workflow(sid, space_id, request, claimed):
+            task = Task(id="t1", type=TaskType.WRITE_CODE, assigned_agent=AgentType.CODEWEAVER, input={})
+            await board.publish_task(task)
+            await board.claim_task(AgentType.CODEWEAVER, task.id)
+            claimed.append(task.id)
+            started.set()
+            await asyncio.sleep(10)
+
+        async def broadcast(event, data, room=None):
+            events.append((event, data))
+
+        monkeypatch.setattr(websocket, "blackboard", board)
+        monkeypatch.setattr(websocket, "simulate_agent_workflow", workflow)
+        monkeypatch.setattr(websocket, "broadcast", broadcast)
+
+        job = asyncio.ensure_future(websocket.run_workflow("s1", "推箱子"))
+        await started.wait()
+        job.cancel()
+        await asyncio.gather(job, return_exceptions=True)
+
+        task = board.task_index.get("t1")
+        assert task.status == TaskStatus.FAILED
+        assert task.output["reason"] == "handed_off"
+        assert events == [("workflow:handed_off", {"spaceId": "s1", "request": "推箱子"})]
+
+    @pytest.mark.asyncio
+    async def test_error_fails_claimed_tasks_and_releases_quota(self, monkeypatch, tmp_path):
+        """测试工作流出错时认领的任务标记为失败，计量中的未完成任务数归零"""
+        from app.accounting.accountant import Accountant
+        from app.accounting.store import UsageStore
+        from app.api import websocket
+        from app.blackboard.blackboard import AgentType, Task, TaskStatus, TaskType
+
+        board = Blackboard()
+        accountant = Accountant(UsageStore(tmp_path))
+        accountant.attach(board)
+
+        async def workflow(sid, space_id, request, claimed):
+            task = Task(id="t1", type=TaskType.WRITE_CODE, assigned_agent=AgentType.CODEWEAVER,
+                        input={}, space_id=space_id)
+            await board.publish_task(task)
+            await board.claim_task(AgentType.CODEWEAVER, task.id)
+            claimed.append(task.id)
+            raise RuntimeError("model unavailable")
+
+        monkeypatch.setattr(websocket, "blackboard", board)
+        monkeypatch.setattr(websocket, "accountant", accountant)
+        monkeypatch.setattr(websocket, "simulate_agent_workflow", workflow)
+
+        with pytest.raises(RuntimeError):
+            await websocket.run_workflow("s1", "推箱子")
+
+        assert board.task_index.get("t1").status == TaskStatus.FAILED
+        assert accountant.usage("space:s1")["active_tasks"] == 0
+
+
+class TestLifecycleDrain:
+    """生命周期排空阶段测试"""
+
+    @pytest.mark.asyncio
+    async def test_drain_runs_before_shutdown(self):
+        """测试排空钩子先于关闭钩子执行，且排空期间未就绪"""
+        from app.lifecycle import Lifecycle
+
+        lifecycle = Lifecycle(warmup_enabled=False)
+        order = []
+
+        @lifecycle.on_drain("workflows")
+        async def drain():
+            order.append("drain")
+
+        @lifecycle.on_shutdown("pool")
+        async def close():
+            order.append("shutdown")
+
+        lifecycle.start()
+        assert lifecycle.ready
+        await lifecycle.drain()
+        assert not lifecycle.ready
+
+        await lifecycle.shutdown()
+        assert order == ["drain", "shutdown"]
@@ -0,0 +1,223 @@
+"""
+增量执行单元测试
+"""
+import pytest
+
+from app.agents.incremental import MAX_REFINEMENTS, Orchestrator, fingerprint
+from app.agents.producer import is_new_request, plan_inputs
+from app.blackboard.blackboard import Blackboard
+
+
+class Pipeline:
+    """texture -> code -> test 三步流水线，记录实际执行的步骤"""
+
+    def __init__(self, board: Blackboard, code_template: str = "extends RigidBody2D\n"):
+        self.board = board
+        self.code_template = code_template
+        self.calls = []
+
+    async def run(self, orchestrator: Orchestrator, request: str, space_id: str = "space", fail: bool = False):
+        run = orchestrator.begin(space_id, request, new_base=is_new_request(request))
+        inputs = plan_inputs(run.requests)
+        crate = run.resource_key("crate")
+
+        async def texture():
+            self.calls.append("texture")
+            self.board.update_resource("textures", crate, "res://assets/crate.png")
+            return {"path": "res://assets/crate.png"}
+
+        async def code():
+            self.calls.append("code")
+            self.board.update_resource("scripts", crate, "res://scripts/crate.gd")
+            return {"code": self.code_template}
+
+        async def test():
+            self.calls.append("test")
+            self.board.update_resource("test_results", crate, "PASSED: 3/3")
+            return {"passed": True}
+
+        await run.step("texture", {"prompt": inputs["texture"]}, texture, resources=[("textures", crate)])
+        await run.step("code", {"requirement": inputs["code"]}, code, deps=["texture"], resources=[("scripts", crate)])
+        await run.step("test", {}, test, deps=["code"], resources=[("test_results", crate)])
+        if fail:
+            raise RuntimeError("acceptance failed")
+        run.commit()
+        return run
+
+
+class TestIncrementalRun:
+    """增量执行测试"""
+
+    @pytest.fixture
+    def board(self):
+        return Blackboard()
+
+    def test_fingerprint_is_order_independent(self):
+        """测试指纹与字典键顺序无关"""
+        assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+        assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+    def test_plan_inputs_routes_refinements(self):
+        """测试补充需求按类别分配给纹理或代码"""
+        inputs = plan_inputs(["推箱子", "让箱子更重一点", "颜色更亮"])
+        assert inputs["texture"] == "推箱子；颜色更亮"
+        assert inputs["code"] == "推箱子；让箱子更重一点"
+
+    @pytest.mark.asyncio
+    async def test_first_run_executes_everything(self, board):
+        """测试首次执行全部步骤"""
+        pipeline = Pipeline(board)
+        run = await pipeline.run(Orchestrator(board), "推箱子")
+
+        assert run.executed == ["texture", "code", "test"]
+        assert run.reused == []
+
+    @pytest.mark.asyncio
+    async def test_behavior_refinement_skips_texture(self, board):
+        """测试行为类补充只重跑代码；代码输出不变时测试也被复用"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+        pipeline.calls.clear()
+
+        run = await pipeline.run(orchestrator, "让箱子更重一点")
+
+        assert pipeline.calls == ["code"]
+        assert run.reused == ["texture", "test"]
+        assert orchestrator.graph("space")["code"]["runs"] == 2
+
+    @pytest.mark.asyncio
+    async def test_changed_output_invalidates_downstream(self, board):
+        """测试代码输出变化时下游测试重跑"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+        pipeline.calls.clear()
+
+        pipeline.code_template = "extends RigidBody2D\n\nfunc _ready():\n    mass = 4.0\n"
+        await pipeline.run(orchestrator, "让箱子更重一点")
+
+        assert pipeline.calls == ["code", "test"]
+
+    @pytest.mark.asyncio
+    async def test_missing_resource_forces_rerun(self, board):
+        """测试黑板上的缓存资源丢失时重跑"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+        pipeline.calls.clear()
+
+        board.resources = {"textures": {}, "scripts": {}, "test_results": {}}
+        await pipeline.run(orchestrator, "推箱子")
+
+        assert pipeline.calls == ["texture", "code", "test"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_dependents(self, board):
+        """测试手动失效会连同下游一起丢弃"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+
+        assert orchestrator.dependents("space", "texture") == ["code", "test"]
+        orchestrator.invalidate("space", "code")
+        assert list(orchestrator.graph("space")) == ["texture"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_dependency(self, board):
+        """测试依赖尚未执行的步骤时报错"""
+        run = Orchestrator(board).begin("space", "推箱子")
+
+        async def noop():
+            return {}
+
+        with pytest.raises(ValueError):
+            await run.step("code", {}, noop, deps=["texture"])
+
+    @pytest.mark.asyncio
+    async def test_resources_are_scoped_by_space(self, board):
+        """测试不同空间的同名资源互不影响，其他空间的结果不会被复用"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子", space_id="a")
+        pipeline.calls.clear()
+
+        await pipeline.run(orchestrator, "推箱子", space_id="b")
+
+        assert pipeline.calls == ["texture", "code", "test"]
+        assert board.get_resource("textures", "a/crate") == "res://assets/crate.png"
+        assert board.get_resource("textures", "b/crate") == "res://assets/crate.png"
+
+    @pytest.mark.asyncio
+    async def test_overwritten_resource_forces_rerun(self, board):
+        """测试黑板上的资源被其他执行覆盖后不再复用"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+        pipeline.calls.clear()
+
+        board.update_resource("textures", "space/crate", "res://assets/other.png")
+        run = await pipeline.run(orchestrator, "让箱子更重一点")
+
+        assert run.executed[0] == "texture"
+        assert board.get_resource("textures", "space/crate") == "res://assets/crate.png"
+
+    @pytest.mark.asyncio
+    async def test_failed_run_is_not_recorded(self, board):
+        """测试执行失败的需求不计入需求历史"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+
+        with pytest.raises(RuntimeError):
+            await pipeline.run(orchestrator, "让箱子更重一点", fail=True)
+
+        assert orchestrator.requests("space") == ["推箱子"]
+
+    @pytest.mark.asyncio
+    async def test_refinement_history_is_bounded(self, board):
+        """测试只保留原始需求与最近的补充"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+        for i in range(MAX_REFINEMENTS + 3):
+            await pipeline.run(orchestrator, f"速度 {i}")
+
+        requests = orchestrator.requests("space")
+        assert requests[0] == "推箱子"
+        assert requests[1:] == [f"速度 {i}" for i in range(3, MAX_REFINEMENTS + 3)]
+
+    @pytest.mark.asyncio
+    async def test_new_request_starts_new_base(self, board):
+        """测试新的原始需求不与之前的需求合并"""
+        orchestrator = Orchestrator(board)
+        pipeline = Pipeline(board)
+        await pipeline.run(orchestrator, "推箱子")
+        await pipeline.run(orchestrator, "让箱子更重一点")
+        pipeline.calls.clear()
+
+        run = await pipeline.run(orchestrator, "我想做一个会飞的金币")
+
+        assert orchestrator.requests("space") == ["我想做一个会飞的金币"]
+        assert run.executed == ["texture", "code"]
+        assert run.reused == ["test"]
+
+    @pytest.mark.asyncio
+    async def test_uncacheable_result_is_not_reused(self, board):
+        """测试 cache_if 判定为失败的输出不被记录，下次执行时重跑"""
+        orchestrator = Orchestrator(board)
+        results = [{"passed": False, "reason": "timeout"}, {"passed": True}]
+
+        async def test():
+            return results.pop(0)
+
+        for expected in ([], ["test"]):
+            run = orchestrator.begin("space", "推箱子")
+            output, reused = await run.step("test", {}, test, cache_if=lambda r: r.get("passed"))
+            assert not reused
+            assert list(orchestrator.graph("space")) == expected
+            run.commit()
+
+        run = orchestrator.begin("space", "推箱子")
+        output, reused = await run.step("test", {}, test, cache_if=lambda r: r.get("passed"))
+        assert reused and output == {"passed": True}
@@ -0,0 +1,84 @@
+"""
+知识库单元测试
+"""
+import pytest
+
+from app.knowledge.base import KnowledgeBase, build_index
+from app.knowledge.chunker import chunk_text
+
+
+DOC = """# 黑板系统
+
+黑板系统是智能体间共享状态的核心数据结构，采用发布-订阅模式实现解耦通信。
+
+# RigidBody2D
+
+RigidBody2D 是受物理引擎控制的二维刚体，mass 属性决定质量，可以被玩家推动。
+
+# 音频
+
+AudioStreamPlayer 用于播放背景音乐和音效。
+"""
+
+
+class TestChunker:
+    """文档切分测试"""
+
+    def test_split_by_heading(self):
+        """测试按标题切分"""
+        chunks = chunk_text(DOC, source="doc.md")
+        assert [c.heading for c in chunks] == ["黑板系统", "RigidBody2D", "音频"]
+
+    def test_gdscript_comments_are_not_headings(self):
+        """测试 GDScript 注释不被当作标题"""
+        script = "extends RigidBody2D\n# 箱子的质量\nfunc _ready():\n    mass = 2.0\n"
+        chunks = chunk_text(script, source="crate.gd")
+        assert len(chunks) == 1
+        assert chunks[0].heading == ""
+        assert "# 箱子的质量" in chunks[0].text
+
+    def test_long_paragraph_overlap(self):
+        """测试长段落按字符数切开"""
+        chunks = chunk_text("箱" * 1000, source="long.md", max_chars=400, overlap=50)
+        assert len(chunks) == 3
+        assert all(len(c.text) <= 400 for c in chunks)
+
+
+class TestKnowledgeBase:
+    """知识库检索测试"""
+
+    @pytest.fixture
+    def index_dir(self, tmp_path):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "design.md").write_text(DOC, encoding="utf-8")
+        (docs / "ignored.png").write_bytes(b"\x89PNG")
+        out = tmp_path / "index"
+        assert build_index([docs], out, dim=128) == 3
+        return out
+
+    def test_lazy_load_and_query(self, index_dir):
+        """测试首次查询时才加载索引"""
+        kb = KnowledgeBase(index_dir)
+        assert not kb.loaded
+
+        hits = kb.query("可以被推动的刚体 mass", k=2)
+        assert kb.loaded
+        assert hits[0].heading == "RigidBody2D"
+        assert hits[0].source.endswith("design.md")
+        assert hits[0].score >= hits[-1].score
+
+    def test_lru_cache(self, index_dir):
+        """测试热点查询命中缓存"""
+        kb = KnowledgeBase(index_dir, cache_size=8)
+        kb.query("黑板 发布订阅")
+        kb.query("黑板  发布订阅")
+
+        info = kb.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_missing_index(self, tmp_path):
+        """测试未构建索引时返回空结果"""
+        kb = KnowledgeBase(tmp_path / "missing")
+        assert kb.query("黑板") == []
+        assert len(kb) == 0
@@ -0,0 +1,128 @@
+"""
+启动生命周期单元测试
+"""
+import pytest
+import subprocess
+import sys
+from pathlib import Path
+
+from app.lazy import is_loaded, lazy_import
+from app.lifecycle import Lifecycle
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class TestLazyImport:
+    """延迟导入测试"""
+
+    def test_loads_on_first_attribute(self):
+        """测试首次访问属性时才导入"""
+        module = lazy_import("json")
+        assert module.dumps([1]) == "[1]"
+        assert is_loaded(module)
+
+    def test_app_import_skips_heavy_modules(self):
+        """测试导入应用时不加载重量级依赖"""
+        code = (
+            "import sys, app.main; "
+            "print(','.join(m for m in ('numpy', 'httpx', 'multiprocessing') if m in sys.modules))"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert completed.stdout.strip() == ""
+
+
+class TestLifecycle:
+    """预热与关闭钩子测试"""
+
+    @pytest.mark.asyncio
+    async def test_warm_up_runs_hooks(self):
+        """测试预热钩子执行后服务就绪"""
+        lifecycle = Lifecycle()
+        calls = []
+
+        @lifecycle.on_warmup("a")
+        async def warm_a():
+            calls.append("a")
+
+        @lifecycle.on_warmup("b")
+        async def warm_b():
+            raise RuntimeError("boom")
+
+        assert not lifecycle.ready
+        timings = await lifecycle.warm_up()
+
+        assert calls == ["a"]
+        assert set(timings) == {"a", "b"}
+        assert "boom" in lifecycle.errors["b"]
+        assert lifecycle.ready
+
+    @pytest.mark.asyncio
+    async def test_lifespan_runs_shutdown_in_reverse(self):
+        """测试 lifespan 在后台预热，退出时逆序执行关闭钩子"""
+        lifecycle = Lifecycle()
+        calls = []
+
+        @lifecycle.on_warmup("warm")
+        async def warm():
+            calls.append("warm")
+
+        @lifecycle.on_shutdown("first")
+        async def first():
+            calls.append("first")
+
+        @lifecycle.on_shutdown("second")
+        async def second():
+            calls.append("second")
+
+        async with lifecycle.lifespan(app=None):
+            await lifecycle.wait_ready()
+
+        assert calls == ["warm", "second", "first"]
+
+    @pytest.mark.asyncio
+    async def test_warmup_disabled(self):
+        """测试关闭预热时立即就绪"""
+        lifecycle = Lifecycle(warmup_enabled=False)
+
+        @lifecycle.on_warmup("never")
+        async def never():
+            raise AssertionError("should not run")
+
+        async with lifecycle.lifespan(app=None):
+            assert lifecycle.ready
+
+    @pytest.mark.asyncio
+    async def test_startup_runs_without_warmup(self):
+        """测试关闭预热时启动钩子仍在接受连接前执行"""
+        lifecycle = Lifecycle(warmup_enabled=False)
+        calls = []
+
+        @lifecycle.on_startup("attach")
+        async def attach():
+            calls.append("attach")
+
+        @lifecycle.on_warmup("never")
+        async def never():
+            raise AssertionError("should not run")
+
+        async with lifecycle.lifespan(app=None):
+            assert calls == ["attach"]
+            assert lifecycle.ready
+
+    @pytest.mark.asyncio
+    async def test_global_startup_hooks(self):
+        """测试检索订阅、移交恢复与用量读取注册为启动钩子而不是预热钩子"""
+        import app.main  # noqa: F401  注册全部钩子
+        from app.lifecycle import lifecycle
+
+        startup = {name for name, _ in lifecycle._startup_hooks}
+        warmup = {name for name, _ in lifecycle._warmup_hooks}
+        assert {"search", "workflow_handoff", "accounting", "canvas_sync"} <= startup
+        assert warmup.isdisjoint(startup)
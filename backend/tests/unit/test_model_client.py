@@ -0,0 +1,135 @@
+"""
+模型调用层单元测试(使用本地 stub 服务，不访问外网)
+"""
+import pytest
+import asyncio
+import random
+
+import httpx
+
+from app.clients.batching import MicroBatcher
+from app.clients.model_client import ModelClient, ModelClientError, ProviderConfig
+from app.clients.stub_server import StubSettings, create_stub_app
+
+
+def make_client(app=None, transport=None, **options) -> ModelClient:
+    provider = ProviderConfig(name="stub", base_url="http://stub", backoff_base=0.001, **options)
+    if transport is None:
+        transport = httpx.ASGITransport(app=app)
+    return ModelClient(provider, transport=transport, rng=random.Random(0))
+
+
+class TestMicroBatcher:
+    """请求合批测试"""
+
+    @pytest.mark.asyncio
+    async def test_batches_within_window(self):
+        """测试窗口内的请求合并"""
+        calls = []
+
+        async def double(items):
+            calls.append(list(items))
+            return [i * 2 for i in items]
+
+        batcher = MicroBatcher(double, max_batch=4, window=0.01)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+
+        assert results == [0, 2, 4, 6, 8, 10]
+        assert calls == [[0, 1, 2, 3], [4, 5]]
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_and_waits(self):
+        """测试关闭时立即发出积攒的请求并等待批量调用结束"""
+        async def slow_double(items):
+            await asyncio.sleep(0.01)
+            return [i * 2 for i in items]
+
+        batcher = MicroBatcher(slow_double, max_batch=16, window=10)
+        pending = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        await batcher.close()
+
+        assert all(future.done() for future in pending)
+        assert [future.result() for future in pending] == [0, 2, 4]
+        assert not batcher._runs
+
+
+class TestModelClient:
+    """模型客户端测试"""
+
+    @pytest.mark.asyncio
+    async def test_chat_and_image(self):
+        """测试对话与图像接口"""
+        app = create_stub_app(StubSettings(latency=0))
+        client = make_client(app)
+
+        chat = await client.chat([{"role": "user", "content": "推箱子"}], model="stub")
+        image = await client.generate_image("wooden crate", model="stub")
+        await client.aclose()
+
+        assert "RigidBody2D" in chat["choices"][0]["message"]["content"]
+        assert image["data"][0]["url"].startswith("https://")
+
+    @pytest.mark.asyncio
+    async def test_embeddings_are_batched(self):
+        """测试并发的向量请求合并为一次调用"""
+        app = create_stub_app(StubSettings(latency=0))
+        client = make_client(app, embedding_batch_window=0.01)
+
+        vectors = await asyncio.gather(*(client.embed(f"text {i}") for i in range(10)))
+        await client.aclose()
+
+        assert len(vectors) == 10
+        assert len(vectors[0]) == 64
+        assert app.state.calls["embeddings"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_then_fail(self):
+        """测试可重试错误耗尽重试次数后失败"""
+        app = create_stub_app(StubSettings(latency=0, error_rate=1.0))
+        client = make_client(app, max_retries=2)
+
+        with pytest.raises(ModelClientError) as exc_info:
+            await client.chat([{"role": "user", "content": "x"}], model="stub")
+        await client.aclose()
+
+        assert exc_info.value.status_code == 503
+        assert app.state.calls["chat"] == 3
+        assert client.stats.retries == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """测试按服务商限制并发"""
+        in_flight = {"now": 0, "max": 0}
+
+        async def handler(request):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return httpx.Response(200, json={"ok": True})
+
+        client = make_client(transport=httpx.MockTransport(handler), max_concurrency=2)
+        await asyncio.gather(*(client.post("/v1/chat/completions", {}) for _ in range(6)))
+        await client.aclose()
+
+        assert in_flight["max"] == 2
+
+    @pytest.mark.asyncio
+    async def test_hedged_request(self):
+        """测试首个请求过慢时对冲请求先返回"""
+        calls = {"n": 0}
+
+        async def handler(request):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                await asyncio.sleep(1)
+                return httpx.Response(200, json={"from": "slow"})
+            return httpx.Response(200, json={"from": "hedge"})
+
+        client = make_client(transport=httpx.MockTransport(handler), hedge_after=0.02)
+        result = await client.post("/v1/chat/completions", {})
+        await client.aclose()
+
+        assert result == {"from": "hedge"}
+        assert client.stats.hedges == 1
@@ -0,0 +1,242 @@
+"""
+执行沙箱单元测试
+"""
+import pytest
+import pytest_asyncio
+import asyncio
+import sys
+import time
+
+from app.blackboard.blackboard import Blackboard, AgentType, Task, TaskStatus, TaskType
+from app.sandbox import gdscript, jobs
+from app.sandbox.pool import SandboxError, SandboxLimits, SandboxPool
+from app.sandbox.service import SandboxService
+
+
+VALID_CODE = '''extends RigidBody2D
+
+@onready var sprite = $Sprite2D
+
+func _ready():
+    mass = 2.0
+    var data = {
+        "speed": 10,
+    }
+    if mass > 1.0:
+        print("heavy")
+'''
+
+
+class TestGDScriptChecker:
+    """GDScript 静态检查测试"""
+
+    def test_valid_code(self):
+        """测试合法代码"""
+        assert gdscript.check(VALID_CODE) == {"ok": True, "errors": []}
+
+    def test_unclosed_bracket(self):
+        """测试括号未闭合"""
+        result = gdscript.check("func _ready():\n    print(\"a\"\n")
+        assert not result["ok"]
+        assert result["errors"][0]["message"] == "unclosed '('"
+
+    def test_missing_block(self):
+        """测试冒号后缺少缩进块"""
+        result = gdscript.check("func _ready():\nvar x = 1\n")
+        assert result["errors"] == [{"line": 2, "message": "expected an indented block"}]
+
+    def test_unexpected_indent(self):
+        """测试多余缩进"""
+        result = gdscript.check("extends Node\n    var x = 1\n")
+        assert result["errors"] == [{"line": 2, "message": "unexpected indent"}]
+
+    def test_brackets_in_strings_and_comments(self):
+        """测试字符串与注释中的括号不参与配对"""
+        assert gdscript.check('var s = "(["  # ) ]\n')["ok"]
+
+    def test_static_test_run(self):
+        """测试未配置 Godot 时的静态测试"""
+        result = jobs.run_tests(VALID_CODE)
+        assert result["passed"] is True
+        assert result["runner"] == "static"
+        assert result["tests"] == result["passed_count"] == 3
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="资源限制依赖 POSIX")
+class TestSandboxPool:
+    """沙箱进程池测试"""
+
+    @pytest_asyncio.fixture
+    async def pool(self):
+        pool = SandboxPool(workers=1, limits=SandboxLimits(time_limit=10, cpu_limit=10))
+        yield pool
+        await pool.close()
+
+    def test_workers_clamped_to_one(self):
+        """测试工作进程数配置为 0 时仍使用进程隔离，只有显式 inline 才在当前进程执行"""
+        assert SandboxPool(workers=0).size == 1
+        assert not SandboxPool(workers=0).inline
+        assert SandboxPool(inline=True).size == 0
+
+    @pytest.mark.asyncio
+    async def test_run_job(self, pool):
+        """测试在工作进程中执行任务"""
+        result = await pool.run(jobs.check_syntax, VALID_CODE)
+        assert result["ok"] is True
+
+    @pytest.mark.asyncio
+    async def test_job_error(self, pool):
+        """测试任务异常转换为 SandboxError"""
+        with pytest.raises(SandboxError) as exc_info:
+            await pool.run(int, "not a number")
+        assert exc_info.value.reason == "error"
+
+        # 工作进程仍可继续使用
+        assert await pool.run(int, "42") == 42
+
+    @pytest.mark.asyncio
+    async def test_time_limit_replaces_worker(self, pool):
+        """测试超时任务被终止并替换工作进程"""
+        with pytest.raises(SandboxError) as exc_info:
+            await pool.run(time.sleep, 5, time_limit=0.2)
+        assert exc_info.value.reason == "timeout"
+
+        assert await pool.run(int, "7") == 7
+        assert pool.stats["restarts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cpu_limit(self, pool):
+        """测试超出 CPU 时间限制"""
+        with pytest.raises(SandboxError) as exc_info:
+            await pool.run(sum, range(10 ** 12), cpu_limit=1, time_limit=10)
+        assert exc_info.value.reason == "cpu_limit"
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self, pool):
+        """测试任务执行期间事件循环仍可调度"""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        await pool.start()
+        ticker_task = asyncio.create_task(ticker())
+        await pool.run(time.sleep, 0.3)
+        ticker_task.cancel()
+        assert ticks >= 10
+
+
+class TestSandboxService:
+    """沙箱与黑板集成测试"""
+
+    @pytest.mark.asyncio
+    async def test_run_test_task(self):
+        """测试 RUN_TEST 任务由沙箱认领并写回输出"""
+        board = Blackboard()
+        pool = SandboxPool(workers=1)
+        service = SandboxService(pool, board)
+        service.attach()
+
+        task = Task(
+            id="t1",
+            type=TaskType.RUN_TEST,
+            assigned_agent=AgentType.INQUISITOR,
+            input={"code": VALID_CODE},
+        )
+        await board.publish_task(task)
+        output = await service.wait("t1")
+        await pool.close()
+
+        assert output["passed"] is True
+        assert task.status == TaskStatus.COMPLETED
+        assert task.output == output
+        assert board.agent_status[AgentType.INQUISITOR] == "idle"
+
+    @pytest.mark.asyncio
+    async def test_failed_run_marks_task_failed(self):
+        """测试沙箱失败时任务标记为失败"""
+        board = Blackboard()
+        pool = SandboxPool(workers=1, limits=SandboxLimits(time_limit=0.001))
+        service = SandboxService(pool, board)
+        service.attach()
+
+        task = Task(
+            id="t2",
+            type=TaskType.RUN_TEST,
+            assigned_agent=AgentType.INQUISITOR,
+            input={"code": VALID_CODE},
+        )
+        await board.publish_task(task)
+        output = await service.wait("t2")
+        await pool.close()
+
+        assert output["reason"] == "timeout"
+        assert task.status == TaskStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_marks_task_failed(self):
+        """测试沙箱抛出非 SandboxError 异常时任务同样标记为失败"""
+        board = Blackboard()
+        pool = SandboxPool(workers=1)
+
+        async def broken_run(*args, **kwargs):
+            raise RuntimeError("pool is closed")
+
+        pool.run = broken_run
+        service = SandboxService(pool, board)
+        service.attach()
+
+        task = Task(
+            id="t4",
+            type=TaskType.RUN_TEST,
+            assigned_agent=AgentType.INQUISITOR,
+            input={"code": VALID_CODE},
+        )
+        await board.publish_task(task)
+        output = await asyncio.wait_for(service.wait("t4"), timeout=5)
+
+        assert output["reason"] == "error"
+        assert task.status == TaskStatus.FAILED
+        assert board.agent_status[AgentType.INQUISITOR] == "idle"
+
+    @pytest.mark.asyncio
+    async def test_wait_after_job_finished(self):
+        """测试任务执行完毕后再调用 wait() 仍能取得结果"""
+        board = Blackboard()
+        service = SandboxService(SandboxPool(inline=True), board)
+        service.attach()
+
+        task = Task(
+            id="t5",
+            type=TaskType.RUN_TEST,
+            assigned_agent=AgentType.INQUISITOR,
+            input={"code": VALID_CODE},
+        )
+        await board.publish_task(task)
+        while "t5" in service._running:
+            await asyncio.sleep(0.01)
+
+        output = await service.wait("t5")
+        assert task.status == TaskStatus.COMPLETED
+        assert output is not None
+        assert output["passed"] is True
+
+    @pytest.mark.asyncio
+    async def test_tasks_without_code_are_left_for_agents(self):
+        """测试不带代码的测试任务不被沙箱认领"""
+        board = Blackboard()
+        service = SandboxService(SandboxPool(workers=1), board)
+        service.attach()
+
+        await board.publish_task(Task(
+            id="t3",
+            type=TaskType.RUN_TEST,
+            assigned_agent=AgentType.INQUISITOR,
+            input={"target": "crate.gd"},
+        ))
+
+        assert await service.wait("t3") is None
+        assert len(board.tasks["pending"]) == 1
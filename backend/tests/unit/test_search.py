@@ -0,0 +1,159 @@
+"""
+检索索引单元测试
+"""
+import pytest
+
+from app.blackboard.blackboard import Blackboard, Task, TaskType, AgentType
+from app.search.index import InvertedIndex, SearchDocument
+from app.search.service import SearchService
+from app.search.tokenizer import tokenize
+from app.search.vector import HashingEmbedder, VectorIndex
+
+
+def doc(doc_id: str, content: str, kind: str = "message") -> SearchDocument:
+    return SearchDocument(id=doc_id, space_id="space-1", kind=kind, title="", content=content)
+
+
+class TestTokenizer:
+    """分词测试"""
+
+    def test_cjk_bigrams_and_words(self):
+        """测试中文二元切分与英文单词切分"""
+        assert tokenize("推动的箱子") == ["推动", "动的", "的箱", "箱子"]
+        assert tokenize("Pushable_Box 2D") == ["pushable_box", "pushable", "box", "2d"]
+        assert tokenize("箱") == ["箱"]
+
+
+class TestInvertedIndex:
+    """倒排索引测试"""
+
+    @pytest.fixture
+    def index(self):
+        index = InvertedIndex()
+        index.add(doc("m1", "我想做一个能被玩家推动的箱子"))
+        index.add(doc("m2", "让箱子更重一点"))
+        index.add(doc("m3", "添加一个会跳跃的角色"))
+        index.add(doc("c1", "extends RigidBody2D\nfunc _ready():\n    mass = 2.0", kind="code"))
+        return index
+
+    def test_ranked_results(self, index):
+        """测试 BM25 排序"""
+        results = index.search("推动箱子")
+        assert [d.id for d, _ in results] == ["m1", "m2"]
+        assert results[0][1] > results[1][1]
+
+    def test_kind_filter(self, index):
+        """测试按类型过滤"""
+        assert [d.id for d, _ in index.search("rigidbody2d mass")] == ["c1"]
+        assert index.search("rigidbody2d", kinds=["message"]) == []
+
+    def test_incremental_update_and_remove(self, index):
+        """测试增量更新与删除"""
+        index.add(doc("m2", "让角色跳得更高"))
+        assert [d.id for d, _ in index.search("箱子")] == ["m1"]
+
+        index.remove("m1")
+        assert index.search("箱子") == []
+        assert len(index) == 3
+
+    def test_compaction_drops_tombstones(self):
+        """测试删除过半后压缩倒排表"""
+        index = InvertedIndex()
+        index.COMPACT_MIN_DEAD = 4
+        for i in range(10):
+            index.add(doc(f"m{i}", f"箱子 {i} 号"))
+        for i in range(6):
+            index.remove(f"m{i}")
+
+        assert len(index._docs) == 4
+        assert sorted(d.id for d, _ in index.search("箱子")) == ["m6", "m7", "m8", "m9"]
+        assert [d.id for d, _ in index.search("7")] == ["m7"]
+        index.add(doc("m10", "箱子"))
+        assert index.get("m10").content == "箱子"
+        assert len(index.search("箱子")) == 5
+
+
+class TestVectorIndex:
+    """向量索引测试"""
+
+    def test_similar_requests(self):
+        """测试相似文本排在前面"""
+        embedder = HashingEmbedder(dim=128)
+        index = VectorIndex(dim=128)
+        texts = {
+            "a": "我想做一个能被玩家推动的箱子",
+            "b": "添加一个会跳跃的角色",
+            "c": "背景音乐换成更欢快的",
+        }
+        for _ in range(30):  # 触发扩容
+            for key, text in texts.items():
+                index.add(key, embedder.embed(text))
+
+        hits = index.search(embedder.embed("玩家可以推动箱子"), k=2)
+        assert hits[0][0] == "a"
+        assert len(index) == 3
+
+        index.remove("a")
+        assert all(doc_id != "a" for doc_id, _ in index.search(embedder.embed("推动箱子")))
+
+    def test_ivf_after_threshold(self):
+        """测试超过阈值后切换到 IVF 检索"""
+        embedder = HashingEmbedder(dim=64)
+        index = VectorIndex(dim=64, ivf_threshold=200, nprobe=4)
+        for i in range(300):
+            index.add(f"d{i}", embedder.embed(f"物体 {i} 号 item_{i}"))
+
+        assert index.trained
+        hits = index.search(embedder.embed("物体 123 号 item_123"), k=3)
+        assert hits[0][0] == "d123"
+
+    def test_compaction(self):
+        """测试删除过半后压缩矩阵(IVF 桶重新分配)"""
+        embedder = HashingEmbedder(dim=64)
+        index = VectorIndex(dim=64, ivf_threshold=100, nprobe=16)
+        index.COMPACT_MIN_DEAD = 10
+        for i in range(150):
+            index.add(f"d{i}", embedder.embed(f"物体 {i} 号 item_{i}"))
+        for i in range(100):
+            index.remove(f"d{i}")
+
+        # 已删除行超过存活行时自动压缩一次，之后的墓碑等待下次压缩
+        assert len(index._ids) == 74
+        assert index.compact() == 24
+        assert len(index._ids) == len(index) == 50
+        assert index.search(embedder.embed("物体 123 号 item_123"), k=1)[0][0] == "d123"
+        assert all(doc_id not in {f"d{i}" for i in range(100)}
+                   for doc_id, _ in index.search(embedder.embed("物体 5 号"), k=50))
+
+
+class TestSearchService:
+    """检索服务测试"""
+
+    @pytest.mark.asyncio
+    async def test_indexes_published_tasks(self):
+        """测试订阅黑板任务发布后建立索引"""
+        board = Blackboard()
+        service = SearchService()
+        service.attach(board)
+
+        await board.publish_task(Task(
+            id="t1",
+            type=TaskType.WRITE_CODE,
+            assigned_agent=AgentType.CODEWEAVER,
+            input={"requirement": "可以推动的箱子"},
+            space_id="space-1",
+        ))
+
+        assert [d.id for d, _ in service.search("space-1", "推动")] == ["t1"]
+        assert service.search("space-2", "推动") == []
+        assert service.similar("space-1", "推动箱子")[0][0].id == "t1"
+
+        service.detach(board)
+        await board.publish_task(Task(
+            id="t2",
+            type=TaskType.WRITE_CODE,
+            assigned_agent=AgentType.CODEWEAVER,
+            input={"requirement": "推动"},
+            space_id="space-1",
+        ))
+        assert [d.id for d, _ in service.search("space-1", "推动")] == ["t1"]
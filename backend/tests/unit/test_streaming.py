@@ -0,0 +1,168 @@
+"""
+流式输出管线与发送队列单元测试
+"""
+import pytest
+import asyncio
+
+from app.agents.streaming import stream_task_output
+from app.blackboard.blackboard import Blackboard, Task, TaskType, AgentType
+from app.realtime.outbox import ClientOutbox, OutboxItem, OutboxRegistry
+
+
+def delta(i: int) -> OutboxItem:
+    return OutboxItem("agent:delta", {"delta": str(i), "offset": i}, stream_key="task-1")
+
+
+class TestClientOutbox:
+    """发送队列测试"""
+
+    def test_fifo_below_watermark(self):
+        """测试未达高水位时逐条入队"""
+        outbox = ClientOutbox("sid", high_watermark=4, low_watermark=1, max_size=8)
+        for i in range(3):
+            outbox.put(delta(i))
+
+        assert len(outbox) == 3
+        assert not outbox.lagging
+        assert [outbox.get_nowait().data["delta"] for _ in range(3)] == ["0", "1", "2"]
+
+    def test_conflation_when_lagging(self):
+        """测试落后时合并同一流的增量"""
+        outbox = ClientOutbox("sid", high_watermark=4, low_watermark=1, max_size=8)
+        for i in range(4):
+            outbox.put(delta(i))
+        outbox.put(OutboxItem("agent:message", {"status": "complete"}))
+        for i in range(4, 100):
+            outbox.put(delta(i))
+
+        assert outbox.lagging
+        assert len(outbox) == 6
+        assert outbox.conflated == 95
+
+        items = [outbox.get_nowait() for _ in range(len(outbox))]
+        text = "".join(item.data.get("delta", "") for item in items)
+        assert text == "".join(str(i) for i in range(100))
+        # 入队顺序不变: complete 之后的增量只合并到它之后
+        assert [item.event for item in items].index("agent:message") == 4
+        assert items[5].data["offset"] == 4
+        assert not outbox.lagging
+
+    def test_overflow_requests_resync(self):
+        """测试超过硬上限时丢弃积压"""
+        outbox = ClientOutbox("sid", high_watermark=2, low_watermark=1, max_size=3)
+        for i in range(4):
+            outbox.put(OutboxItem("agent:message", {"i": i}))
+
+        assert outbox.overflows == 1
+        assert len(outbox) == 1
+        assert outbox.get_nowait().event == "resync_required"
+
+    @pytest.mark.asyncio
+    async def test_run_waits_for_transport_backlog(self):
+        """测试传输层积压时暂停发送"""
+        outbox = ClientOutbox("sid", high_watermark=4, low_watermark=1, max_size=8)
+        sent = []
+        backlog = {"size": 100}
+
+        async def send(event, data):
+            sent.append(data["delta"])
+
+        runner = asyncio.create_task(
+            outbox.run(send, backlog=lambda: backlog["size"], max_backlog=10, poll_interval=0.001)
+        )
+        for i in range(10):
+            outbox.put(delta(i))
+        await asyncio.sleep(0.01)
+        assert sent == []
+
+        backlog["size"] = 0
+        await asyncio.sleep(0.01)
+        runner.cancel()
+        # 第一条在等待期间已出队，其余增量被合并
+        assert "".join(sent) == "0123456789"
+        assert len(sent) < 10
+
+
+class TestStreamingPipeline:
+    """流式管线测试"""
+
+    @pytest.mark.asyncio
+    async def test_stream_to_blackboard_and_outboxes(self):
+        """测试增量写入黑板并投递给房间内的客户端"""
+        board = Blackboard()
+        task = Task(
+            id="task-code",
+            type=TaskType.WRITE_CODE,
+            assigned_agent=AgentType.CODEWEAVER,
+            input={"requirement": "pushable box"},
+        )
+        await board.publish_task(task)
+        await board.claim_task(AgentType.CODEWEAVER, "task-code")
+
+        received = []
+
+        async def send(sid, event, data):
+            received.append((sid, event, data))
+
+        outboxes = OutboxRegistry(send=send)
+        outboxes.join("sid-1", "space-1")
+
+        async def chunks():
+            for part in ["extends ", "RigidBody2D", "\n"]:
+                yield part
+
+        output = await stream_task_output(task, chunks(), "space-1", outboxes, board=board)
+        await asyncio.sleep(0)
+        outboxes.close("sid-1")
+
+        assert output == "extends RigidBody2D\n"
+        assert task.partial_output == ["extends ", "RigidBody2D", "\n"]
+        assert [d["offset"] for _, _, d in received] == [0, 8, 19]
+        assert all(event == "agent:delta" for _, event, _ in received)
+
+        await board.complete_task("task-code", {"code": output})
+        assert task.partial_output == []
+
+    @pytest.mark.asyncio
+    async def test_room_events_follow_queued_deltas(self, monkeypatch):
+        """测试房间事件经发送队列发送，不会先于排在前面的增量送达，也不发给发送者"""
+        from app.api import websocket
+
+        received = []
+
+        async def send(sid, event, data):
+            received.append((sid, event))
+
+        outboxes = OutboxRegistry(send=send)
+        monkeypatch.setattr(websocket, "outboxes", outboxes)
+        outboxes.join("sid-1", "space-1")
+        outboxes.join("sid-2", "space-1")
+
+        outboxes.publish("space-1", "agent:delta", {"delta": "extends"}, stream_key="t1")
+        await websocket.broadcast("asset:created", {"assetId": "a1"}, room="space-1")
+        await websocket.emit_room("canvas:update", {"update": b"x"}, room="space-1", skip_sid="sid-2")
+        for _ in range(5):
+            await asyncio.sleep(0)
+        outboxes.close("sid-1")
+        outboxes.close("sid-2")
+
+        assert [event for sid, event in received if sid == "sid-1"] == [
+            "agent:delta", "asset:created", "canvas:update",
+        ]
+        assert [event for sid, event in received if sid == "sid-2"] == ["agent:delta", "asset:created"]
+
+    @pytest.mark.asyncio
+    async def test_claim_specific_task(self):
+        """测试按 id 认领任务"""
+        board = Blackboard()
+        for task_id in ("a", "b"):
+            await board.publish_task(Task(
+                id=task_id,
+                type=TaskType.WRITE_CODE,
+                assigned_agent=AgentType.CODEWEAVER,
+                input={},
+            ))
+
+        claimed = await board.claim_task(AgentType.CODEWEAVER, "b")
+        assert claimed.id == "b"
+        assert [t.id for t in board.tasks["pending"]] == ["a"]
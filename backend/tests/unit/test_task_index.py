@@ -0,0 +1,71 @@
+"""
+任务索引单元测试
+"""
+import pytest
+
+from app.blackboard.blackboard import AgentType, Blackboard, Task, TaskStatus, TaskType
+from app.blackboard.task_index import TaskIndex
+
+
+def _task(i: int, space: str = "s1", task_type: TaskType = TaskType.GENERATE_IMAGE) -> Task:
+    agent = AgentType.VOIDSHAPER if task_type == TaskType.GENERATE_IMAGE else AgentType.CODEWEAVER
+    return Task(id=f"t{i}", type=task_type, assigned_agent=agent, input={}, space_id=space)
+
+
+class TestTaskIndex:
+    """任务索引测试"""
+
+    def test_cursor_pagination(self):
+        """测试游标分页覆盖全部任务且不重复"""
+        index = TaskIndex(TaskStatus)
+        for i in range(25):
+            index.add(_task(i))
+        index.add(_task(99, space="other"))
+
+        seen, cursor = [], 0
+        while True:
+            tasks, cursor = index.query("s1", after=cursor, limit=10)
+            seen.extend(task.id for task in tasks)
+            if cursor is None:
+                break
+        assert seen == [f"t{i}" for i in range(25)]
+
+    def test_filters_and_counts(self):
+        """测试按状态/类型过滤与计数器"""
+        index = TaskIndex(TaskStatus)
+        tasks = [_task(i, task_type=TaskType.WRITE_CODE if i % 2 else TaskType.GENERATE_IMAGE) for i in range(6)]
+        for task in tasks:
+            index.add(task)
+        index.set_status(tasks[1], TaskStatus.RUNNING)
+        index.set_status(tasks[3], TaskStatus.RUNNING)
+        index.set_status(tasks[3], TaskStatus.COMPLETED)
+
+        running, _ = index.query("s1", status=TaskStatus.RUNNING)
+        assert [task.id for task in running] == ["t1"]
+        code, _ = index.query("s1", task_type=TaskType.WRITE_CODE, status=TaskStatus.PENDING)
+        assert [task.id for task in code] == ["t5"]
+        images, _ = index.query("s1", agent=AgentType.VOIDSHAPER)
+        assert [task.id for task in images] == ["t0", "t2", "t4"]
+        assert index.counts("s1") == {"pending": 4, "running": 1, "completed": 1, "failed": 0}
+        assert index.counts("missing")["pending"] == 0
+
+    def test_last_page_has_no_cursor(self):
+        """测试恰好取完时不返回游标"""
+        index = TaskIndex(TaskStatus)
+        for i in range(3):
+            index.add(_task(i))
+        tasks, cursor = index.query("s1", limit=3)
+        assert len(tasks) == 3 and cursor is None
+
+    @pytest.mark.asyncio
+    async def test_blackboard_maintains_index(self):
+        """测试黑板在发布/认领/失败时同步索引"""
+        board = Blackboard()
+        await board.publish_tasks([_task(i) for i in range(3)])
+        await board.claim_task(AgentType.VOIDSHAPER, "t0")
+        await board.claim_task(AgentType.VOIDSHAPER, "t1")
+        await board.fail_task("t1", {"error": "boom"})
+
+        assert board.task_index.counts("s1") == {"pending": 1, "running": 1, "completed": 0, "failed": 1}
+        failed, _ = board.task_index.query("s1", status=TaskStatus.FAILED)
+        assert [task.id for task in failed] == ["t1"]
@@ -0,0 +1,125 @@
+"""
+Socket.IO 二进制编码单元测试
+"""
+import json
+import zlib
+import pytest
+
+import msgpack
+
+from app.api import websocket
+from app.realtime.codec import (
+    JSON,
+    MSGPACK,
+    PACKED_EVENT,
+    ClientEncodings,
+    CodecError,
+    WireCodec,
+    negotiate,
+)
+
+
+class TestWireCodec:
+    """编解码测试"""
+
+    @pytest.fixture
+    def codec(self):
+        return WireCodec(compress_threshold=256)
+
+    def test_roundtrip_with_interning(self, codec):
+        """测试驻留事件名与智能体名的往返编码"""
+        data = {"agent": "producer", "content": "收到需求", "status": "complete"}
+        frame = codec.encode("agent:message", data)
+
+        assert b"agent:message" not in frame
+        assert b"producer" not in frame
+        assert codec.decode(frame) == ("agent:message", data)
+        # 原始数据不应被修改
+        assert data["agent"] == "producer"
+
+    def test_unknown_event_and_binary_payload(self, codec):
+        """测试未驻留事件与二进制字段"""
+        data = {"spaceId": "s1", "update": b"\x01\x02"}
+        assert codec.decode(codec.encode("custom:event", data)) == ("custom:event", data)
+
+    def test_compression_over_threshold(self, codec):
+        """测试超过阈值时压缩"""
+        small = codec.encode("agent:message", {"content": "ok"})
+        large_data = {"type": "code", "content": "mass = 2.0\n" * 500}
+        large = codec.encode("asset:created", large_data)
+
+        assert small[0] == 0
+        assert large[0] == 1
+        assert len(large) < len(json.dumps(large_data)) / 10
+        assert codec.decode(large) == ("asset:created", large_data)
+
+    def test_invalid_frame(self, codec):
+        """测试非法帧"""
+        with pytest.raises(CodecError):
+            codec.decode(b"")
+        with pytest.raises(CodecError):
+            codec.decode(b"\x01not-deflate")
+        for body in ([999, {}], [-1, {}], [1.5, {}], ["agent:message", {"agent": 99}]):
+            with pytest.raises(CodecError):
+                codec.decode(b"\x00" + msgpack.packb(body))
+
+    def test_decompression_limit(self):
+        """测试解压后超过上限的帧被拒绝"""
+        codec = WireCodec(max_frame=1024)
+        body = msgpack.packb(["agent:message", {"content": "x" * 4096}])
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        frame = b"\x01" + compressor.compress(body) + compressor.flush()
+
+        assert len(frame) < 1024
+        with pytest.raises(CodecError):
+            codec.decode(frame)
+
+    def test_negotiate(self):
+        """测试编码协商"""
+        assert negotiate(["msgpack", "json"]) == MSGPACK
+        assert negotiate(["cbor"]) == JSON
+        assert negotiate(None) == JSON
+        assert negotiate("msgpack") == MSGPACK
+        assert negotiate(42) == JSON
+
+
+class TestEmitEvent:
+    """按编码分发测试"""
+
+    @pytest.fixture
+    def emitted(self, monkeypatch):
+        events = []
+
+        async def fake_emit(event, data=None, room=None, skip_sid=None, **kwargs):
+            events.append((event, data, room, skip_sid))
+
+        encodings = ClientEncodings()
+        encodings.set("bin-1", MSGPACK)
+        encodings.join("bin-1", "space-1")
+        encodings.join("json-1", "space-1")
+        monkeypatch.setattr(websocket.sio, "emit", fake_emit)
+        monkeypatch.setattr(websocket, "client_encodings", encodings)
+        return events
+
+    @pytest.mark.asyncio
+    async def test_room_broadcast_split(self, emitted):
+        """测试房间广播时 JSON 与二进制客户端分别发送"""
+        await websocket.emit_event("agent:message", {"agent": "producer"}, room="space-1")
+
+        json_emit, packed_emit = emitted
+        assert json_emit == ("agent:message", {"agent": "producer"}, "space-1", ["bin-1"])
+        assert packed_emit[0] == PACKED_EVENT
+        assert packed_emit[2] == "bin-1"
+        assert websocket.wire_codec.decode(packed_emit[1]) == ("agent:message", {"agent": "producer"})
+
+    @pytest.mark.asyncio
+    async def test_direct_emit_to_binary_client(self, emitted):
+        """测试单播给二进制客户端"""
+        await websocket.emit_event("joined_space", {"spaceId": "space-1"}, room="bin-1")
+        assert [e[0] for e in emitted] == [PACKED_EVENT]
+
+    @pytest.mark.asyncio
+    async def test_json_only_room(self, emitted):
+        """测试没有二进制客户端的房间"""
+        await websocket.emit_event("agent:message", {}, room="space-2", skip_sid="json-1")
+        assert emitted == [("agent:message", {}, "space-2", "json-1")]